@@ -0,0 +1,76 @@
+"""Initial schema, as created by the former startup create_all
+
+Tables that already exist are left alone, so deployments whose schema was
+made by create_all can run `alembic upgrade head` without stamping first.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+VM_STATES = ('CREATING', 'RUNNING', 'STOPPED', 'SUSPENDED', 'ERROR', 'DESTROYING', 'UNKNOWN')
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('virtual_machines'):
+        _create_virtual_machines()
+    if not inspector.has_table('templates'):
+        _create_templates()
+
+
+def _create_virtual_machines() -> None:
+    op.create_table(
+        'virtual_machines',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('state', sa.Enum(*VM_STATES, name='vmstate'), nullable=False),
+        sa.Column('config', sa.JSON(), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('vagrantfile_path', sa.String(length=500), nullable=True),
+        sa.Column('provider_vm_id', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_virtual_machines_id', 'virtual_machines', ['id'])
+    op.create_index('ix_virtual_machines_name', 'virtual_machines', ['name'])
+    op.create_index('ix_virtual_machines_provider', 'virtual_machines', ['provider'])
+    op.create_index('ix_virtual_machines_provider_vm_id', 'virtual_machines', ['provider_vm_id'])
+
+
+def _create_templates() -> None:
+    op.create_table(
+        'templates',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=True),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('config', sa.JSON(), nullable=False),
+        sa.Column('vagrantfile_template', sa.String(), nullable=True),
+        sa.Column('is_public', sa.Boolean(), nullable=False),
+        sa.Column('tags', postgresql.ARRAY(sa.String()), nullable=False),
+        sa.Column('usage_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_templates_id', 'templates', ['id'])
+    op.create_index('ix_templates_name', 'templates', ['name'], unique=True)
+    op.create_index('ix_templates_provider', 'templates', ['provider'])
+
+
+def downgrade() -> None:
+    op.drop_table('templates')
+    op.drop_table('virtual_machines')
+    sa.Enum(name='vmstate').drop(op.get_bind(), checkfirst=True)
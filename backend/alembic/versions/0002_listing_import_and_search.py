@@ -0,0 +1,69 @@
+"""Listing indexes, template content hash and template search
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # Keyset pagination and filtered listings
+    op.create_index('ix_virtual_machines_created_at_id', 'virtual_machines', ['created_at', 'id'])
+    op.create_index(
+        'ix_virtual_machines_provider_state_created_at', 'virtual_machines',
+        ['provider', 'state', 'created_at', 'id']
+    )
+    op.create_index('ix_virtual_machines_state_created_at', 'virtual_machines', ['state', 'created_at', 'id'])
+    op.create_index(
+        'ix_virtual_machines_name_prefix', 'virtual_machines', ['name'],
+        postgresql_ops={'name': 'text_pattern_ops'}
+    )
+    op.create_index('ix_templates_created_at_id', 'templates', ['created_at', 'id'])
+    op.create_index('ix_templates_provider_created_at', 'templates', ['provider', 'created_at', 'id'])
+    op.create_index(
+        'ix_templates_name_prefix', 'templates', ['name'],
+        postgresql_ops={'name': 'text_pattern_ops'}
+    )
+    op.create_index('ix_templates_tags', 'templates', ['tags'], postgresql_using='gin')
+
+    # Bulk import de-duplication
+    op.add_column('templates', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_templates_content_hash', 'templates', ['content_hash'])
+    op.execute(
+        "UPDATE templates SET content_hash = encode(sha256(convert_to(vagrantfile_template, 'UTF8')), 'hex') "
+        "WHERE vagrantfile_template IS NOT NULL AND vagrantfile_template <> ''"
+    )
+
+    # Full-text search
+    op.add_column('templates', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)
+    ))
+    op.create_index('ix_templates_search_vector', 'templates', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_templates_search_vector', table_name='templates')
+    op.drop_column('templates', 'search_vector')
+    op.drop_index('ix_templates_content_hash', table_name='templates')
+    op.drop_column('templates', 'content_hash')
+    op.drop_index('ix_templates_tags', table_name='templates')
+    op.drop_index('ix_templates_name_prefix', table_name='templates')
+    op.drop_index('ix_templates_provider_created_at', table_name='templates')
+    op.drop_index('ix_templates_created_at_id', table_name='templates')
+    op.drop_index('ix_virtual_machines_name_prefix', table_name='virtual_machines')
+    op.drop_index('ix_virtual_machines_state_created_at', table_name='virtual_machines')
+    op.drop_index('ix_virtual_machines_provider_state_created_at', table_name='virtual_machines')
+    op.drop_index('ix_virtual_machines_created_at_id', table_name='virtual_machines')
@@ -0,0 +1,48 @@
+"""Operations table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+OPERATION_TYPES = ('CREATE', 'START', 'STOP', 'DELETE')
+OPERATION_STATES = ('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'operations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('vm_id', sa.Integer(), nullable=False),
+        sa.Column('provider', sa.String(length=50), nullable=False),
+        sa.Column('type', sa.Enum(*OPERATION_TYPES, name='operationtype'), nullable=False),
+        sa.Column('state', sa.Enum(*OPERATION_STATES, name='operationstate'), nullable=False),
+        sa.Column('task_id', sa.String(length=155), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('duration_seconds', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_operations_id', 'operations', ['id'])
+    op.create_index('ix_operations_task_id', 'operations', ['task_id'], unique=True)
+    op.create_index('ix_operations_vm_id_created_at', 'operations', ['vm_id', 'created_at', 'id'])
+    op.create_index('ix_operations_provider_type_finished_at', 'operations', ['provider', 'type', 'finished_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_operations_provider_type_finished_at', table_name='operations')
+    op.drop_index('ix_operations_vm_id_created_at', table_name='operations')
+    op.drop_index('ix_operations_task_id', table_name='operations')
+    op.drop_index('ix_operations_id', table_name='operations')
+    op.drop_table('operations')
+    sa.Enum(name='operationstate').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='operationtype').drop(op.get_bind(), checkfirst=True)
@@ -1,10 +1,12 @@
 from fastapi import APIRouter
-from app.api.endpoints import vms, templates, vagrantfiles, providers
+from app.api.endpoints import vms, operations, templates, vagrantfiles, providers, events
 
 api_router = APIRouter()
 
 # Include endpoint routers
 api_router.include_router(vms.router, prefix="/vms", tags=["Virtual Machines"])
+api_router.include_router(operations.router, prefix="/operations", tags=["Operations"])
 api_router.include_router(templates.router, prefix="/templates", tags=["Templates"])
 api_router.include_router(vagrantfiles.router, prefix="/vagrantfiles", tags=["Vagrantfiles"])
 api_router.include_router(providers.router, prefix="/providers", tags=["Providers"])
+api_router.include_router(events.router, tags=["Events"])
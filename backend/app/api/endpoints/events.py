@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Any, List
+import asyncio
+import json
+
+from app.core.config import settings
+from app.services.events import event_broker
+
+router = APIRouter()
+
+
+def _filter_values(values: Any, kind: type) -> List[Any]:
+    """
+    Filter values from a client message, converted to kind.
+
+    Query parameters are validated by FastAPI, but messages are arbitrary
+    JSON: anything that isn't a list of convertible values is dropped.
+    """
+    converted = []
+    for value in values if isinstance(values, list) else []:
+        if isinstance(value, (bool, dict, list)) or value is None:
+            continue
+        if kind is int and isinstance(value, float) and not value.is_integer():
+            continue
+        try:
+            converted.append(kind(value))
+        except (TypeError, ValueError, OverflowError):
+            continue
+    return converted
+
+
+@router.websocket("/ws/events")
+async def events_websocket(
+    websocket: WebSocket,
+    vm_id: List[int] = Query([]),
+    provider: List[str] = Query([])
+):
+    """
+    Stream VM events over a WebSocket.
+
+    Filter with repeated `vm_id` / `provider` query parameters, or send
+    {"vm_ids": [...], "providers": [...]} at any time to change filters.
+    """
+    await websocket.accept()
+    subscription = event_broker.subscribe(vm_id, provider)
+
+    async def receive_filters():
+        while True:
+            message = await websocket.receive_json()
+            if isinstance(message, dict):
+                subscription.set_filters(
+                    _filter_values(message.get("vm_ids"), int), _filter_values(message.get("providers"), str)
+                )
+
+    receiver = asyncio.create_task(receive_filters())
+    try:
+        while not receiver.done():
+            event_task = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait({event_task, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if event_task not in done:
+                event_task.cancel()
+                break
+
+            event = event_task.result()
+            if event is None:
+                # Too slow to keep up; the client should reconnect
+                await websocket.close(code=1013, reason="Event consumer too slow")
+                break
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_broker.unsubscribe(subscription)
+        receiver.cancel()
+        # Retrieve its outcome (usually WebSocketDisconnect) so it isn't
+        # reported as a never-retrieved task exception
+        await asyncio.gather(receiver, return_exceptions=True)
+
+
+@router.get("/events")
+async def events_stream(
+    request: Request,
+    vm_id: List[int] = Query([]),
+    provider: List[str] = Query([])
+):
+    """Stream VM events as Server-Sent Events (fallback for clients without WebSockets)"""
+    subscription = event_broker.subscribe(vm_id, provider)
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), settings.EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event is None:
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+
+from app.core.database import get_db
+from app.schemas.operation import OperationResponse, OperationStats
+from app.services.operation_service import OperationService
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=List[OperationStats])
+async def get_operation_stats(
+    provider: Optional[str] = None,
+    since: Optional[datetime] = Query(None, description="Only operations finished at or after this time"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get latency percentiles of finished operations per provider and type"""
+    operation_service = OperationService(db)
+    return await operation_service.get_stats(provider=provider, since=since)
+
+
+@router.get("/{operation_id}", response_model=OperationResponse)
+async def get_operation(operation_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Get an operation's progress.
+
+    Reads only the operation's row, so clients can poll this cheaply
+    instead of asking the provider for the VM's status.
+    """
+    operation_service = OperationService(db)
+    operation = await operation_service.get_operation(operation_id)
+    if not operation:
+        raise HTTPException(status_code=404, detail="Operation not found")
+    return operation
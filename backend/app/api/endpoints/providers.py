@@ -2,11 +2,9 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 
 from app.services.providers.base import ProviderRegistry
+from app.services.providers.process import get_process_stats
 from app.schemas.provider import ProviderInfo, ProviderStatus
 
-# Import all providers to ensure they register themselves
-import app.services.providers
-
 router = APIRouter()
 
 
@@ -18,6 +16,12 @@ async def list_providers():
     return providers
 
 
+@router.get("/processes")
+async def get_provider_process_stats() -> Dict[str, Any]:
+    """Get timing and exit codes of provider CLI calls made by this process"""
+    return get_process_stats()
+
+
 @router.get("/{provider_name}", response_model=ProviderInfo)
 async def get_provider_info(provider_name: str):
     """Get information about a specific provider"""
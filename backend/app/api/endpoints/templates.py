@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+import tarfile
+import zipfile
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.schemas.template import TemplateCreate, TemplateResponse
+from app.core.pagination import ListView, resolve_fields, rows_response, set_page_headers
+from app.schemas.template import (
+    TemplateCreate, TemplateResponse, TemplateBulkImportResponse, TemplateSearchResult, LibraryTemplateResponse
+)
+from app.services.template_cache import get_template_cache_stats
+from app.services.template_library import template_library
 from app.services.template_service import TemplateService
 
 router = APIRouter()
@@ -12,7 +20,7 @@ router = APIRouter()
 @router.post("/", response_model=TemplateResponse, status_code=201)
 async def create_template(
     template_data: TemplateCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new VM template"""
     template_service = TemplateService(db)
@@ -22,19 +30,97 @@ async def create_template(
 
 @router.get("/", response_model=List[TemplateResponse])
 async def list_templates(
-    skip: int = 0,
-    limit: int = 100,
-    provider: str = None,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(100, ge=1, le=settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    provider: Optional[str] = None,
+    name: Optional[str] = Query(None, description="Name prefix"),
+    tag: List[str] = Query([], description="Only templates with every given tag"),
+    view: ListView = Query(ListView.FULL, description="summary omits config and vagrantfile_template"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all templates"""
+    """
+    List templates, newest first.
+
+    The next page's cursor is returned in X-Next-Cursor and an approximate
+    total of matching templates in X-Total-Count. `view=summary` or `fields`
+    select only those columns and return them without model validation.
+    """
+    template_service = TemplateService(db)
+    columns = resolve_fields(
+        fields, view == ListView.SUMMARY, TemplateService.SUMMARY_FIELDS, TemplateService.LIST_FIELDS
+    )
+    page = await template_service.list_templates(
+        limit=limit, cursor=cursor, provider=provider, name=name, tags=tag, columns=columns
+    )
+    if columns:
+        return rows_response(page)
+    set_page_headers(response, page)
+    return page.items
+
+
+@router.post("/import/bulk", response_model=TemplateBulkImportResponse)
+async def bulk_import_templates(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Import every Vagrantfile in a tar or zip archive"""
     template_service = TemplateService(db)
-    templates = await template_service.list_templates(skip=skip, limit=limit, provider=provider)
-    return templates
+    try:
+        return await template_service.bulk_import(file.file)
+    except (tarfile.TarError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=400, detail=f"Failed to read archive: {str(e)}")
+
+
+@router.get("/search", response_model=List[TemplateSearchResult])
+async def search_templates(
+    q: Optional[str] = Query(None, description="Words to match in name or description (prefixes allowed)"),
+    tag: List[str] = Query([], description="Only templates with every given tag"),
+    any_tag: List[str] = Query([], description="Only templates with at least one given tag"),
+    provider: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search templates by text and tags, best matches first"""
+    template_service = TemplateService(db)
+    return await template_service.search_templates(
+        text=q, tags=tag, any_tags=any_tag, provider=provider, limit=limit
+    )
+
+
+@router.get("/library", response_model=List[LibraryTemplateResponse])
+async def list_library_templates(
+    provider: Optional[str] = None,
+    tag: List[str] = Query([], description="Only templates with every given tag"),
+):
+    """List curated templates from the on-disk YAML library"""
+    return template_library.list(provider=provider, tags=tag)
+
+
+@router.get("/library/status")
+async def get_library_status() -> Dict[str, Any]:
+    """Get the template library's directory, counts and load errors"""
+    return template_library.stats()
+
+
+@router.get("/library/{slug}", response_model=LibraryTemplateResponse)
+async def get_library_template(slug: str):
+    """Get a curated template from the YAML library"""
+    template = template_library.get(slug)
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return template
+
+
+@router.get("/cache")
+async def get_template_cache() -> Dict[str, Any]:
+    """Get statistics of the template cache used for VM creation"""
+    return get_template_cache_stats()
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
-async def get_template(template_id: int, db: Session = Depends(get_db)):
+async def get_template(template_id: int, db: AsyncSession = Depends(get_db)):
     """Get template details"""
     template_service = TemplateService(db)
     template = await template_service.get_template(template_id)
@@ -47,7 +133,7 @@ async def get_template(template_id: int, db: Session = Depends(get_db)):
 async def update_template(
     template_id: int,
     template_data: TemplateCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a template"""
     template_service = TemplateService(db)
@@ -58,7 +144,7 @@ async def update_template(
 
 
 @router.delete("/{template_id}")
-async def delete_template(template_id: int, db: Session = Depends(get_db)):
+async def delete_template(template_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a template"""
     template_service = TemplateService(db)
     result = await template_service.delete_template(template_id)
@@ -70,10 +156,13 @@ async def delete_template(template_id: int, db: Session = Depends(get_db)):
 @router.post("/import")
 async def import_template(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Import a template from a Vagrantfile"""
     template_service = TemplateService(db)
     content = await file.read()
-    template = await template_service.import_from_vagrantfile(content.decode('utf-8'))
+    try:
+        template = await template_service.import_from_vagrantfile(content.decode('utf-8'))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse Vagrantfile: {str(e)}")
     return template
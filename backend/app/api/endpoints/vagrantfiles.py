@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import PlainTextResponse
 from typing import Dict, Any
+import asyncio
 
 from app.schemas.vagrant import VagrantfileConfig
 from app.services.vagrant.generator import VagrantfileGenerator
 from app.services.vagrant.parser import VagrantfileParser
+from app.services.vagrant.render_cache import render_cache
 
 router = APIRouter()
 
@@ -14,18 +16,24 @@ async def generate_vagrantfile(config: VagrantfileConfig):
     """Generate a Vagrantfile from configuration"""
     try:
         generator = VagrantfileGenerator()
-        vagrantfile_content = generator.generate(config.dict())
+        vagrantfile_content = await render_cache.render("base", config.dict(), generator.generate)
         return vagrantfile_content
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to generate Vagrantfile: {str(e)}")
 
 
+@router.get("/cache")
+async def get_render_cache_stats() -> Dict[str, Any]:
+    """Get render cache statistics"""
+    return render_cache.stats()
+
+
 @router.post("/parse")
 async def parse_vagrantfile(vagrantfile: str) -> Dict[str, Any]:
     """Parse an existing Vagrantfile and extract configuration"""
     try:
         parser = VagrantfileParser()
-        config = parser.parse(vagrantfile)
+        config = await asyncio.to_thread(parser.parse, vagrantfile)
         return config
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse Vagrantfile: {str(e)}")
@@ -36,7 +44,7 @@ async def validate_vagrantfile(vagrantfile: str) -> Dict[str, Any]:
     """Validate a Vagrantfile syntax"""
     try:
         parser = VagrantfileParser()
-        is_valid = parser.validate(vagrantfile)
+        is_valid = await asyncio.to_thread(parser.validate, vagrantfile)
         return {
             "valid": is_valid,
             "message": "Vagrantfile is valid" if is_valid else "Vagrantfile has syntax errors"
@@ -1,41 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import re
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.schemas.vm import VMCreate, VMResponse, VMStatus
+from app.core.pagination import ListView, resolve_fields, rows_response, set_page_headers
+from app.schemas.vm import (
+    VMCreate, VMResponse, VMStatus, VMState, VMBatchCreate, VMBatchResponse, VMBatchProgress, OperationLogResponse
+)
+from app.schemas.operation import OperationResponse
+from app.services.operation_logs import read_operation_log
+from app.services.operation_service import OperationService
 from app.services.vm_service import VMService
 
 router = APIRouter()
 
+# A Redis stream entry ID: milliseconds, optionally with a sequence number
+STREAM_ID_RE = re.compile(r"[0-9]+(-[0-9]+)?")
+
 
 @router.post("/", response_model=VMResponse, status_code=201)
 async def create_vm(
     vm_data: VMCreate,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new virtual machine"""
     vm_service = VMService(db)
-    vm = await vm_service.create_vm(vm_data, background_tasks)
+    vm = await vm_service.create_vm(vm_data)
     return vm
 
 
+@router.post("/batch", response_model=VMBatchResponse, status_code=202)
+async def create_vm_batch(
+    batch_data: VMBatchCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many virtual machines from one template or config"""
+    vm_service = VMService(db)
+    return await vm_service.create_vm_batch(batch_data)
+
+
+@router.get("/batch/{batch_id}", response_model=VMBatchProgress)
+async def get_vm_batch(batch_id: str, db: AsyncSession = Depends(get_db)):
+    """Get the aggregate progress of a VM batch"""
+    vm_service = VMService(db)
+    return await vm_service.get_batch_progress(batch_id)
+
+
 @router.get("/", response_model=List[VMResponse])
 async def list_vms(
-    skip: int = 0,
-    limit: int = 100,
-    provider: str = None,
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(100, ge=1, le=settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    provider: Optional[str] = None,
+    state: Optional[VMState] = None,
+    name: Optional[str] = Query(None, description="Name prefix"),
+    view: ListView = Query(ListView.FULL, description="summary omits config"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all virtual machines"""
+    """
+    List virtual machines, newest first.
+
+    The next page's cursor is returned in X-Next-Cursor and an approximate
+    total of matching VMs in X-Total-Count. `view=summary` or `fields`
+    select only those columns and return them without model validation.
+    """
     vm_service = VMService(db)
-    vms = await vm_service.list_vms(skip=skip, limit=limit, provider=provider)
-    return vms
+    columns = resolve_fields(fields, view == ListView.SUMMARY, VMService.SUMMARY_FIELDS, VMService.LIST_FIELDS)
+    page = await vm_service.list_vms(
+        limit=limit, cursor=cursor, provider=provider, state=state, name=name, columns=columns
+    )
+    if columns:
+        return rows_response(page)
+    set_page_headers(response, page)
+    return page.items
 
 
 @router.get("/{vm_id}", response_model=VMResponse)
-async def get_vm(vm_id: int, db: Session = Depends(get_db)):
+async def get_vm(vm_id: int, db: AsyncSession = Depends(get_db)):
     """Get virtual machine details"""
     vm_service = VMService(db)
     vm = await vm_service.get_vm(vm_id)
@@ -47,42 +91,95 @@ async def get_vm(vm_id: int, db: Session = Depends(get_db)):
 @router.post("/{vm_id}/start")
 async def start_vm(
     vm_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Start a virtual machine"""
     vm_service = VMService(db)
-    result = await vm_service.start_vm(vm_id, background_tasks)
+    result = await vm_service.start_vm(vm_id)
     return result
 
 
 @router.post("/{vm_id}/stop")
 async def stop_vm(
     vm_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Stop a virtual machine"""
     vm_service = VMService(db)
-    result = await vm_service.stop_vm(vm_id, background_tasks)
+    result = await vm_service.stop_vm(vm_id)
     return result
 
 
 @router.delete("/{vm_id}")
 async def delete_vm(
     vm_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a virtual machine"""
     vm_service = VMService(db)
-    result = await vm_service.delete_vm(vm_id, background_tasks)
+    result = await vm_service.delete_vm(vm_id)
     return result
 
 
 @router.get("/{vm_id}/status", response_model=VMStatus)
-async def get_vm_status(vm_id: int, db: Session = Depends(get_db)):
+async def get_vm_status(
+    vm_id: int,
+    fresh: bool = Query(False, description="Query the provider instead of the status snapshot"),
+    db: AsyncSession = Depends(get_db)
+):
     """Get virtual machine status"""
     vm_service = VMService(db)
-    status = await vm_service.get_vm_status(vm_id)
+    status = await vm_service.get_vm_status(vm_id, fresh=fresh)
     return status
+
+
+@router.get("/{vm_id}/operations", response_model=List[OperationResponse])
+async def list_vm_operations(
+    vm_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=settings.LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List a virtual machine's operations, newest first"""
+    operation_service = OperationService(db)
+    page = await operation_service.list_operations(vm_id, limit=limit, cursor=cursor)
+    set_page_headers(response, page)
+    return page.items
+
+
+@router.get("/{vm_id}/operations/{operation_id}/logs", response_model=OperationLogResponse)
+async def get_operation_logs(
+    vm_id: int,
+    operation_id: str,
+    since: Optional[str] = Query(None, description="Return entries after this entry ID"),
+    tail: Optional[int] = Query(None, ge=1, le=settings.OPERATION_LOG_MAX_LINES, description="Return the last N entries"),
+    limit: int = Query(500, ge=1, le=5000),
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for new entries when there are none"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Read the log of a VM operation, by operation ID or Celery task ID.
+
+    Follow a running operation by passing the previous response's `next`
+    as `since`, with `wait` to long-poll, until `done` is true.
+    """
+    # Redis rejects malformed IDs (and parts over 64 bits) with an error, not an empty read
+    if since is not None and (
+        not STREAM_ID_RE.fullmatch(since) or any(int(part) >= 2 ** 64 for part in since.split("-"))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid 'since' entry ID")
+
+    task_id = operation_id
+    if operation_id.isdigit():
+        operation = await OperationService(db).get_operation(int(operation_id))
+        if not operation or operation.vm_id != vm_id:
+            raise HTTPException(status_code=404, detail="Operation not found")
+        task_id = operation.task_id
+        # Don't hold a pooled connection while long-polling Redis
+        await db.rollback()
+
+    log = await read_operation_log(vm_id, task_id, since=since, tail=tail, limit=limit, wait=wait)
+    if log is None:
+        raise HTTPException(status_code=404, detail="Operation log not found")
+    return log
@@ -1,9 +1,57 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import register_engine
 
+# Sync drivers mapped to their asyncio counterparts
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url() -> str:
+    """Resolve the database URL used by the async engine"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+
+    url = make_url(settings.DATABASE_URL)
+    driver = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _pool_options(url: str) -> dict:
+    """Connection pool sizing (SQLite uses a single-connection pool)"""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+
+
+# Async engine used by the API request path
+async_engine = create_async_engine(
+    get_async_database_url(),
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+    **_pool_options(get_async_database_url())
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Sync engine kept for Celery workers, which run outside the event loop
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
@@ -12,13 +60,13 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+register_engine("async", async_engine.sync_engine)
+register_engine("sync", engine)
+
 Base = declarative_base()
 
 
-def get_db():
-    """Database session dependency"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Async database session dependency"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
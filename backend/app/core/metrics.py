@@ -0,0 +1,191 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+import functools
+import time
+
+from prometheus_client import REGISTRY, Counter, Histogram, start_http_server
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from app.core.config import settings
+
+# Provider calls and tasks range from milliseconds (API listings) to
+# many minutes (VM creation)
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+HTTP_REQUESTS = Counter(
+    "gaia_http_requests_total", "API requests", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "gaia_http_request_duration_seconds", "API request latency", ["method", "route"]
+)
+PROVIDER_CALL_DURATION = Histogram(
+    "gaia_provider_call_duration_seconds", "Provider method latency",
+    ["provider", "method", "outcome"], buckets=SLOW_BUCKETS
+)
+PROCESS_SPAWNS = Counter(
+    "gaia_provider_process_spawns_total", "Provider CLI processes run",
+    ["provider", "program", "outcome"]
+)
+PROCESS_DURATION = Histogram(
+    "gaia_provider_process_duration_seconds", "Provider CLI process run time",
+    ["provider", "program"], buckets=SLOW_BUCKETS
+)
+CELERY_TASK_DURATION = Histogram(
+    "gaia_celery_task_duration_seconds", "Celery task run time",
+    ["task", "state"], buckets=SLOW_BUCKETS
+)
+DB_POOL_CHECKOUTS = Counter(
+    "gaia_db_pool_checkouts_total", "Connections checked out of the SQLAlchemy pool", ["engine"]
+)
+
+# BaseProvider methods timed for every provider
+PROVIDER_METHODS = (
+    "check_status", "create_vm", "start_vm", "stop_vm", "delete_vm",
+    "get_vm_status", "list_vms", "get_vm_statuses", "warm",
+)
+
+
+def instrument_provider_method(provider: str, method: str, func: Callable) -> Callable:
+    """
+    Time an async provider method.
+
+    outcome is "error" when it raises and "failed" when it returns False
+    (how start/stop/delete report failure), otherwise "ok".
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await func(*args, **kwargs)
+            outcome = "failed" if result is False else "ok"
+            return result
+        finally:
+            PROVIDER_CALL_DURATION.labels(provider, method, outcome).observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class _CacheCollector(Collector):
+    """Entries, hits and misses of the caches registered with register_cache"""
+
+    def __init__(self):
+        self.sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def collect(self) -> Iterator:
+        entries = GaugeMetricFamily("gaia_cache_entries", "Entries held by an in-process cache", labels=["cache"])
+        hits = CounterMetricFamily("gaia_cache_hits", "Cache lookups that hit", labels=["cache"])
+        misses = CounterMetricFamily("gaia_cache_misses", "Cache lookups that missed", labels=["cache"])
+        for name, stats in list(self.sources.items()):
+            values = stats()
+            if values.get("size") is not None:
+                entries.add_metric([name], values["size"])
+            hits.add_metric([name], values.get("hits", 0))
+            misses.add_metric([name], values.get("misses", 0))
+        yield entries
+        yield hits
+        yield misses
+
+
+class _PoolCollector(Collector):
+    """Size, checked-out and overflow connections of registered SQLAlchemy pools"""
+
+    def __init__(self):
+        self.pools: Dict[str, Any] = {}
+
+    def collect(self) -> Iterator:
+        size = GaugeMetricFamily("gaia_db_pool_size", "Configured pool size", labels=["engine"])
+        checked_out = GaugeMetricFamily("gaia_db_pool_checked_out", "Connections in use", labels=["engine"])
+        overflow = GaugeMetricFamily("gaia_db_pool_overflow", "Connections open beyond the pool size", labels=["engine"])
+        for name, pool in list(self.pools.items()):
+            # Only queue pools report these; SQLite's pools do not
+            if hasattr(pool, "checkedout"):
+                size.add_metric([name], pool.size())
+                checked_out.add_metric([name], pool.checkedout())
+                overflow.add_metric([name], max(pool.overflow(), 0))
+        yield size
+        yield checked_out
+        yield overflow
+
+
+class QueueDepthCollector(Collector):
+    """
+    Messages waiting in each Celery queue, read from the Redis broker.
+
+    Collected on scrape with one pipelined LLEN per queue; register it in
+    one process only (the API), not in every worker.
+    """
+
+    def __init__(self, broker_url: str, queues: Callable[[], Iterable[str]]):
+        self.broker_url = broker_url
+        self.queues = queues
+        self._client = None
+
+    def describe(self) -> Iterator:
+        # Lets the registry check names without a Redis round-trip
+        yield GaugeMetricFamily("gaia_celery_queue_depth", "Tasks waiting in a Celery queue", labels=["queue"])
+
+    def collect(self) -> Iterator:
+        depth = GaugeMetricFamily("gaia_celery_queue_depth", "Tasks waiting in a Celery queue", labels=["queue"])
+        try:
+            if self._client is None:
+                import redis
+                self._client = redis.Redis.from_url(self.broker_url, socket_timeout=2)
+            names = list(self.queues())
+            pipe = self._client.pipeline(transaction=False)
+            for name in names:
+                pipe.llen(name)
+            for name, length in zip(names, pipe.execute()):
+                depth.add_metric([name], length)
+        except Exception as e:
+            print(f"Error reading Celery queue depth: {e}")
+        yield depth
+
+
+_caches = _CacheCollector()
+_pools = _PoolCollector()
+REGISTRY.register(_caches)
+REGISTRY.register(_pools)
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    """Export a cache's stats() (size, hits, misses) under name"""
+    _caches.sources[name] = stats
+
+
+def register_engine(name: str, engine) -> None:
+    """Export pool usage of a (sync) SQLAlchemy engine and count its checkouts"""
+    from sqlalchemy import event
+
+    checkouts = DB_POOL_CHECKOUTS.labels(name)
+    event.listen(engine, "checkout", lambda *args: checkouts.inc())
+    _pools.pools[name] = engine.pool
+
+
+def observe_process(provider: str, program: str, seconds: float, outcome: str) -> None:
+    PROCESS_SPAWNS.labels(provider, program, outcome).inc()
+    PROCESS_DURATION.labels(provider, program).observe(seconds)
+
+
+def start_worker_exporter(index: int = 0) -> Optional[int]:
+    """
+    Serve this worker process's metrics over HTTP.
+
+    Each prefork child listens on METRICS_WORKER_PORT + its pool index, so
+    children don't collide; returns the port, or None when disabled.
+    """
+    if not settings.METRICS_ENABLED or not settings.METRICS_WORKER_PORT:
+        return None
+    port = settings.METRICS_WORKER_PORT + index
+    try:
+        start_http_server(port)
+    except OSError as e:
+        print(f"Could not start metrics exporter on port {port}: {e}")
+        return None
+    return port
+
+
+def route_label(scope: Dict[str, Any]) -> str:
+    """The matched route's path template, so IDs don't explode label cardinality"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
@@ -0,0 +1,32 @@
+from typing import Optional
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Get the process-wide Redis client (for Celery workers and sync code)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """Get the process-wide asyncio Redis client (for the API)"""
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_client
+
+
+async def close_async_redis() -> None:
+    """Close the asyncio Redis client"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
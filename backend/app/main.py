@@ -1,10 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import async_engine, engine
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS, QueueDepthCollector, route_label
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.core.redis import close_async_redis
+from app.services.events import event_broker
+from app.services.template_import import shutdown_parse_pool
+from app.services.template_library import template_library
 from app.api import api_router
+from app.services.providers.base import ProviderRegistry
+from app.tasks.celery_app import queue_names
 
 
 @asynccontextmanager
@@ -12,14 +24,34 @@ async def lifespan(app: FastAPI):
     """Lifespan events for application startup and shutdown"""
     # Startup
     print("🚀 Starting HAA-Gaia Backend...")
-    # Create database tables
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database initialized")
+    # The schema is managed by Alembic (`alembic upgrade head`), not created here
+
+    # Index the curated YAML templates and keep them in sync with the directory
+    print(f"📚 Template library loaded: {await asyncio.to_thread(template_library.refresh)}")
+    library_watcher = None
+    if settings.TEMPLATE_LIBRARY_RELOAD_INTERVAL > 0:
+        library_watcher = asyncio.create_task(template_library.watch(settings.TEMPLATE_LIBRARY_RELOAD_INTERVAL))
+
+    # Authenticate pooled provider clients without delaying startup
+    provider_warmer = None
+    if settings.PROVIDER_PREWARM:
+        provider_warmer = asyncio.create_task(ProviderRegistry.warm_providers())
 
     yield
 
     # Shutdown
     print("👋 Shutting down HAA-Gaia Backend...")
+    background = [task for task in (library_watcher, provider_warmer) if task is not None]
+    for task in background:
+        task.cancel()
+    # Let them finish unwinding before the providers and connections they use are closed
+    await asyncio.gather(*background, return_exceptions=True)
+    await event_broker.stop()
+    await ProviderRegistry.close_providers()
+    shutdown_parse_pool()
+    await close_async_redis()
+    await async_engine.dispose()
+    engine.dispose()
 
 
 app = FastAPI(
@@ -36,11 +68,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+if settings.METRICS_ENABLED:
+    # Workers consume the queues; the API reports how deep they are
+    REGISTRY.register(QueueDepthCollector(settings.CELERY_BROKER_URL, queue_names))
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        """Count and time requests by route template"""
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = route_label(request.scope)
+            HTTP_REQUESTS.labels(request.method, route, str(status)).inc()
+            HTTP_REQUEST_DURATION.labels(request.method, route).observe(time.perf_counter() - started)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics of this API process"""
+        # Collecting reads queue depth from Redis; keep it off the event loop
+        return Response(await asyncio.to_thread(generate_latest, REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
 
 @app.get("/")
 async def root():
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Index, Enum as SQLEnum
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.schemas.operation import OperationState, OperationType
+
+
+class Operation(Base):
+    """
+    One queued VM lifecycle operation.
+
+    Written by the API when the operation is queued and by the worker as
+    it starts and finishes. There is deliberately no foreign key to the VM:
+    a delete operation outlives its VM.
+    """
+    __tablename__ = "operations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vm_id = Column(Integer, nullable=False)
+    provider = Column(String(50), nullable=False)
+    type = Column(SQLEnum(OperationType), nullable=False)
+    state = Column(SQLEnum(OperationState), default=OperationState.QUEUED, nullable=False)
+    task_id = Column(String(155), nullable=False, unique=True, index=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+
+    __table_args__ = (
+        # A VM's operations, newest first (keyset pagination)
+        Index("ix_operations_vm_id_created_at", vm_id, created_at, id),
+        # Latency statistics per provider and type
+        Index("ix_operations_provider_type_finished_at", provider, type, finished_at),
+    )
+
+    def __repr__(self):
+        return f"<Operation(id={self.id}, vm_id={self.vm_id}, type='{self.type}', state='{self.state}')>"
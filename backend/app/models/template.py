@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, ARRAY
+from sqlalchemy import Column, Computed, Integer, String, DateTime, JSON, Boolean, Index
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from datetime import datetime
 
 from app.core.database import Base
 
+# Text search configuration for template search; 'simple' neither stems
+# nor drops stop words, so prefix matching behaves predictably while typing
+SEARCH_CONFIG = "simple"
+
 
 class Template(Base):
     """VM Template model"""
@@ -15,12 +21,31 @@ class Template(Base):
     provider = Column(String(50), nullable=False, index=True)
     config = Column(JSON, nullable=False, default={})
     vagrantfile_template = Column(String, nullable=True)
+    # sha256 of vagrantfile_template, used to skip duplicate imports
+    content_hash = Column(String(64), nullable=True, index=True)
     is_public = Column(Boolean, default=False, nullable=False)
     tags = Column(ARRAY(String), nullable=False, default=[])
     usage_count = Column(Integer, default=0, nullable=False)
+    # Maintained by PostgreSQL; name terms rank above description terms
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+        persisted=True
+    )))
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    __table_args__ = (
+        # Keyset pagination, newest first, unfiltered and filtered by provider
+        Index("ix_templates_created_at_id", created_at, id),
+        Index("ix_templates_provider_created_at", provider, created_at, id),
+        # Name prefix filters (LIKE 'prefix%') regardless of collation
+        Index("ix_templates_name_prefix", name, postgresql_ops={"name": "text_pattern_ops"}),
+        # Tag containment and overlap (tags @> / && ARRAY[...])
+        Index("ix_templates_tags", tags, postgresql_using="gin"),
+        Index("ix_templates_search_vector", search_vector, postgresql_using="gin"),
+    )
+
     def __repr__(self):
         return f"<Template(id={self.id}, name='{self.name}', provider='{self.provider}')>"
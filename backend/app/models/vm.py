@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -22,5 +22,14 @@ class VirtualMachine(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+    __table_args__ = (
+        # Keyset pagination, newest first, unfiltered and filtered by provider/state
+        Index("ix_virtual_machines_created_at_id", created_at, id),
+        Index("ix_virtual_machines_provider_state_created_at", provider, state, created_at, id),
+        Index("ix_virtual_machines_state_created_at", state, created_at, id),
+        # Name prefix filters (LIKE 'prefix%') regardless of collation
+        Index("ix_virtual_machines_name_prefix", name, postgresql_ops={"name": "text_pattern_ops"}),
+    )
+
     def __repr__(self):
         return f"<VirtualMachine(id={self.id}, name='{self.name}', provider='{self.provider}', state='{self.state}')>"
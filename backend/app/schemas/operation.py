@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+
+class OperationType(str, Enum):
+    """VM lifecycle operations run by workers"""
+    CREATE = "create"
+    START = "start"
+    STOP = "stop"
+    DELETE = "delete"
+
+
+class OperationState(str, Enum):
+    """Operation progress"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    @property
+    def finished(self) -> bool:
+        return self in (OperationState.SUCCEEDED, OperationState.FAILED)
+
+
+class OperationResponse(BaseModel):
+    """Schema for operation response"""
+    id: int
+    vm_id: int
+    provider: str
+    type: OperationType
+    state: OperationState
+    task_id: str = Field(..., description="Celery task ID; also keys the operation's log")
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class OperationStats(BaseModel):
+    """Latency of finished operations of one type on one provider"""
+    provider: str
+    type: OperationType
+    count: int
+    failed: int
+    avg_seconds: Optional[float] = None
+    p50_seconds: Optional[float] = None
+    p95_seconds: Optional[float] = None
+    max_seconds: Optional[float] = None
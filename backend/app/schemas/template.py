@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -30,3 +30,44 @@ class TemplateResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TemplateSearchResult(BaseModel):
+    """Schema for a template search hit"""
+    id: int
+    name: str
+    description: Optional[str]
+    provider: str
+    is_public: bool
+    tags: List[str]
+    usage_count: int = 0
+    rank: Optional[float] = Field(None, description="Text match rank, when searching by text")
+
+
+class LibraryTemplateResponse(BaseModel):
+    """Schema for a curated template loaded from the YAML library"""
+    slug: str = Field(..., description="File name without extension")
+    name: str
+    description: Optional[str] = None
+    provider: str
+    config: Dict[str, Any] = Field(default_factory=dict)
+    vagrantfile_template: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+
+
+class TemplateImportEntry(BaseModel):
+    """Result for one archive entry of a bulk import"""
+    path: str
+    status: str = Field(..., description="created, duplicate or failed")
+    template_id: Optional[int] = Field(None, description="Created template, or the existing one for duplicates")
+    name: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TemplateBulkImportResponse(BaseModel):
+    """Schema for bulk import results"""
+    total: int
+    created: int
+    duplicates: int
+    failed: int
+    entries: List[TemplateImportEntry]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 from enum import Enum
 
@@ -36,11 +36,70 @@ class VMResponse(BaseModel):
     vagrantfile_path: Optional[str]
     created_at: datetime
     updated_at: datetime
+    task_id: Optional[str] = Field(None, description="Celery task ID of the queued operation")
+    operation_id: Optional[int] = Field(None, description="ID of the queued operation (GET /operations/{id})")
 
     class Config:
         from_attributes = True
 
 
+class VMBatchCreate(BaseModel):
+    """Schema for creating many VMs from one template or config"""
+    provider: str = Field(..., description="Provider name (e.g., 'proxmox', 'virtualbox')")
+    count: int = Field(..., ge=1, description="Number of VMs to create")
+    name_pattern: str = Field(
+        ..., min_length=1, max_length=255,
+        description="VM name pattern with an {index} field, e.g. 'lab-{index:02d}'"
+    )
+    start_index: int = Field(1, ge=0, description="Index of the first VM")
+    template_id: Optional[int] = Field(None, description="Template ID to use")
+    config: Dict[str, Any] = Field(default_factory=dict, description="VM configuration, merged over the template's")
+    vagrantfile_content: Optional[str] = Field(None, description="Raw Vagrantfile content shared by every VM")
+    description: Optional[str] = Field(None, max_length=500)
+    concurrency: Optional[int] = Field(
+        None, ge=1, description="VMs created at once (defaults to the provider queue's concurrency)"
+    )
+
+
+class VMBatchResponse(BaseModel):
+    """Schema for a queued VM batch"""
+    batch_id: str
+    provider: str
+    vm_ids: List[int]
+    concurrency: int
+    operation_ids: Dict[int, int] = Field(default_factory=dict, description="Create operation ID per VM")
+
+
+class VMBatchProgress(BaseModel):
+    """Aggregate progress of a VM batch"""
+    batch_id: str
+    provider: str
+    total: int
+    pending: int
+    succeeded: int
+    failed: int
+    done: bool
+    states: Dict[str, int] = Field(default_factory=dict, description="VM count per state")
+
+
+class OperationLogEntry(BaseModel):
+    """One line of an operation log"""
+    id: str = Field(..., description="Stream entry ID; pass as `since` to read what follows")
+    stream: str = Field(..., description="stdout, stderr, progress, error or end")
+    line: str
+    timestamp: float
+
+
+class OperationLogResponse(BaseModel):
+    """A range of an operation's log"""
+    vm_id: int
+    operation_id: str
+    entries: List[OperationLogEntry]
+    next: Optional[str] = Field(None, description="`since` value for the next read")
+    done: bool
+    status: Optional[str] = Field(None, description="Final status once the operation has finished")
+
+
 class VMStatus(BaseModel):
     """Schema for VM status"""
     id: int
@@ -0,0 +1,164 @@
+from typing import Dict, Any, Optional, Set, Iterable
+import asyncio
+import json
+import time
+
+from app.core.config import settings
+from app.core.redis import get_redis, get_async_redis
+
+EVENTS_CHANNEL = "gaia:events"
+
+
+def _build_event(event_type: str, vm_id: Optional[int], provider: Optional[str], data: Dict[str, Any]) -> str:
+    return json.dumps({
+        "type": event_type,
+        "vm_id": vm_id,
+        "provider": provider,
+        "data": data,
+        "timestamp": time.time()
+    }, default=str)
+
+
+def publish_event(event_type: str, vm_id: Optional[int] = None, provider: Optional[str] = None, **data) -> None:
+    """Publish an event from sync code (Celery tasks); never raises"""
+    try:
+        get_redis().publish(EVENTS_CHANNEL, _build_event(event_type, vm_id, provider, data))
+    except Exception as e:
+        print(f"Error publishing event '{event_type}': {e}")
+
+
+async def apublish_event(event_type: str, vm_id: Optional[int] = None, provider: Optional[str] = None, **data) -> None:
+    """Publish an event from the API; never raises"""
+    try:
+        await get_async_redis().publish(EVENTS_CHANNEL, _build_event(event_type, vm_id, provider, data))
+    except Exception as e:
+        print(f"Error publishing event '{event_type}': {e}")
+
+
+class Subscription:
+    """
+    One client's view of the event stream.
+
+    Events are buffered in a bounded queue. When the client falls behind,
+    the oldest events are dropped and a `lagged` notice is delivered
+    before the next event; a client that keeps lagging is disconnected.
+    """
+
+    def __init__(self, vm_ids: Iterable[int] = (), providers: Iterable[str] = ()):
+        self.vm_ids: Set[int] = set(vm_ids)
+        self.providers: Set[str] = set(providers)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        self.dropped = 0
+        self.total_dropped = 0
+        self.closed = False
+
+    def set_filters(self, vm_ids: Iterable[int] = (), providers: Iterable[str] = ()) -> None:
+        self.vm_ids = set(vm_ids)
+        self.providers = set(providers)
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.vm_ids and event.get("vm_id") not in self.vm_ids:
+            return False
+        if self.providers and event.get("provider") not in self.providers:
+            return False
+        return True
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Enqueue without blocking the broker"""
+        if self.closed:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            self.total_dropped += 1
+            if self.total_dropped > settings.EVENTS_MAX_DROPPED:
+                self.close()
+                return
+        self.queue.put_nowait(event)
+
+    def close(self) -> None:
+        self.closed = True
+        # Wake up the consumer so it notices
+        while self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def get(self) -> Optional[Dict[str, Any]]:
+        """Next event, a lag notice, or None once the subscription is closed"""
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return {"type": "lagged", "data": {"dropped": dropped}, "timestamp": time.time()}
+
+        event = await self.queue.get()
+        if event is None or self.closed:
+            return None
+        return event
+
+
+class EventBroker:
+    """
+    Fans out the Redis event channel to local subscribers.
+
+    Each API process holds a single Redis subscription no matter how many
+    clients are connected.
+    """
+
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, vm_ids: Iterable[int] = (), providers: Iterable[str] = ()) -> Subscription:
+        subscription = Subscription(vm_ids, providers)
+        self._subscriptions.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._pump())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        subscription.closed = True
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscription in list(self._subscriptions):
+            subscription.close()
+        self._subscriptions.clear()
+
+    async def _pump(self) -> None:
+        """Read the channel until there are no subscribers left; reconnect on errors"""
+        while self._subscriptions:
+            pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                while self._subscriptions:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    try:
+                        event = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    for subscription in list(self._subscriptions):
+                        if subscription.closed:
+                            self._subscriptions.discard(subscription)
+                        elif subscription.matches(event):
+                            subscription.offer(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Event stream error, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+event_broker = EventBroker()
@@ -0,0 +1,175 @@
+from contextvars import ContextVar
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+import asyncio
+import threading
+import time
+
+from app.core.config import settings
+from app.core.redis import get_redis, get_async_redis
+
+T = TypeVar("T")
+
+OPERATION_LOG_KEY = "gaia:oplog:{vm_id}:{operation_id}"
+
+# Stream of the entry that closes a log; its line is the final status
+END_STREAM = "end"
+
+# Lines waiting this long (or this many) are written in one round-trip
+FLUSH_DELAY = 0.2
+FLUSH_LINES = 100
+
+
+class OperationLog:
+    """
+    Writer for one operation's log, a capped Redis stream.
+
+    Entries carry a stream name (stdout, stderr, progress, error, end),
+    the line and a timestamp. Provider command output arrives on the
+    worker's event loop and is flushed in small batches shortly after it
+    is written, on the loop's executor, so a chatty command costs a few
+    round-trips per second rather than one per line and never blocks the
+    loop. Writes never raise.
+    """
+
+    def __init__(self, vm_id: int, operation_id: str, operation: str):
+        self.vm_id = vm_id
+        self.operation_id = operation_id
+        self.operation = operation
+        self.key = OPERATION_LOG_KEY.format(vm_id=vm_id, operation_id=operation_id)
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # Held for a whole flush so batches reach Redis in the order written
+        self._flush_lock = threading.Lock()
+        self._flush_scheduled = False
+
+    def write(self, line: str, stream: str = "progress") -> None:
+        """Append a line; flushed at once outside an event loop, soon after inside one"""
+        with self._lock:
+            self._pending.append({"stream": stream, "line": line, "ts": f"{time.time():.3f}"})
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                # The Redis client is synchronous: flush on the loop's
+                # executor so the round-trip doesn't block the loop
+                if len(self._pending) == FLUSH_LINES:
+                    self._flush_scheduled = True
+                    loop.run_in_executor(None, self.flush)
+                elif not self._flush_scheduled:
+                    self._flush_scheduled = True
+                    loop.call_later(FLUSH_DELAY, loop.run_in_executor, None, self.flush)
+                return
+        self.flush()
+
+    def on_line(self, stream: str, line: str) -> None:
+        """Line handler for provider command output (see providers.process.run_command)"""
+        self.write(line, stream)
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+                self._flush_scheduled = False
+            if not entries:
+                return
+
+            try:
+                pipe = get_redis().pipeline(transaction=False)
+                for entry in entries:
+                    pipe.xadd(self.key, entry, maxlen=settings.OPERATION_LOG_MAX_LINES, approximate=True)
+                pipe.expire(self.key, settings.OPERATION_LOG_TTL)
+                pipe.execute()
+            except Exception as e:
+                print(f"Error writing operation log {self.key}: {e}")
+
+    def close(self, status: str) -> None:
+        """Write the closing entry with the operation's final status"""
+        self.write(status, END_STREAM)
+        self.flush()
+
+    async def attach(self, coro: Awaitable[T]) -> T:
+        """
+        Await coro with this log as the current operation log.
+
+        Wrap coroutines handed to the worker runtime with this: they run
+        in the runtime loop's context, not the submitting task's.
+        """
+        token = current_operation_log.set(self)
+        try:
+            return await coro
+        finally:
+            current_operation_log.reset(token)
+
+
+current_operation_log: ContextVar[Optional[OperationLog]] = ContextVar("current_operation_log", default=None)
+
+
+def log_progress(line: str) -> None:
+    """Add a progress line to the current operation's log, if any"""
+    log = current_operation_log.get()
+    if log is not None:
+        log.write(line)
+
+
+def log_error(message: str) -> None:
+    """Print an error and add it to the current operation's log, if any"""
+    print(message)
+    log = current_operation_log.get()
+    if log is not None:
+        log.write(message, "error")
+
+
+def _entry(entry_id: str, fields: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "id": entry_id,
+        "stream": fields.get("stream"),
+        "line": fields.get("line", ""),
+        "timestamp": float(fields.get("ts") or 0),
+    }
+
+
+async def read_operation_log(
+    vm_id: int,
+    operation_id: str,
+    since: Optional[str] = None,
+    tail: Optional[int] = None,
+    limit: int = 500,
+    wait: float = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Read entries of an operation's log, or None if there is none.
+
+    since returns entries after that entry id (a range read); tail returns
+    the last tail entries; otherwise entries are read from the start. Up
+    to limit entries are returned, and next is the id to pass as since for
+    the following read. With wait, an empty range read blocks up to that
+    many seconds for new entries, so followers can long-poll.
+    """
+    redis = get_async_redis()
+    key = OPERATION_LOG_KEY.format(vm_id=vm_id, operation_id=operation_id)
+
+    if tail:
+        raw = list(reversed(await redis.xrevrange(key, count=min(tail, limit))))
+    else:
+        raw = await redis.xrange(key, min=f"({since}" if since else "-", count=limit)
+        if not raw and wait:
+            if not await redis.exists(key):
+                return None
+            streams = await redis.xread({key: since or "0-0"}, count=limit, block=int(wait * 1000))
+            raw = streams[0][1] if streams else []
+
+    last = await redis.xrevrange(key, count=1)
+    if not raw and not last:
+        return None
+
+    entries = [_entry(entry_id, fields) for entry_id, fields in raw]
+    done = bool(last) and last[0][1].get("stream") == END_STREAM
+    return {
+        "vm_id": vm_id,
+        "operation_id": operation_id,
+        "entries": entries,
+        "next": entries[-1]["id"] if entries else since,
+        "done": done,
+        "status": last[0][1].get("line") if done else None,
+    }
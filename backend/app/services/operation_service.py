@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+
+from celery import uuid
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import Page, paginate
+from app.models.operation import Operation
+from app.schemas.operation import OperationState, OperationStats, OperationType
+
+
+class OperationService:
+    """Service for VM lifecycle operations (API side)"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def queue(self, vm_id: int, provider: str, operation_type: OperationType) -> Operation:
+        """
+        Add a queued operation to the session with a fresh Celery task ID.
+
+        The caller commits before dispatching the task under that ID, so
+        the worker always finds the row.
+        """
+        operation = Operation(
+            vm_id=vm_id,
+            provider=provider,
+            type=operation_type,
+            state=OperationState.QUEUED,
+            task_id=uuid()
+        )
+        self.db.add(operation)
+        return operation
+
+    async def queue_many(self, vm_ids: List[int], provider: str, operation_type: OperationType) -> Dict[int, Tuple[int, str]]:
+        """Insert queued operations for many VMs in one statement; returns (id, task ID) by VM"""
+        result = await self.db.execute(
+            insert(Operation)
+            .values([
+                {
+                    "vm_id": vm_id,
+                    "provider": provider,
+                    "type": operation_type,
+                    "state": OperationState.QUEUED,
+                    "task_id": uuid(),
+                }
+                for vm_id in vm_ids
+            ])
+            .returning(Operation.vm_id, Operation.id, Operation.task_id)
+        )
+        return {vm_id: (operation_id, task_id) for vm_id, operation_id, task_id in result.all()}
+
+    async def get_operation(self, operation_id: int) -> Optional[Operation]:
+        """Get an operation by ID (a primary key lookup)"""
+        return await self.db.get(Operation, operation_id)
+
+    async def list_operations(self, vm_id: int, limit: int = 50, cursor: Optional[str] = None) -> Page:
+        """A VM's operations, newest first"""
+        query = select(Operation).where(Operation.vm_id == vm_id)
+        return await paginate(self.db, query, Operation, limit, cursor)
+
+    async def get_stats(
+        self,
+        provider: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> List[OperationStats]:
+        """Latency percentiles of finished operations per provider and type"""
+        duration = Operation.duration_seconds
+        query = (
+            select(
+                Operation.provider,
+                Operation.type,
+                func.count(),
+                func.count(case((Operation.state == OperationState.FAILED, 1))),
+                func.avg(duration),
+                func.percentile_cont(0.5).within_group(duration),
+                func.percentile_cont(0.95).within_group(duration),
+                func.max(duration),
+            )
+            .where(Operation.finished_at.is_not(None))
+            .group_by(Operation.provider, Operation.type)
+            .order_by(Operation.provider, Operation.type)
+        )
+        if provider:
+            query = query.where(Operation.provider == provider)
+        if since:
+            query = query.where(Operation.finished_at >= since)
+
+        result = await self.db.execute(query)
+        return [
+            OperationStats(
+                provider=row_provider, type=row_type, count=count, failed=failed,
+                avg_seconds=avg, p50_seconds=p50, p95_seconds=p95, max_seconds=longest
+            )
+            for row_provider, row_type, count, failed, avg, p50, p95, longest in result.all()
+        ]
+
+
+def mark_operation_started(
+    db,
+    task_id: str,
+    vm_id: int,
+    provider: str,
+    operation_type: OperationType
+) -> datetime:
+    """
+    Record that a worker picked up an operation; returns the start time.
+
+    Runs in a Celery worker with a sync session. Tasks queued without a
+    row (e.g. from a shell) get one here.
+    """
+    started_at = datetime.now(timezone.utc)
+    result = db.execute(
+        update(Operation)
+        .where(Operation.task_id == task_id)
+        .values(state=OperationState.RUNNING, started_at=started_at)
+    )
+    if not result.rowcount:
+        db.add(Operation(
+            vm_id=vm_id,
+            provider=provider,
+            type=operation_type,
+            state=OperationState.RUNNING,
+            task_id=task_id,
+            started_at=started_at
+        ))
+    db.commit()
+    return started_at
+
+
+def mark_operation_finished(
+    db,
+    task_id: str,
+    started_at: Optional[datetime],
+    state: OperationState,
+    error: Optional[str] = None
+) -> None:
+    """Record an operation's outcome and duration; never raises"""
+    finished_at = datetime.now(timezone.utc)
+    try:
+        db.execute(
+            update(Operation)
+            .where(Operation.task_id == task_id)
+            .values(
+                state=state,
+                error=error,
+                finished_at=finished_at,
+                duration_seconds=(finished_at - started_at).total_seconds() if started_at else None
+            )
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error recording outcome of operation {task_id}: {e}")
@@ -1,13 +1,15 @@
-# Import all providers to trigger their registration
-from app.services.providers.proxmox import ProxmoxProvider
-from app.services.providers.virtualbox import VirtualBoxProvider
-from app.services.providers.hyperv import HyperVProvider
-from app.services.providers.wsl import WSLProvider
-
-# Export for convenience
-__all__ = [
-    'ProxmoxProvider',
-    'VirtualBoxProvider',
-    'HyperVProvider',
-    'WSLProvider',
-]
+# Provider modules are imported on first use (see ProviderRegistry); the
+# classes are still importable from here, lazily
+import importlib
+
+from app.services.providers.base import BUILTIN_PROVIDERS
+
+_EXPORTS = {spec.partition(':')[2]: spec.partition(':')[0] for spec in BUILTIN_PROVIDERS.values()}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
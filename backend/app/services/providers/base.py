@@ -1,7 +1,23 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional, List
+from importlib.metadata import entry_points
+import asyncio
+import importlib
+import threading
+from app.core.metrics import PROVIDER_METHODS, instrument_provider_method
 from app.schemas.provider import ProviderInfo, ProviderStatus, ProviderType
 
+# Entry point group through which installed packages add providers
+PROVIDER_ENTRY_POINT_GROUP = "haa_gaia.providers"
+
+# Providers shipped with the backend, imported on first use
+BUILTIN_PROVIDERS = {
+    "proxmox": "app.services.providers.proxmox:ProxmoxProvider",
+    "virtualbox": "app.services.providers.virtualbox:VirtualBoxProvider",
+    "hyperv": "app.services.providers.hyperv:HyperVProvider",
+    "wsl": "app.services.providers.wsl:WSLProvider",
+}
+
 
 class BaseProvider(ABC):
     """
@@ -11,26 +27,31 @@ class BaseProvider(ABC):
     the unified orchestration interface.
     """
 
-    def __init__(self, config: Dict[str, Any] = None):
-        self.config = config or {}
+    # Identity, read from the class so registering and listing providers
+    # never instantiates them
+    name: str = ""
+    display_name: str = ""
+    provider_type: ProviderType
 
-    @property
-    @abstractmethod
-    def name(self) -> str:
-        """Provider name"""
-        pass
+    def __init_subclass__(cls, **kwargs):
+        """
+        Time each provider's operations (see PROVIDER_METHODS).
 
-    @property
-    @abstractmethod
-    def display_name(self) -> str:
-        """Human-readable provider name"""
-        pass
+        Inherited methods are re-wrapped under the subclass's own name, so
+        calls are always labelled with the provider that made them.
+        """
+        super().__init_subclass__(**kwargs)
+        for method in PROVIDER_METHODS:
+            func = getattr(cls, method, None)
+            if func is None or getattr(func, "__isabstractmethod__", False):
+                continue
+            func = getattr(func, "_provider_method", func)
+            wrapper = instrument_provider_method(cls.name or cls.__name__, method, func)
+            wrapper._provider_method = func
+            setattr(cls, method, wrapper)
 
-    @property
-    @abstractmethod
-    def provider_type(self) -> ProviderType:
-        """Provider type enum"""
-        pass
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
 
     @abstractmethod
     async def check_status(self) -> ProviderStatus:
@@ -83,6 +104,19 @@ class BaseProvider(ABC):
         """List all VMs managed by this provider"""
         pass
 
+    async def get_vm_statuses(self, vm_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get status for many VMs at once.
+
+        The default fans out to get_vm_status concurrently; override in
+        subclass when the backend can report every VM in one call.
+
+        Returns:
+            Dict mapping each requested VM ID to its status dict
+        """
+        statuses = await asyncio.gather(*(self.get_vm_status(vm_id) for vm_id in vm_ids))
+        return dict(zip(vm_ids, statuses))
+
     def get_capabilities(self) -> Dict[str, Any]:
         """
         Get provider capabilities.
@@ -106,59 +140,185 @@ class BaseProvider(ABC):
         """
         return True, None
 
+    @classmethod
+    def connection_key(cls, config: Dict[str, Any] = None) -> str:
+        """
+        Identify the backend connection an instance would use.
+
+        Instances with equal keys share one pooled provider (and its client).
+        By default every instance of a provider shares one: CLI providers
+        hold no connection, and per-VM settings reach them through the
+        method call (create_vm's config), not the pooled instance. Override
+        to key on endpoint and credentials for remote providers.
+        """
+        return ""
+
+    async def warm(self) -> None:
+        """
+        Establish connections ahead of the first operation.
+        Override in subclass for providers with remote sessions.
+        """
+        pass
+
+    async def close(self) -> None:
+        """
+        Release connections and helper processes.
+        Override in subclass for providers that hold them.
+        """
+        pass
+
 
 class ProviderRegistry:
     """
     Registry for all available providers.
     Implements plugin-like architecture for easy provider addition.
+
+    Providers are known by name up front but their modules (and the client
+    libraries they pull in) are only imported the first time the provider
+    is used. Besides BUILTIN_PROVIDERS, installed packages can contribute
+    providers through the PROVIDER_ENTRY_POINT_GROUP entry point group.
     """
 
     _providers: Dict[str, type[BaseProvider]] = {}
+    # Providers not imported yet: name -> "module:Class"
+    _specs: Dict[str, str] = {}
+    _discovered = False
+    _load_lock = threading.Lock()
+    # Long-lived provider instances keyed by (name, connection key)
+    _instances: Dict[tuple[str, str], BaseProvider] = {}
+    _instances_lock = threading.Lock()
 
     @classmethod
     def register(cls, provider_class: type[BaseProvider]):
         """Register a provider class"""
-        # Get an instance to access name property
-        temp_instance = provider_class()
-        cls._providers[temp_instance.name] = provider_class
+        cls._providers[provider_class.name] = provider_class
+        cls._specs.pop(provider_class.name, None)
         return provider_class
 
     @classmethod
-    def get_provider(cls, name: str, config: Dict[str, Any] = None) -> Optional[BaseProvider]:
-        """Get a provider instance by name"""
+    def register_lazy(cls, name: str, spec: str) -> None:
+        """Register a provider by "module:Class", imported on first use"""
+        if name not in cls._providers:
+            cls._specs[name] = spec
+
+    @classmethod
+    def discover(cls) -> None:
+        """Collect built-in and entry point providers without importing them"""
+        if cls._discovered:
+            return
+        with cls._load_lock:
+            if cls._discovered:
+                return
+            for name, spec in BUILTIN_PROVIDERS.items():
+                cls.register_lazy(name, spec)
+            for entry_point in entry_points(group=PROVIDER_ENTRY_POINT_GROUP):
+                cls.register_lazy(entry_point.name, entry_point.value)
+            cls._discovered = True
+
+    @classmethod
+    def names(cls) -> List[str]:
+        """Names of every known provider, loaded or not"""
+        cls.discover()
+        return sorted(set(cls._providers) | set(cls._specs))
+
+    @classmethod
+    def get_provider_class(cls, name: str) -> Optional[type[BaseProvider]]:
+        """Get a provider class, importing its module on first use"""
         provider_class = cls._providers.get(name)
-        if provider_class:
-            return provider_class(config)
-        return None
+        if provider_class is not None:
+            return provider_class
+
+        cls.discover()
+        with cls._load_lock:
+            provider_class = cls._providers.get(name)
+            if provider_class is None:
+                spec = cls._specs.get(name)
+                if spec is None:
+                    return None
+                module_name, _, class_name = spec.partition(':')
+                provider_class = getattr(importlib.import_module(module_name), class_name)
+                cls.register(provider_class)
+        return provider_class
+
+    @classmethod
+    def load_all(cls) -> List[type[BaseProvider]]:
+        """Import every known provider"""
+        return [cls.get_provider_class(name) for name in cls.names()]
+
+    @classmethod
+    def get_provider(cls, name: str, config: Dict[str, Any] = None) -> Optional[BaseProvider]:
+        """
+        Get a pooled provider instance by name.
+
+        Instances live for the lifetime of the process and are shared by
+        every caller using the same endpoint and credentials, so clients,
+        sessions and auth tickets are reused across operations.
+        """
+        provider_class = cls.get_provider_class(name)
+        if not provider_class:
+            return None
+
+        key = (name, provider_class.connection_key(config))
+        provider = cls._instances.get(key)
+        if provider is None:
+            with cls._instances_lock:
+                provider = cls._instances.get(key)
+                if provider is None:
+                    # A provider keyed on its name alone is shared by every
+                    # caller, so it must not keep one caller's config
+                    provider = provider_class(config if key[1] else None)
+                    cls._instances[key] = provider
+        return provider
+
+    @classmethod
+    async def warm_providers(cls) -> None:
+        """Pre-warm the default instance of every registered provider"""
+        # Importing provider modules blocks; keep it off the event loop
+        await asyncio.to_thread(cls.load_all)
+        providers = [cls.get_provider(name) for name in cls.names()]
+        results = await asyncio.gather(
+            *(provider.warm() for provider in providers),
+            return_exceptions=True
+        )
+        for provider, result in zip(providers, results):
+            if isinstance(result, Exception):
+                print(f"Could not pre-warm provider '{provider.name}': {result}")
+
+    @classmethod
+    async def close_providers(cls) -> None:
+        """Close every pooled provider instance"""
+        providers = list(cls._instances.values())
+        await asyncio.gather(
+            *(provider.close() for provider in providers),
+            return_exceptions=True
+        )
+
+    @classmethod
+    def clear_pool(cls) -> None:
+        """Drop all pooled provider instances"""
+        with cls._instances_lock:
+            cls._instances.clear()
 
     @classmethod
     def list_providers(cls) -> List[ProviderInfo]:
         """List all registered providers"""
-        providers = []
-        for provider_class in cls._providers.values():
-            instance = provider_class()
-            providers.append(ProviderInfo(
-                name=instance.name,
-                type=instance.provider_type,
-                display_name=instance.display_name,
-                description=instance.__doc__ or "",
-                enabled=True,
-                requires_config=True
-            ))
-        return providers
+        return [cls._provider_info(provider_class) for provider_class in cls.load_all()]
 
     @classmethod
     def get_provider_info(cls, name: str) -> Optional[ProviderInfo]:
         """Get information about a specific provider"""
-        provider_class = cls._providers.get(name)
+        provider_class = cls.get_provider_class(name)
         if provider_class:
-            instance = provider_class()
-            return ProviderInfo(
-                name=instance.name,
-                type=instance.provider_type,
-                display_name=instance.display_name,
-                description=instance.__doc__ or "",
-                enabled=True,
-                requires_config=True
-            )
+            return cls._provider_info(provider_class)
         return None
+
+    @staticmethod
+    def _provider_info(provider_class: type[BaseProvider]) -> ProviderInfo:
+        return ProviderInfo(
+            name=provider_class.name,
+            type=provider_class.provider_type,
+            display_name=provider_class.display_name,
+            description=provider_class.__doc__ or "",
+            enabled=True,
+            requires_config=True
+        )
@@ -4,11 +4,14 @@ import subprocess
 import json
 import platform
 
-from app.services.providers.base import BaseProvider, ProviderRegistry
+from app.services.providers.base import BaseProvider
+from app.services.operation_logs import log_error
+from app.services.providers.powershell_host import get_host_pool
+from app.services.providers.process import run_command
 from app.schemas.provider import ProviderStatus, ProviderType
+from app.core.config import settings
 
 
-@ProviderRegistry.register
 class HyperVProvider(BaseProvider):
     """
     Microsoft Hyper-V provider.
@@ -18,21 +21,13 @@ class HyperVProvider(BaseProvider):
     Only available on Windows with Hyper-V enabled.
     """
 
+    name = "hyperv"
+    display_name = "Hyper-V"
+    provider_type = ProviderType.HYPERV
+
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__(config)
 
-    @property
-    def name(self) -> str:
-        return "hyperv"
-
-    @property
-    def display_name(self) -> str:
-        return "Hyper-V"
-
-    @property
-    def provider_type(self) -> ProviderType:
-        return ProviderType.HYPERV
-
     async def check_status(self) -> ProviderStatus:
         """Check if Hyper-V is available"""
         # Check if running on Windows
@@ -132,7 +127,7 @@ class HyperVProvider(BaseProvider):
             result = await self._run_powershell(f"Start-VM -Name '{vm_id}'")
             return result.returncode == 0
         except Exception as e:
-            print(f"Error starting VM: {e}")
+            log_error(f"Error starting VM: {e}")
             return False
 
     async def stop_vm(self, vm_id: str) -> bool:
@@ -144,7 +139,7 @@ class HyperVProvider(BaseProvider):
             )
             return result.returncode == 0
         except Exception as e:
-            print(f"Error stopping VM: {e}")
+            log_error(f"Error stopping VM: {e}")
             return False
 
     async def delete_vm(self, vm_id: str) -> bool:
@@ -171,7 +166,7 @@ class HyperVProvider(BaseProvider):
             result = await self._run_powershell(ps_script)
             return result.returncode == 0
         except Exception as e:
-            print(f"Error deleting VM: {e}")
+            log_error(f"Error deleting VM: {e}")
             return False
 
     async def get_vm_status(self, vm_id: str) -> Dict[str, Any]:
@@ -258,18 +253,22 @@ class HyperVProvider(BaseProvider):
             "supports_dynamic_memory": True
         }
 
+    async def close(self) -> None:
+        """Stop the persistent PowerShell hosts"""
+        if settings.HYPERV_PERSISTENT_SHELL:
+            await get_host_pool().close()
+
     async def _run_powershell(self, script: str) -> subprocess.CompletedProcess:
         """Run PowerShell script"""
-        result = await asyncio.to_thread(
-            subprocess.run,
+        if settings.HYPERV_PERSISTENT_SHELL:
+            return await get_host_pool().run(script, timeout=settings.HYPERV_COMMAND_TIMEOUT)
+
+        return await run_command(
+            self.name,
             ["powershell", "-NoProfile", "-NonInteractive", "-Command", script],
-            capture_output=True,
-            text=True,
-            timeout=60
+            timeout=settings.HYPERV_COMMAND_TIMEOUT
         )
 
-        return result
-
     def _map_hyperv_state(self, hyperv_state: str) -> str:
         """Map Hyper-V state to our standard states"""
         state_map = {
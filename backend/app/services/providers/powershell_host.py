@@ -0,0 +1,244 @@
+from typing import List, Optional
+from collections import deque
+import asyncio
+import base64
+import itertools
+import json
+import subprocess
+
+from app.core.config import settings
+
+
+# Lines from the host carrying a protocol frame start with this marker;
+# anything else (e.g. Write-Host output) is ignored
+FRAME_PREFIX = "@@GAIA@@"
+
+# Runs inside the long-lived PowerShell process. Each request is one JSON
+# line on stdin ({"id", "script"}); each response is one framed JSON line
+# on stdout ({"id", "returncode", "stdout", "stderr"}).
+BOOTSTRAP_SCRIPT = r'''
+$ErrorActionPreference = 'Continue'
+$ProgressPreference = 'SilentlyContinue'
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+Import-Module Hyper-V -ErrorAction SilentlyContinue
+[Console]::Out.WriteLine('@@GAIA@@{"ready":true}')
+[Console]::Out.Flush()
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line) { break }
+    $request = $line | ConvertFrom-Json
+    $stdout = ''
+    $stderr = ''
+    $code = 0
+    try {
+        $output = & ([scriptblock]::Create($request.script)) 2>&1
+        $errors = @($output | Where-Object { $_ -is [System.Management.Automation.ErrorRecord] })
+        $stdout = ($output | Where-Object { $_ -isnot [System.Management.Automation.ErrorRecord] } | Out-String)
+        if ($errors.Count -gt 0) {
+            $stderr = ($errors | Out-String)
+            $code = 1
+        }
+    } catch {
+        $stderr = ($_ | Out-String)
+        $code = 1
+    }
+    $response = @{ id = $request.id; returncode = $code; stdout = $stdout; stderr = $stderr } | ConvertTo-Json -Compress
+    [Console]::Out.WriteLine('@@GAIA@@' + $response)
+    [Console]::Out.Flush()
+}
+'''
+
+
+class PowerShellHostError(Exception):
+    """Raised when the PowerShell host process dies or breaks protocol"""
+
+    def __init__(self, message: str, request_sent: bool = False):
+        super().__init__(message)
+        self.request_sent = request_sent
+
+
+def default_host_command() -> List[str]:
+    """Command line for a real PowerShell host running the bootstrap loop"""
+    encoded = base64.b64encode(BOOTSTRAP_SCRIPT.encode("utf-16-le")).decode()
+    return ["powershell", "-NoProfile", "-NonInteractive", "-EncodedCommand", encoded]
+
+
+class PowerShellHost:
+    """
+    One long-lived PowerShell process driven over stdin/stdout.
+
+    Scripts run in the already-warm runspace, so module loading and
+    process start-up are paid once instead of on every call.
+    """
+
+    def __init__(self, command: List[str]):
+        self.command = command
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._stderr_tail: deque = deque(maxlen=50)
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        """Launch the host and wait for its ready frame"""
+        await self.stop()
+
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=settings.HYPERV_SHELL_MAX_FRAME_BYTES
+        )
+        self._stderr_task = asyncio.create_task(self._drain_stderr(self._process))
+
+        try:
+            frame = await asyncio.wait_for(self._read_frame(), settings.HYPERV_SHELL_START_TIMEOUT)
+        except asyncio.TimeoutError:
+            await self.stop()
+            raise PowerShellHostError("PowerShell host did not become ready in time")
+
+        if not frame.get("ready"):
+            await self.stop()
+            raise PowerShellHostError(f"Unexpected PowerShell host handshake: {frame}")
+
+    async def stop(self) -> None:
+        """Kill the host process if it is running"""
+        process, self._process = self._process, None
+        if process is not None and process.returncode is None:
+            process.kill()
+            await process.wait()
+        if self._stderr_task is not None:
+            self._stderr_task.cancel()
+            self._stderr_task = None
+
+    async def run(self, script: str, timeout: float) -> subprocess.CompletedProcess:
+        """Run a script in the host and return its result"""
+        if not self.alive:
+            raise PowerShellHostError("PowerShell host is not running")
+
+        request_id = next(self._ids)
+        request = json.dumps({"id": request_id, "script": script})
+
+        try:
+            self._process.stdin.write(request.encode() + b"\n")
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            await self.stop()
+            raise PowerShellHostError(f"PowerShell host closed its input: {e}")
+
+        try:
+            while True:
+                frame = await asyncio.wait_for(self._read_frame(), timeout)
+                if frame.get("id") == request_id:
+                    break
+        except asyncio.TimeoutError:
+            # The runspace is stuck in the script; only a restart recovers it
+            await self.stop()
+            raise subprocess.TimeoutExpired(script, timeout)
+        except PowerShellHostError as e:
+            e.request_sent = True
+            raise
+
+        return subprocess.CompletedProcess(
+            args=script,
+            returncode=frame.get("returncode", 1),
+            stdout=frame.get("stdout") or "",
+            stderr=frame.get("stderr") or ""
+        )
+
+    async def _read_frame(self) -> dict:
+        """Read stdout until the next protocol frame"""
+        while True:
+            line = await self._process.stdout.readline()
+            if not line:
+                stderr = "".join(self._stderr_tail).strip()
+                await self.stop()
+                raise PowerShellHostError(f"PowerShell host exited unexpectedly: {stderr}")
+
+            text = line.decode("utf-8", errors="replace").lstrip("\ufeff").strip()
+            if text.startswith(FRAME_PREFIX):
+                try:
+                    return json.loads(text[len(FRAME_PREFIX):])
+                except json.JSONDecodeError as e:
+                    await self.stop()
+                    raise PowerShellHostError(f"Malformed PowerShell host frame: {e}")
+
+    async def _drain_stderr(self, process: asyncio.subprocess.Process) -> None:
+        """Keep stderr from filling its pipe; remember the tail for crash reports"""
+        async for line in process.stderr:
+            self._stderr_tail.append(line.decode("utf-8", errors="replace"))
+
+
+class PowerShellHostPool:
+    """
+    Small pool of PowerShell hosts.
+
+    Hosts start lazily and are restarted on the next call after a crash or
+    timeout. Processes and pipes belong to the event loop that created them,
+    so the pool starts over when used from a different loop.
+    """
+
+    def __init__(self, command: List[str], size: int):
+        self.command = command
+        self.size = size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._hosts: List[PowerShellHost] = []
+        self._idle: Optional[asyncio.Queue] = None
+
+    def _ensure_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        # Hosts from a previous loop cannot be awaited here; kill them directly
+        for host in self._hosts:
+            if host.alive:
+                host._process.kill()
+
+        self._loop = loop
+        self._hosts = [PowerShellHost(self.command) for _ in range(self.size)]
+        self._idle = asyncio.Queue()
+        for host in self._hosts:
+            self._idle.put_nowait(host)
+
+    async def run(self, script: str, timeout: float) -> subprocess.CompletedProcess:
+        """Run a script on the next idle host"""
+        self._ensure_loop()
+        host = await self._idle.get()
+        try:
+            for attempt in range(2):
+                try:
+                    if not host.alive:
+                        await host.start()
+                    return await host.run(script, timeout)
+                except PowerShellHostError as e:
+                    # Only retry when the script never reached the host;
+                    # re-running a half-applied script is not safe
+                    if e.request_sent or attempt:
+                        raise
+        finally:
+            self._idle.put_nowait(host)
+
+    async def close(self) -> None:
+        """Stop all hosts"""
+        if self._loop is asyncio.get_running_loop():
+            for host in self._hosts:
+                await host.stop()
+        self._hosts = []
+        self._loop = None
+
+
+_host_pool: Optional[PowerShellHostPool] = None
+
+
+def get_host_pool() -> PowerShellHostPool:
+    """Get the process-wide PowerShell host pool"""
+    global _host_pool
+    if _host_pool is None:
+        command = settings.HYPERV_SHELL_COMMAND or default_host_command()
+        _host_pool = PowerShellHostPool(command, settings.HYPERV_SHELL_POOL_SIZE)
+    return _host_pool
@@ -0,0 +1,209 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import locale
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from app.core.config import settings
+from app.core.metrics import observe_process
+from app.services.operation_logs import current_operation_log
+
+# Longest single output line a child may write before it is cut short
+STREAM_LIMIT = 4 * 1024 * 1024
+
+# Called with ("stdout" | "stderr", line) as each output line arrives
+LineHandler = Callable[[str, str], None]
+
+_IS_WINDOWS = sys.platform == "win32"
+
+
+class CommandStats:
+    """
+    Timing and exit codes of one provider's calls to one program.
+
+    Each call is also exported to Prometheus, labelled ok, failed (non-zero
+    exit), timeout, cancelled or error (the program could not be started).
+    """
+
+    def __init__(self, provider: str, program: str):
+        self.provider = provider
+        self.program = program
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.exit_codes: Dict[int, int] = {}
+
+    def record(self, seconds: float, returncode: Optional[int], outcome: str = "exited") -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if outcome == "timeout":
+            self.timeouts += 1
+        elif outcome == "cancelled":
+            self.cancelled += 1
+        elif outcome == "error":
+            self.failures += 1
+        if returncode is not None:
+            self.exit_codes[returncode] = self.exit_codes.get(returncode, 0) + 1
+            if returncode != 0:
+                self.failures += 1
+            outcome = "ok" if returncode == 0 else "failed"
+        observe_process(self.provider, self.program, seconds, outcome)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "total_seconds": round(self.total_seconds, 3),
+            "avg_seconds": round(self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+            "exit_codes": {str(code): count for code, count in sorted(self.exit_codes.items())},
+        }
+
+
+_stats: Dict[Tuple[str, str], CommandStats] = {}
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _semaphore(provider: str) -> asyncio.Semaphore:
+    """The provider's concurrency limit on the running loop"""
+    global _semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _semaphore_loop is not loop:
+        # Semaphores belong to the loop that first waits on them
+        _semaphores.clear()
+        _semaphore_loop = loop
+
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        limit = settings.PROVIDER_PROCESS_CONCURRENCY.get(provider, settings.PROVIDER_PROCESS_DEFAULT_CONCURRENCY)
+        semaphore = _semaphores[provider] = asyncio.Semaphore(limit)
+    return semaphore
+
+
+async def _read_lines(stream: asyncio.StreamReader, name: str, encoding: str,
+                      lines: List[str], on_line: Optional[LineHandler]) -> None:
+    while True:
+        try:
+            raw = await stream.readline()
+        except ValueError:
+            # Line longer than STREAM_LIMIT; take what is buffered and move on
+            raw = await stream.read(STREAM_LIMIT)
+        if not raw:
+            return
+        line = raw.decode(encoding, errors="replace").replace("\r\n", "\n")
+        lines.append(line)
+        if on_line is not None:
+            try:
+                on_line(name, line.rstrip("\n"))
+            except Exception as e:
+                print(f"Error handling {name} line: {e}")
+
+
+async def _kill_process_group(process: asyncio.subprocess.Process) -> None:
+    """Kill the child and everything it started, then reap it"""
+    if process.returncode is None:
+        try:
+            if _IS_WINDOWS:
+                killer = await asyncio.create_subprocess_exec(
+                    "taskkill", "/F", "/T", "/PID", str(process.pid),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                await killer.wait()
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError, OSError):
+            pass
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+    await process.wait()
+
+
+async def run_command(
+    provider: str,
+    args: List[str],
+    timeout: Optional[float] = None,
+    on_line: Optional[LineHandler] = None,
+    encoding: Optional[str] = None
+) -> subprocess.CompletedProcess:
+    """
+    Run a provider CLI without blocking the event loop.
+
+    Calls per provider are capped by PROVIDER_PROCESS_CONCURRENCY. stdout
+    and stderr are read line by line as the child writes them and passed
+    to on_line, by default the current operation's log if there is one.
+    The child runs in its own process group; on timeout or cancellation
+    the whole group is killed before the error propagates, so no
+    grandchildren outlive the call. Like subprocess.run,
+    a missing program raises FileNotFoundError and a timeout raises
+    subprocess.TimeoutExpired; a non-zero exit code is returned, not raised.
+    """
+    encoding = encoding or locale.getpreferredencoding(False)
+    if on_line is None and current_operation_log.get() is not None:
+        on_line = current_operation_log.get().on_line
+    program = os.path.basename(args[0])
+    stats = _stats.get((provider, program))
+    if stats is None:
+        stats = _stats[(provider, program)] = CommandStats(provider, program)
+
+    async with _semaphore(provider):
+        started = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT,
+                start_new_session=not _IS_WINDOWS,
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if _IS_WINDOWS else 0
+            )
+        except OSError:
+            stats.record(time.perf_counter() - started, None, "error")
+            raise
+
+        stdout: List[str] = []
+        stderr: List[str] = []
+
+        async def communicate() -> int:
+            await asyncio.gather(
+                _read_lines(process.stdout, "stdout", encoding, stdout, on_line),
+                _read_lines(process.stderr, "stderr", encoding, stderr, on_line)
+            )
+            return await process.wait()
+
+        try:
+            returncode = await asyncio.wait_for(communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _kill_process_group(process)
+            stats.record(time.perf_counter() - started, None, "timeout")
+            raise subprocess.TimeoutExpired(args, timeout, "".join(stdout), "".join(stderr))
+        except BaseException:
+            await asyncio.shield(_kill_process_group(process))
+            stats.record(time.perf_counter() - started, None, "cancelled")
+            raise
+
+        stats.record(time.perf_counter() - started, returncode)
+
+    return subprocess.CompletedProcess(args, returncode, "".join(stdout), "".join(stderr))
+
+
+def get_process_stats() -> Dict[str, Dict[str, Any]]:
+    """Per provider and program call statistics for this process"""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for (provider, program), command_stats in sorted(_stats.items()):
+        stats.setdefault(provider, {})[program] = command_stats.as_dict()
+    return stats
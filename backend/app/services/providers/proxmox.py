@@ -1,14 +1,15 @@
 from typing import Dict, Any, List, Optional
-from proxmoxer import ProxmoxAPI
-from proxmoxer.core import ResourceException
 import asyncio
+import hashlib
+import threading
 
-from app.services.providers.base import BaseProvider, ProviderRegistry
+from app.services.providers.base import BaseProvider
+from app.services.operation_logs import log_error, log_progress
+from app.services.providers.proxmox_client import ProxmoxClient
 from app.schemas.provider import ProviderStatus, ProviderType
 from app.core.config import settings
 
 
-@ProviderRegistry.register
 class ProxmoxProvider(BaseProvider):
     """
     Proxmox Virtual Environment provider.
@@ -16,48 +17,78 @@ class ProxmoxProvider(BaseProvider):
     Supports creating and managing VMs on Proxmox VE clusters.
     """
 
+    name = "proxmox"
+    display_name = "Proxmox VE"
+    provider_type = ProviderType.PROXMOX
+
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__(config)
-        self._client: Optional[ProxmoxAPI] = None
-
-    @property
-    def name(self) -> str:
-        return "proxmox"
-
-    @property
-    def display_name(self) -> str:
-        return "Proxmox VE"
-
-    @property
-    def provider_type(self) -> ProviderType:
-        return ProviderType.PROXMOX
-
-    def _get_client(self) -> ProxmoxAPI:
-        """Get or create Proxmox API client"""
-        if self._client is None:
-            host = self.config.get('host') or settings.PROXMOX_HOST
-            user = self.config.get('user') or settings.PROXMOX_USER
-            password = self.config.get('password') or settings.PROXMOX_PASSWORD
-            verify_ssl = self.config.get('verify_ssl', settings.PROXMOX_VERIFY_SSL)
-
-            if not host or not user or not password:
-                raise ValueError("Proxmox connection details not configured")
-
-            self._client = ProxmoxAPI(
-                host,
-                user=user,
-                password=password,
-                verify_ssl=verify_ssl
-            )
+        self._client: Optional[ProxmoxClient] = None
+        self._client_lock = threading.Lock()
+
+    @staticmethod
+    def _connection_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+        """Resolve host, credentials and SSL verification with settings fallback"""
+        return {
+            'host': config.get('host') or settings.PROXMOX_HOST,
+            'user': config.get('user') or settings.PROXMOX_USER,
+            'password': config.get('password') or settings.PROXMOX_PASSWORD,
+            'token_name': config.get('token_name') or settings.PROXMOX_TOKEN_NAME,
+            'token_value': config.get('token_value') or settings.PROXMOX_TOKEN_VALUE,
+            'verify_ssl': config.get('verify_ssl', settings.PROXMOX_VERIFY_SSL),
+        }
+
+    @classmethod
+    def connection_key(cls, config: Dict[str, Any] = None) -> str:
+        """Key pooled instances by endpoint and credentials only"""
+        connection = cls._connection_settings(config or {})
+        secret = hashlib.sha256(
+            f"{connection['password']}:{connection['token_name']}:{connection['token_value']}".encode()
+        ).hexdigest()
+        return f"{connection['user']}@{connection['host']}:{connection['verify_ssl']}:{secret}"
+
+    def _get_client(self) -> ProxmoxClient:
+        """Get or create the pooled Proxmox API client"""
+        if self._client is not None:
+            return self._client
+
+        with self._client_lock:
+            if self._client is None:
+                connection = self._connection_settings(self.config)
+                has_token = connection['token_name'] and connection['token_value']
+
+                if not connection['host'] or not connection['user'] or not (connection['password'] or has_token):
+                    raise ValueError("Proxmox connection details not configured")
+
+                self._client = ProxmoxClient(**connection)
 
         return self._client
 
+    async def _get(self, path: str, **params: Any) -> Any:
+        return await self._get_client().get(path, **params)
+
+    async def _post(self, path: str, **params: Any) -> Any:
+        return await self._get_client().post(path, **params)
+
+    async def _delete(self, path: str, **params: Any) -> Any:
+        return await self._get_client().delete(path, **params)
+
+    async def warm(self) -> None:
+        """Authenticate ahead of the first operation"""
+        connection = self._connection_settings(self.config)
+        if connection['host'] and connection['user'] and (connection['password'] or connection['token_value']):
+            await self._get_client().login()
+
+    async def close(self) -> None:
+        """Close the pooled HTTP connections"""
+        if self._client is not None:
+            await self._client.close()
+
     async def check_status(self) -> ProviderStatus:
         """Check if Proxmox is available and configured"""
         try:
-            client = self._get_client()
             # Try to get cluster status
-            version = await asyncio.to_thread(client.version.get)
+            version = await self._get('/version')
 
             return ProviderStatus(
                 name=self.name,
@@ -84,8 +115,6 @@ class ProxmoxProvider(BaseProvider):
 
     async def create_vm(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new VM in Proxmox"""
-        client = self._get_client()
-
         # Extract configuration
         node = config.get('node') or config.get('provider_config', {}).get('node', 'pve')
         vm_name = config.get('name')
@@ -110,10 +139,8 @@ class ProxmoxProvider(BaseProvider):
             vm_config['ostype'] = config['provider_config']['ostype']
 
         # Create the VM
-        result = await asyncio.to_thread(
-            client.nodes(node).qemu.create,
-            **vm_config
-        )
+        result = await self._post(f"/nodes/{node}/qemu", **vm_config)
+        log_progress(f"Proxmox task {result} created VM {vm_id} on {node}")
 
         return {
             'provider_vm_id': str(vm_id),
@@ -126,35 +153,30 @@ class ProxmoxProvider(BaseProvider):
     async def start_vm(self, vm_id: str) -> bool:
         """Start a VM"""
         try:
-            client = self._get_client()
             node, vmid = self._parse_vm_id(vm_id)
 
-            await asyncio.to_thread(
-                client.nodes(node).qemu(vmid).status.start.post
-            )
+            upid = await self._post(f"/nodes/{node}/qemu/{vmid}/status/start")
+            log_progress(f"Proxmox task {upid} started")
             return True
         except Exception as e:
-            print(f"Error starting VM: {e}")
+            log_error(f"Error starting VM: {e}")
             return False
 
     async def stop_vm(self, vm_id: str) -> bool:
         """Stop a VM"""
         try:
-            client = self._get_client()
             node, vmid = self._parse_vm_id(vm_id)
 
-            await asyncio.to_thread(
-                client.nodes(node).qemu(vmid).status.shutdown.post
-            )
+            upid = await self._post(f"/nodes/{node}/qemu/{vmid}/status/shutdown")
+            log_progress(f"Proxmox task {upid} started")
             return True
         except Exception as e:
-            print(f"Error stopping VM: {e}")
+            log_error(f"Error stopping VM: {e}")
             return False
 
     async def delete_vm(self, vm_id: str) -> bool:
         """Delete a VM"""
         try:
-            client = self._get_client()
             node, vmid = self._parse_vm_id(vm_id)
 
             # Stop VM first if running
@@ -164,23 +186,19 @@ class ProxmoxProvider(BaseProvider):
             await asyncio.sleep(2)
 
             # Delete the VM
-            await asyncio.to_thread(
-                client.nodes(node).qemu(vmid).delete
-            )
+            upid = await self._delete(f"/nodes/{node}/qemu/{vmid}")
+            log_progress(f"Proxmox task {upid} started")
             return True
         except Exception as e:
-            print(f"Error deleting VM: {e}")
+            log_error(f"Error deleting VM: {e}")
             return False
 
     async def get_vm_status(self, vm_id: str) -> Dict[str, Any]:
         """Get VM status"""
         try:
-            client = self._get_client()
             node, vmid = self._parse_vm_id(vm_id)
 
-            status = await asyncio.to_thread(
-                client.nodes(node).qemu(vmid).status.current.get
-            )
+            status = await self._get(f"/nodes/{node}/qemu/{vmid}/status/current")
 
             return {
                 'state': self._map_proxmox_state(status.get('status')),
@@ -197,32 +215,87 @@ class ProxmoxProvider(BaseProvider):
             }
 
     async def list_vms(self) -> List[Dict[str, Any]]:
-        """List all VMs across all nodes"""
+        """List all guests (QEMU and LXC) across all nodes"""
         try:
-            client = self._get_client()
-            nodes = await asyncio.to_thread(client.nodes.get)
-
-            all_vms = []
-            for node in nodes:
-                node_name = node['node']
-                vms = await asyncio.to_thread(
-                    client.nodes(node_name).qemu.get
-                )
-
-                for vm in vms:
-                    all_vms.append({
-                        'provider_vm_id': f"{node_name}:{vm['vmid']}",
-                        'vmid': vm['vmid'],
-                        'name': vm['name'],
-                        'status': vm['status'],
-                        'node': node_name
-                    })
-
-            return all_vms
+            resources = await self._get_vm_resources()
+
+            return [
+                {
+                    'provider_vm_id': f"{resource['node']}:{resource['vmid']}",
+                    'vmid': resource['vmid'],
+                    'name': resource.get('name'),
+                    'status': resource.get('status'),
+                    'node': resource['node'],
+                    'type': resource.get('type', 'qemu'),
+                    'cpu': resource.get('cpu'),
+                    'mem': resource.get('mem'),
+                    'maxmem': resource.get('maxmem'),
+                    'uptime': resource.get('uptime')
+                }
+                for resource in resources
+            ]
         except Exception as e:
-            print(f"Error listing VMs: {e}")
+            log_error(f"Error listing VMs: {e}")
             return []
 
+    async def get_vm_statuses(self, vm_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get status for many VMs from a single cluster inventory"""
+        try:
+            resources = await self._get_vm_resources()
+        except Exception as e:
+            return {vm_id: {'state': 'unknown', 'error': str(e)} for vm_id in vm_ids}
+
+        # VMIDs are unique cluster-wide, so the node part of the ID is not needed
+        by_vmid = {str(resource['vmid']): resource for resource in resources}
+
+        statuses = {}
+        for vm_id in vm_ids:
+            _, vmid = self._parse_vm_id(vm_id)
+            resource = by_vmid.get(vmid)
+            if resource:
+                statuses[vm_id] = self._status_from_resource(resource)
+            else:
+                statuses[vm_id] = {'state': 'unknown', 'error': 'VM not found'}
+        return statuses
+
+    async def _get_vm_resources(self) -> List[Dict[str, Any]]:
+        """
+        Get every guest in the cluster.
+
+        Uses /cluster/resources (one request for all nodes); falls back to
+        concurrent per-node listings when that endpoint is unavailable.
+        """
+        try:
+            return await self._get('/cluster/resources', type='vm')
+        except Exception as e:
+            log_error(f"Cluster resources unavailable, listing per node: {e}")
+
+        nodes = await self._get('/nodes')
+        semaphore = asyncio.Semaphore(settings.PROXMOX_NODE_FETCH_CONCURRENCY)
+
+        async def fetch(node_name: str, guest_type: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                guests = await self._get(f"/nodes/{node_name}/{guest_type}")
+            return [{**guest, 'node': node_name, 'type': guest_type} for guest in guests]
+
+        listings = await asyncio.gather(*(
+            fetch(node['node'], guest_type)
+            for node in nodes
+            for guest_type in ('qemu', 'lxc')
+        ))
+        return [guest for listing in listings for guest in listing]
+
+    def _status_from_resource(self, resource: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a status dict from a cluster resource entry"""
+        return {
+            'state': self._map_proxmox_state(resource.get('status')),
+            'provider_state': resource.get('status'),
+            'cpu_usage': resource.get('cpu'),
+            'memory_usage': resource.get('mem'),
+            'uptime': resource.get('uptime'),
+            'name': resource.get('name')
+        }
+
     def get_capabilities(self) -> Dict[str, Any]:
         """Get Proxmox provider capabilities"""
         return {
@@ -247,8 +320,7 @@ class ProxmoxProvider(BaseProvider):
 
     async def _get_next_vmid(self, node: str) -> int:
         """Get next available VM ID"""
-        client = self._get_client()
-        next_id = await asyncio.to_thread(client.cluster.nextid.get)
+        next_id = await self._get('/cluster/nextid')
         return int(next_id)
 
     def _map_proxmox_state(self, proxmox_state: str) -> str:
@@ -0,0 +1,162 @@
+from typing import Any, Dict, Optional
+import asyncio
+import time
+
+import httpx
+
+from app.core.config import settings
+
+DEFAULT_PORT = 8006
+
+
+class ProxmoxAPIError(Exception):
+    """Raised when the Proxmox API answers with an error status"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code} {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class ProxmoxClient:
+    """
+    Async client for the Proxmox VE REST API.
+
+    One httpx connection pool (at most PROXMOX_POOL_MAXSIZE connections,
+    all kept alive) is shared by every request, so concurrent operations
+    reuse warm HTTP/1.1 connections instead of each holding a thread and
+    a connection of its own.
+
+    Authenticates with an API token when token_name/token_value are set
+    (stateless, nothing to renew), otherwise with a password ticket that
+    is renewed after PROXMOX_TICKET_RENEW_SECONDS and on a 401.
+
+    The connection pool belongs to the event loop that created it, so the
+    client starts a new pool when used from a different loop.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: Optional[str] = None,
+        token_name: Optional[str] = None,
+        token_value: Optional[str] = None,
+        verify_ssl: bool = True,
+        base_url: Optional[str] = None
+    ):
+        if ':' not in host:
+            host = f"{host}:{DEFAULT_PORT}"
+        self.base_url = base_url or f"https://{host}/api2/json"
+        self.user = user
+        self.password = password
+        self.token_name = token_name
+        self.token_value = token_value
+        self.verify_ssl = verify_ssl
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._login_lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._ticket: Optional[str] = None
+        self._csrf_token: Optional[str] = None
+        self._ticket_issued = 0.0
+
+    @property
+    def uses_token(self) -> bool:
+        return bool(self.token_name and self.token_value)
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # A pool from a previous loop cannot be awaited here; drop it
+            self._loop = loop
+            self._login_lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(settings.PROXMOX_POOL_MAXSIZE)
+
+            headers = {}
+            if self.uses_token:
+                headers['Authorization'] = f"PVEAPIToken={self.user}!{self.token_name}={self.token_value}"
+
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                verify=self.verify_ssl,
+                timeout=settings.PROXMOX_REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.PROXMOX_POOL_MAXSIZE,
+                    max_keepalive_connections=settings.PROXMOX_POOL_MAXSIZE
+                )
+            )
+        return self._http
+
+    async def login(self, force: bool = False) -> None:
+        """Get (or renew) a password ticket; a no-op with token auth"""
+        if self.uses_token:
+            return
+
+        client = self._client()
+        async with self._login_lock:
+            fresh = time.monotonic() - self._ticket_issued < settings.PROXMOX_TICKET_RENEW_SECONDS
+            if self._ticket and fresh and not force:
+                return
+
+            response = await client.post(
+                "/access/ticket",
+                data={'username': self.user, 'password': self.password or ''}
+            )
+            if response.status_code != 200:
+                raise ProxmoxAPIError(response.status_code, f"Authentication failed: {response.reason_phrase}")
+
+            data = response.json()['data']
+            self._ticket = data['ticket']
+            self._csrf_token = data.get('CSRFPreventionToken')
+            self._ticket_issued = time.monotonic()
+
+    async def request(self, method: str, path: str, **params: Any) -> Any:
+        """
+        Call an API path (relative to /api2/json) and return its data.
+
+        GET and DELETE parameters go in the query string, others in a
+        form body, as the Proxmox API expects.
+        """
+        client = self._client()
+        for attempt in range(2):
+            await self.login(force=attempt > 0)
+
+            headers: Dict[str, str] = {}
+            if not self.uses_token:
+                headers['Cookie'] = f"PVEAuthCookie={self._ticket}"
+                if method != 'GET' and self._csrf_token:
+                    headers['CSRFPreventionToken'] = self._csrf_token
+
+            # Queue here rather than in httpx's pool, whose wait queue
+            # gets slow with hundreds of waiters
+            async with self._slots:
+                if method in ('GET', 'DELETE'):
+                    response = await client.request(method, path, params=params, headers=headers)
+                else:
+                    response = await client.request(method, path, data=params, headers=headers)
+
+            # An expired or revoked ticket; re-authenticate once and retry
+            if response.status_code == 401 and not self.uses_token and not attempt:
+                continue
+            if response.status_code >= 400:
+                raise ProxmoxAPIError(response.status_code, response.reason_phrase)
+            return response.json().get('data')
+
+    async def get(self, path: str, **params: Any) -> Any:
+        return await self.request('GET', path, **params)
+
+    async def post(self, path: str, **params: Any) -> Any:
+        return await self.request('POST', path, **params)
+
+    async def delete(self, path: str, **params: Any) -> Any:
+        return await self.request('DELETE', path, **params)
+
+    async def close(self) -> None:
+        """Close pooled connections owned by the running loop"""
+        http, self._http = self._http, None
+        loop, self._loop = self._loop, None
+        if http is not None and loop is asyncio.get_running_loop():
+            await http.aclose()
@@ -1,14 +1,70 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Iterator
 import asyncio
 import subprocess
 import re
 import json
 
-from app.services.providers.base import BaseProvider, ProviderRegistry
+from app.services.providers.base import BaseProvider
+from app.services.operation_logs import log_error
+from app.services.providers.process import run_command
 from app.schemas.provider import ProviderStatus, ProviderType
+from app.core.config import settings
+
+
+# Long-form (`list -l vms`) keys we keep, mapped to inventory fields
+LONG_LIST_FIELDS = {
+    'UUID': 'uuid',
+    'State': 'provider_state',
+    'Number of CPUs': 'cpus',
+    'Memory size': 'memory',
+    'Guest OS': 'ostype',
+    'Config file': 'config_file',
+}
+
+
+def parse_vm_list_long(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse `VBoxManage list -l vms` output one line at a time.
+
+    Yields a dict per VM as soon as its block ends, so the output never has
+    to be held in memory as a whole. Only top-level `Key: value` lines are
+    read; each VM block starts with a `Name:` line (shared folder entries
+    such as `Name: 'vagrant', Host path: ...` are not block starts).
+    """
+    current: Optional[Dict[str, Any]] = None
+
+    for line in lines:
+        if line.startswith('Memory size ') and ':' not in line:
+            # VirtualBox 6.1 prints this one key without its colon
+            line = 'Memory size:' + line[len('Memory size'):]
+        if not line or line[0].isspace() or ':' not in line:
+            continue
+
+        key, value = line.split(':', 1)
+        value = value.strip()
+
+        if key == 'Name' and not value.startswith("'"):
+            if current is not None:
+                yield current
+            current = {'name': value}
+            continue
+
+        if current is None or key not in LONG_LIST_FIELDS:
+            continue
+
+        field = LONG_LIST_FIELDS[key]
+        if field == 'provider_state':
+            # "powered off (since 2024-01-01T00:00:00.000000000)" -> "poweroff"
+            value = value.split(' (since', 1)[0].lower()
+            value = 'poweroff' if value == 'powered off' else value.replace(' ', '')
+        elif field == 'memory':
+            value = value.removesuffix('MB').strip()
+        current.setdefault(field, value)
+
+    if current is not None:
+        yield current
 
 
-@ProviderRegistry.register
 class VirtualBoxProvider(BaseProvider):
     """
     VirtualBox provider.
@@ -17,31 +73,17 @@ class VirtualBoxProvider(BaseProvider):
     Uses VBoxManage CLI for VM operations.
     """
 
+    name = "virtualbox"
+    display_name = "VirtualBox"
+    provider_type = ProviderType.VIRTUALBOX
+
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__(config)
 
-    @property
-    def name(self) -> str:
-        return "virtualbox"
-
-    @property
-    def display_name(self) -> str:
-        return "VirtualBox"
-
-    @property
-    def provider_type(self) -> ProviderType:
-        return ProviderType.VIRTUALBOX
-
     async def check_status(self) -> ProviderStatus:
         """Check if VirtualBox is installed and available"""
         try:
-            result = await asyncio.to_thread(
-                subprocess.run,
-                ["VBoxManage", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            result = await run_command(self.name, ["VBoxManage", "--version"], timeout=5)
 
             if result.returncode == 0:
                 version = result.stdout.strip()
@@ -152,7 +194,7 @@ class VirtualBoxProvider(BaseProvider):
             ])
             return True
         except Exception as e:
-            print(f"Error starting VM: {e}")
+            log_error(f"Error starting VM: {e}")
             return False
 
     async def stop_vm(self, vm_id: str) -> bool:
@@ -175,7 +217,7 @@ class VirtualBoxProvider(BaseProvider):
 
             return True
         except Exception as e:
-            print(f"Error stopping VM: {e}")
+            log_error(f"Error stopping VM: {e}")
             return False
 
     async def delete_vm(self, vm_id: str) -> bool:
@@ -193,7 +235,7 @@ class VirtualBoxProvider(BaseProvider):
             ])
             return True
         except Exception as e:
-            print(f"Error deleting VM: {e}")
+            log_error(f"Error deleting VM: {e}")
             return False
 
     async def get_vm_status(self, vm_id: str) -> Dict[str, Any]:
@@ -229,32 +271,112 @@ class VirtualBoxProvider(BaseProvider):
     async def list_vms(self) -> List[Dict[str, Any]]:
         """List all VMs"""
         try:
-            result = await self._run_vboxmanage(["list", "vms"])
-
-            vms = []
-            for line in result.stdout.split('\n'):
-                if line.strip():
-                    # Format: "name" {uuid}
-                    match = re.match(r'"(.+)"\s+\{(.+)\}', line)
-                    if match:
-                        name = match.group(1)
-                        uuid = match.group(2)
-
-                        # Get status for each VM
-                        status = await self.get_vm_status(name)
-
-                        vms.append({
-                            'provider_vm_id': name,
-                            'name': name,
-                            'uuid': uuid,
-                            'status': status.get('state', 'unknown')
-                        })
-
-            return vms
+            inventory = await self._get_inventory()
+
+            return [
+                {
+                    'provider_vm_id': vm['name'],
+                    'name': vm['name'],
+                    'uuid': vm.get('uuid'),
+                    'status': self._map_vbox_state(vm.get('provider_state', 'unknown')),
+                    'cpus': vm.get('cpus'),
+                    'memory': vm.get('memory')
+                }
+                for vm in inventory
+            ]
         except Exception as e:
             print(f"Error listing VMs: {e}")
             return []
 
+    async def get_vm_statuses(self, vm_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get status for many VMs from a single inventory listing"""
+        try:
+            inventory = await self._get_inventory()
+        except Exception as e:
+            return {vm_id: {'state': 'unknown', 'error': str(e)} for vm_id in vm_ids}
+
+        # VMs can be addressed by name or UUID
+        by_id = {}
+        for vm in inventory:
+            by_id[vm['name']] = vm
+            if vm.get('uuid'):
+                by_id[vm['uuid']] = vm
+
+        statuses = {}
+        for vm_id in vm_ids:
+            vm = by_id.get(vm_id)
+            if vm is None:
+                statuses[vm_id] = {'state': 'unknown', 'error': 'VM not found'}
+                continue
+
+            state = vm.get('provider_state', 'unknown')
+            statuses[vm_id] = {
+                'state': self._map_vbox_state(state),
+                'provider_state': state,
+                'name': vm['name'],
+                'cpus': vm.get('cpus'),
+                'memory': vm.get('memory')
+            }
+        return statuses
+
+    async def _get_inventory(self) -> List[Dict[str, Any]]:
+        """
+        Get every registered VM with its state in as few spawns as possible.
+
+        One `list -l vms` normally covers everything. If it fails, fall back
+        to `list vms` + `list runningvms` and only query `showvminfo` (with
+        bounded concurrency) for VMs whose state is still ambiguous.
+        """
+        try:
+            result = await self._run_vboxmanage(["list", "-l", "vms"])
+            inventory = list(parse_vm_list_long(result.stdout.splitlines()))
+        except Exception as e:
+            print(f"Long VM listing failed, using short listings: {e}")
+            inventory = await self._get_short_inventory()
+
+        missing = [vm for vm in inventory if 'provider_state' not in vm]
+        if missing:
+            await self._fill_from_showvminfo(missing)
+
+        return inventory
+
+    async def _get_short_inventory(self) -> List[Dict[str, Any]]:
+        """Build the inventory from `list vms` and `list runningvms`"""
+        all_result, running_result = await asyncio.gather(
+            self._run_vboxmanage(["list", "vms"]),
+            self._run_vboxmanage(["list", "runningvms"])
+        )
+
+        running = {uuid for _, uuid in self._parse_vm_list(running_result.stdout)}
+
+        inventory = []
+        for name, uuid in self._parse_vm_list(all_result.stdout):
+            vm = {'name': name, 'uuid': uuid}
+            if uuid in running:
+                vm['provider_state'] = 'running'
+            inventory.append(vm)
+        return inventory
+
+    async def _fill_from_showvminfo(self, vms: List[Dict[str, Any]]) -> None:
+        """Query `showvminfo` for VMs whose state is unknown, a few at a time"""
+        semaphore = asyncio.Semaphore(settings.VBOX_SHOWVMINFO_CONCURRENCY)
+
+        async def fill(vm: Dict[str, Any]):
+            async with semaphore:
+                status = await self.get_vm_status(vm.get('uuid') or vm['name'])
+            vm['provider_state'] = status.get('provider_state', 'unknown')
+            vm.setdefault('cpus', status.get('cpus'))
+            vm.setdefault('memory', status.get('memory'))
+
+        await asyncio.gather(*(fill(vm) for vm in vms))
+
+    def _parse_vm_list(self, output: str) -> Iterator[tuple[str, str]]:
+        """Parse `list vms` lines of the form: "name" {uuid}"""
+        for line in output.splitlines():
+            match = re.match(r'"(.+)"\s+\{(.+)\}', line)
+            if match:
+                yield match.group(1), match.group(2)
+
     def get_capabilities(self) -> Dict[str, Any]:
         """Get VirtualBox provider capabilities"""
         return {
@@ -270,13 +392,7 @@ class VirtualBoxProvider(BaseProvider):
 
     async def _run_vboxmanage(self, args: List[str]) -> subprocess.CompletedProcess:
         """Run VBoxManage command"""
-        result = await asyncio.to_thread(
-            subprocess.run,
-            ["VBoxManage"] + args,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        result = await run_command(self.name, ["VBoxManage"] + args, timeout=30)
 
         if result.returncode != 0:
             raise Exception(f"VBoxManage error: {result.stderr}")
@@ -1,15 +1,15 @@
 from typing import Dict, Any, List, Optional
-import asyncio
 import subprocess
 import json
 import platform
 import re
 
-from app.services.providers.base import BaseProvider, ProviderRegistry
+from app.services.providers.base import BaseProvider
+from app.services.operation_logs import log_error
+from app.services.providers.process import run_command
 from app.schemas.provider import ProviderStatus, ProviderType
 
 
-@ProviderRegistry.register
 class WSLProvider(BaseProvider):
     """
     Windows Subsystem for Linux (WSL) provider.
@@ -19,21 +19,13 @@ class WSLProvider(BaseProvider):
     Only available on Windows 10/11 with WSL2 enabled.
     """
 
+    name = "wsl"
+    display_name = "WSL2"
+    provider_type = ProviderType.WSL
+
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__(config)
 
-    @property
-    def name(self) -> str:
-        return "wsl"
-
-    @property
-    def display_name(self) -> str:
-        return "WSL2"
-
-    @property
-    def provider_type(self) -> ProviderType:
-        return ProviderType.WSL
-
     async def check_status(self) -> ProviderStatus:
         """Check if WSL is available"""
         # Check if running on Windows
@@ -192,7 +184,7 @@ class WSLProvider(BaseProvider):
             ])
             return result.returncode == 0
         except Exception as e:
-            print(f"Error starting WSL distribution: {e}")
+            log_error(f"Error starting WSL distribution: {e}")
             return False
 
     async def stop_vm(self, vm_id: str) -> bool:
@@ -203,7 +195,7 @@ class WSLProvider(BaseProvider):
             ])
             return result.returncode == 0
         except Exception as e:
-            print(f"Error stopping WSL distribution: {e}")
+            log_error(f"Error stopping WSL distribution: {e}")
             return False
 
     async def delete_vm(self, vm_id: str) -> bool:
@@ -218,7 +210,7 @@ class WSLProvider(BaseProvider):
             ])
             return result.returncode == 0
         except Exception as e:
-            print(f"Error deleting WSL distribution: {e}")
+            log_error(f"Error deleting WSL distribution: {e}")
             return False
 
     async def get_vm_status(self, vm_id: str) -> Dict[str, Any]:
@@ -321,12 +313,4 @@ class WSLProvider(BaseProvider):
 
     async def _run_wsl(self, args: List[str]) -> subprocess.CompletedProcess:
         """Run wsl.exe command"""
-        result = await asyncio.to_thread(
-            subprocess.run,
-            ["wsl"] + args,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-
-        return result
+        return await run_command(self.name, ["wsl"] + args, timeout=60)
@@ -0,0 +1,54 @@
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+import json
+import time
+
+from app.core.config import settings
+from app.core.redis import get_redis, get_async_redis
+
+SNAPSHOT_KEY = "gaia:vm_status:{vm_id}"
+
+
+def _encode(status: Dict[str, Any], checked_at: float) -> str:
+    return json.dumps({**status, 'checked_at': checked_at}, default=str)
+
+
+def write_statuses(statuses: Dict[int, Dict[str, Any]], checked_at: Optional[float] = None) -> None:
+    """Store provider statuses for many VMs in one round-trip"""
+    checked_at = checked_at or time.time()
+    pipe = get_redis().pipeline(transaction=False)
+    for vm_id, status in statuses.items():
+        pipe.set(
+            SNAPSHOT_KEY.format(vm_id=vm_id),
+            _encode(status, checked_at),
+            ex=settings.STATUS_SNAPSHOT_TTL
+        )
+    pipe.execute()
+
+
+async def write_status(vm_id: int, status: Dict[str, Any]) -> None:
+    """Store the provider status of one VM"""
+    await get_async_redis().set(
+        SNAPSHOT_KEY.format(vm_id=vm_id),
+        _encode(status, time.time()),
+        ex=settings.STATUS_SNAPSHOT_TTL
+    )
+
+
+async def read_status(vm_id: int, max_age: float) -> Optional[Dict[str, Any]]:
+    """
+    Get the snapshot status of a VM if it is at most max_age seconds old.
+
+    The returned dict carries `last_checked` as an aware datetime.
+    """
+    raw = await get_async_redis().get(SNAPSHOT_KEY.format(vm_id=vm_id))
+    if raw is None:
+        return None
+
+    status = json.loads(raw)
+    checked_at = status.pop('checked_at', 0)
+    if time.time() - checked_at > max_age:
+        return None
+
+    status['last_checked'] = datetime.fromtimestamp(checked_at, tz=timezone.utc)
+    return status
@@ -0,0 +1,63 @@
+from typing import Any, Dict, Optional
+import copy
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.template import Template
+
+
+class ResolvedTemplate:
+    """The parts of a template VM creation needs, detached from any session"""
+
+    def __init__(self, template_id: int, name: str, provider: str, config: Dict[str, Any]):
+        self.id = template_id
+        self.name = name
+        self.provider = provider
+        self.config = config
+
+    def merged_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Request config layered over a private copy of the template's"""
+        return {**copy.deepcopy(self.config), **config}
+
+
+# template_id -> (loaded_at, ResolvedTemplate)
+_templates = LRUCache(settings.TEMPLATE_CACHE_SIZE, name="templates")
+
+
+async def resolve_template(db: AsyncSession, template_id: int) -> Optional[ResolvedTemplate]:
+    """
+    Get a template for VM creation from the in-process cache.
+
+    Entries are dropped by invalidate_template when this process updates
+    or deletes the template; TEMPLATE_CACHE_TTL bounds how long other API
+    processes keep serving an outdated copy.
+    """
+    entry = _templates.get(template_id)
+    if entry is not None:
+        loaded_at, template = entry
+        if time.monotonic() - loaded_at < settings.TEMPLATE_CACHE_TTL:
+            return template
+
+    row = (await db.execute(
+        select(Template.id, Template.name, Template.provider, Template.config)
+        .where(Template.id == template_id)
+    )).first()
+    if row is None:
+        _templates.pop(template_id)
+        return None
+
+    template = ResolvedTemplate(row.id, row.name, row.provider, row.config or {})
+    _templates.set(template_id, (time.monotonic(), template))
+    return template
+
+
+def invalidate_template(template_id: int) -> None:
+    _templates.pop(template_id)
+
+
+def get_template_cache_stats() -> Dict[str, Optional[float]]:
+    return _templates.stats()
@@ -0,0 +1,115 @@
+from typing import BinaryIO, Iterator, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+import os
+import posixpath
+import tarfile
+import zipfile
+
+from app.core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class ArchiveEntry:
+    """One file read from an uploaded archive"""
+
+    def __init__(self, path: str, content: Optional[str] = None, error: Optional[str] = None):
+        self.path = path
+        self.content = content
+        self.error = error
+        self.content_hash = content_hash(content) if content is not None else None
+
+
+def content_hash(content: str) -> str:
+    """sha256 of Vagrantfile content, used to de-duplicate templates"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def is_vagrantfile(path: str) -> bool:
+    name = posixpath.basename(path)
+    if name.startswith('.'):
+        return False
+    return name.startswith('Vagrantfile') or name.endswith('.vagrantfile')
+
+
+def template_name_for(path: str) -> str:
+    """Template name from an archive path: the directory for */Vagrantfile, else the file stem"""
+    directory, name = posixpath.split(path.strip('/'))
+    if name.startswith('Vagrantfile') and directory:
+        base = directory
+    else:
+        base = name[:-len('.vagrantfile')] if name.endswith('.vagrantfile') else name
+    return f"Imported - {base}"[:240]
+
+
+def _decode(path: str, data: bytes) -> ArchiveEntry:
+    try:
+        return ArchiveEntry(path, data.decode('utf-8-sig'))
+    except UnicodeDecodeError:
+        return ArchiveEntry(path, error="not UTF-8 text")
+
+
+def _iter_tar(fileobj: BinaryIO, max_bytes: int) -> Iterator[ArchiveEntry]:
+    # Stream mode: members are read in order, the archive is never seeked or held in memory
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for member in archive:
+            if not member.isfile() or not is_vagrantfile(member.name):
+                continue
+            if member.size > max_bytes:
+                yield ArchiveEntry(member.name, error=f"larger than {max_bytes} bytes")
+                continue
+            yield _decode(member.name, archive.extractfile(member).read())
+
+
+def _iter_zip(fileobj: BinaryIO, max_bytes: int) -> Iterator[ArchiveEntry]:
+    # Zip needs its central directory, so the upload's (disk-spooled) file is
+    # seeked, but members are still read one at a time
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not is_vagrantfile(info.filename):
+                continue
+            if info.file_size > max_bytes:
+                yield ArchiveEntry(info.filename, error=f"larger than {max_bytes} bytes")
+                continue
+            with archive.open(info) as member:
+                yield _decode(info.filename, member.read())
+
+
+def iter_archive(fileobj: BinaryIO) -> Iterator[ArchiveEntry]:
+    """Iterate over the Vagrantfiles in a tar (optionally compressed) or zip archive"""
+    max_bytes = settings.TEMPLATE_IMPORT_MAX_ENTRY_BYTES
+    fileobj.seek(0)
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        return _iter_zip(fileobj, max_bytes)
+    fileobj.seek(0)
+    return _iter_tar(fileobj, max_bytes)
+
+
+def read_batch(entries: Iterator[ArchiveEntry], size: int) -> List[ArchiveEntry]:
+    """Read up to size entries (blocking; run in a thread)"""
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Get the process pool used to parse imported Vagrantfiles"""
+    global _pool
+    if _pool is None:
+        workers = settings.TEMPLATE_IMPORT_WORKERS or os.cpu_count() or 1
+        # spawn: never fork the API process with its event loop and connections
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+
+def shutdown_parse_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
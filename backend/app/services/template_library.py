@@ -0,0 +1,167 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import os
+import threading
+
+import yaml
+
+from app.core.config import settings
+from app.schemas.template import LibraryTemplateResponse
+
+LIBRARY_EXTENSIONS = ('.yaml', '.yml')
+
+
+class _LibraryFile:
+    """What was last loaded from one YAML file"""
+
+    def __init__(self, stat_key: Tuple[int, int], digest: str, template: Optional[LibraryTemplateResponse]):
+        self.stat_key = stat_key
+        self.digest = digest
+        self.template = template
+
+
+class TemplateLibrary:
+    """
+    In-memory catalog of the curated YAML templates in TEMPLATES_DIR.
+
+    Templates are keyed by file stem and indexed by provider and tag, so
+    requests never touch the disk. refresh() stats every file and only
+    re-reads those whose mtime or size changed; a file whose content hash
+    is unchanged is not re-parsed. A file that fails to load keeps serving
+    its previous version.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._files: Dict[str, _LibraryFile] = {}
+        self._templates: Dict[str, LibraryTemplateResponse] = {}
+        self._by_provider: Dict[str, Set[str]] = {}
+        self._by_tag: Dict[str, Set[str]] = {}
+        self.errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> Dict[str, int]:
+        """Bring the catalog in line with the directory (blocking; run in a thread)"""
+        with self._lock:
+            try:
+                names = sorted(
+                    name for name in os.listdir(self.directory)
+                    if name.endswith(LIBRARY_EXTENSIONS) and not name.startswith('.')
+                )
+            except FileNotFoundError:
+                names = []
+
+            changed = 0
+            for name in names:
+                changed += self._refresh_file(name)
+
+            removed = [name for name in self._files if name not in names]
+            for name in removed:
+                del self._files[name]
+                self.errors.pop(name, None)
+
+            if changed or removed:
+                self._rebuild_indexes()
+
+            return {"files": len(names), "changed": changed, "removed": len(removed)}
+
+    def _refresh_file(self, name: str) -> int:
+        path = os.path.join(self.directory, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return 0
+
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        known = self._files.get(name)
+        if known is not None and known.stat_key == stat_key:
+            return 0
+
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if known is not None and known.digest == digest:
+            known.stat_key = stat_key
+            return 0
+
+        try:
+            template = self._parse(name, content)
+        except (yaml.YAMLError, ValueError, TypeError) as e:
+            print(f"Error loading template library file '{name}': {e}")
+            self.errors[name] = str(e)
+            # Keep serving the previous version, but don't retry until it changes again
+            self._files[name] = _LibraryFile(stat_key, digest, known.template if known else None)
+            return 0
+
+        self.errors.pop(name, None)
+        self._files[name] = _LibraryFile(stat_key, digest, template)
+        return 1
+
+    def _parse(self, name: str, content: bytes) -> LibraryTemplateResponse:
+        data = yaml.safe_load(content)
+        if not isinstance(data, dict):
+            raise ValueError("expected a mapping at the top level")
+        return LibraryTemplateResponse(
+            slug=os.path.splitext(name)[0],
+            name=data.get('name') or os.path.splitext(name)[0],
+            description=data.get('description'),
+            provider=data.get('provider'),
+            config=data.get('config') or {},
+            vagrantfile_template=data.get('vagrantfile_template'),
+            tags=[str(tag) for tag in data.get('tags') or []],
+        )
+
+    def _rebuild_indexes(self) -> None:
+        templates = {
+            entry.template.slug: entry.template
+            for entry in self._files.values() if entry.template is not None
+        }
+        by_provider: Dict[str, Set[str]] = {}
+        by_tag: Dict[str, Set[str]] = {}
+        for slug, template in templates.items():
+            by_provider.setdefault(template.provider, set()).add(slug)
+            for tag in template.tags:
+                by_tag.setdefault(tag, set()).add(slug)
+
+        # Swap whole structures so readers never see a half-built index
+        self._templates, self._by_provider, self._by_tag = templates, by_provider, by_tag
+
+    def get(self, slug: str) -> Optional[LibraryTemplateResponse]:
+        return self._templates.get(slug)
+
+    def list(self, provider: Optional[str] = None, tags: Optional[List[str]] = None) -> List[LibraryTemplateResponse]:
+        """Templates matching provider and carrying every tag, ordered by slug"""
+        templates = self._templates
+        slugs: Optional[Set[str]] = None
+        if provider:
+            slugs = set(self._by_provider.get(provider, ()))
+        for tag in tags or []:
+            tagged = self._by_tag.get(tag, set())
+            slugs = set(tagged) if slugs is None else slugs & tagged
+
+        if slugs is None:
+            slugs = set(templates)
+        return [templates[slug] for slug in sorted(slugs) if slug in templates]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "directory": os.path.abspath(self.directory),
+            "templates": len(self._templates),
+            "providers": {provider: len(slugs) for provider, slugs in self._by_provider.items()},
+            "errors": dict(self.errors),
+        }
+
+    async def watch(self, interval: float) -> None:
+        """Refresh the catalog every interval seconds until cancelled"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                result = await asyncio.to_thread(self.refresh)
+                if result["changed"] or result["removed"]:
+                    print(f"📚 Template library reloaded: {result}")
+            except Exception as e:
+                print(f"Error reloading template library: {e}")
+
+
+template_library = TemplateLibrary(settings.TEMPLATES_DIR)
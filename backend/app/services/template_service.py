@@ -1,16 +1,35 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import BinaryIO, Dict, List, Optional, Tuple
+import asyncio
+import re
+from sqlalchemy import cast, func, select
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
-from app.models.template import Template
-from app.schemas.template import TemplateCreate, TemplateResponse
-from app.services.vagrant.parser import VagrantfileParser
+from app.core.config import settings
+from app.core.pagination import Page, paginate
+from app.models.template import SEARCH_CONFIG, Template
+from app.schemas.template import (
+    TemplateCreate, TemplateResponse, TemplateImportEntry, TemplateBulkImportResponse, TemplateSearchResult
+)
+from app.services.template_cache import invalidate_template
+from app.services.template_import import (
+    ArchiveEntry, content_hash, get_parse_pool, iter_archive, read_batch, template_name_for
+)
+from app.services.vagrant.parser import VagrantfileParser, parse_vagrantfiles
 
 
 class TemplateService:
     """Service for managing VM templates"""
 
-    def __init__(self, db: Session):
+    # Columns returned by list views that skip config and vagrantfile_template
+    SUMMARY_FIELDS = (
+        "id", "name", "description", "provider", "is_public", "tags",
+        "usage_count", "created_at", "updated_at"
+    )
+    LIST_FIELDS = SUMMARY_FIELDS + ("config", "vagrantfile_template", "content_hash")
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.parser = VagrantfileParser()
 
@@ -18,7 +37,9 @@ class TemplateService:
         """Create a new template"""
 
         # Check if template name already exists
-        existing = self.db.query(Template).filter(Template.name == template_data.name).first()
+        existing = await self.db.scalar(
+            select(Template.id).where(Template.name == template_data.name)
+        )
         if existing:
             raise HTTPException(status_code=400, detail=f"Template '{template_data.name}' already exists")
 
@@ -28,28 +49,92 @@ class TemplateService:
             provider=template_data.provider,
             config=template_data.config,
             vagrantfile_template=template_data.vagrantfile_template,
+            content_hash=self._hash(template_data.vagrantfile_template),
             is_public=template_data.is_public,
             tags=template_data.tags
         )
 
         self.db.add(template)
-        self.db.commit()
-        self.db.refresh(template)
+        await self.db.commit()
+        await self.db.refresh(template)
 
         return template
 
-    async def list_templates(self, skip: int = 0, limit: int = 100, provider: str = None) -> List[Template]:
-        """List templates"""
-        query = self.db.query(Template)
+    async def list_templates(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        provider: Optional[str] = None,
+        name: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        columns: Optional[List[str]] = None
+    ) -> Page:
+        """
+        List templates, newest first, one keyset page at a time.
+
+        With columns (see SUMMARY_FIELDS / LIST_FIELDS) the page holds rows
+        of just those columns instead of full Template objects.
+        """
+        query = select(Template)
 
         if provider:
-            query = query.filter(Template.provider == provider)
+            query = query.where(Template.provider == provider)
+        if name:
+            query = query.where(Template.name.startswith(name, autoescape=True))
+        if tags:
+            # Templates carrying every requested tag
+            query = query.where(Template.tags.contains(tags))
+
+        return await paginate(self.db, query, Template, limit, cursor, columns)
 
-        return query.offset(skip).limit(limit).all()
+    async def search_templates(
+        self,
+        text: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        any_tags: Optional[List[str]] = None,
+        provider: Optional[str] = None,
+        limit: int = 20
+    ) -> List[TemplateSearchResult]:
+        """
+        Search templates by text and tags.
+
+        Every word of text must prefix-match a word of the name or
+        description (GIN index on search_vector); results are ranked with
+        name matches first. tags must all be present and any_tags must
+        overlap (GIN index on tags). Without text, the most used templates
+        come first.
+        """
+        rank = None
+        query = select(
+            Template.id, Template.name, Template.description, Template.provider,
+            Template.is_public, Template.tags, Template.usage_count
+        )
+
+        terms = re.findall(r"\w+", text or "")
+        if terms:
+            ts_query = func.to_tsquery(
+                cast(SEARCH_CONFIG, REGCONFIG), " & ".join(f"{term}:*" for term in terms)
+            )
+            rank = func.ts_rank_cd(Template.search_vector, ts_query).label("rank")
+            query = query.add_columns(rank).where(Template.search_vector.op("@@")(ts_query))
+        if tags:
+            query = query.where(Template.tags.contains(tags))
+        if any_tags:
+            query = query.where(Template.tags.overlap(any_tags))
+        if provider:
+            query = query.where(Template.provider == provider)
+
+        if rank is not None:
+            query = query.order_by(rank.desc(), Template.usage_count.desc(), Template.id)
+        else:
+            query = query.order_by(Template.usage_count.desc(), Template.id)
+
+        rows = (await self.db.execute(query.limit(limit))).all()
+        return [TemplateSearchResult(**row._mapping) for row in rows]
 
     async def get_template(self, template_id: int) -> Optional[Template]:
         """Get template by ID"""
-        return self.db.query(Template).filter(Template.id == template_id).first()
+        return await self.db.get(Template, template_id)
 
     async def update_template(self, template_id: int, template_data: TemplateCreate) -> Optional[Template]:
         """Update a template"""
@@ -62,11 +147,13 @@ class TemplateService:
         template.provider = template_data.provider
         template.config = template_data.config
         template.vagrantfile_template = template_data.vagrantfile_template
+        template.content_hash = self._hash(template_data.vagrantfile_template)
         template.is_public = template_data.is_public
         template.tags = template_data.tags
 
-        self.db.commit()
-        self.db.refresh(template)
+        await self.db.commit()
+        await self.db.refresh(template)
+        invalidate_template(template_id)
 
         return template
 
@@ -76,16 +163,17 @@ class TemplateService:
         if not template:
             return False
 
-        self.db.delete(template)
-        self.db.commit()
+        await self.db.delete(template)
+        await self.db.commit()
+        invalidate_template(template_id)
 
         return True
 
     async def import_from_vagrantfile(self, vagrantfile_content: str) -> Template:
         """Import a template from an existing Vagrantfile"""
 
-        # Parse the Vagrantfile
-        config = self.parser.parse(vagrantfile_content)
+        # Parse the Vagrantfile off the event loop; large files take a while
+        config = await asyncio.to_thread(self.parser.parse, vagrantfile_content)
 
         # Create template from parsed config
         template_data = TemplateCreate(
@@ -99,3 +187,133 @@ class TemplateService:
         )
 
         return await self.create_template(template_data)
+
+    async def bulk_import(self, archive: BinaryIO) -> TemplateBulkImportResponse:
+        """
+        Import every Vagrantfile in a tar or zip archive.
+
+        Entries are read in batches of TEMPLATE_IMPORT_BATCH_SIZE, parsed in a
+        process pool and inserted with one statement and commit per batch.
+        Content already imported (in the database or earlier in the archive)
+        is reported as a duplicate instead of being inserted again; copies of
+        content that failed are reported as failed with the same error.
+        """
+        batch_size = max(1, settings.TEMPLATE_IMPORT_BATCH_SIZE)
+        loop = asyncio.get_running_loop()
+        pool = get_parse_pool()
+        entries = await asyncio.to_thread(iter_archive, archive)
+        results: List[TemplateImportEntry] = []
+        seen: Dict[str, Optional[int]] = {}
+        # Why the first entry with a given content failed to import
+        failures: Dict[str, str] = {}
+        # Duplicates of entries whose insert is still pending in this archive
+        unresolved: List[Tuple[TemplateImportEntry, str]] = []
+
+        while True:
+            batch = await asyncio.to_thread(read_batch, entries, batch_size)
+            if not batch:
+                break
+
+            fresh: List[ArchiveEntry] = []
+            for entry in batch:
+                if entry.error:
+                    results.append(TemplateImportEntry(path=entry.path, status="failed", error=entry.error))
+                elif entry.content_hash in seen:
+                    result = TemplateImportEntry(
+                        path=entry.path, status="duplicate", template_id=seen[entry.content_hash]
+                    )
+                    if result.template_id is None:
+                        unresolved.append((result, entry.content_hash))
+                    results.append(result)
+                else:
+                    seen[entry.content_hash] = None
+                    fresh.append(entry)
+
+            existing = {}
+            if fresh:
+                rows = await self.db.execute(
+                    select(Template.content_hash, Template.id)
+                    .where(Template.content_hash.in_([e.content_hash for e in fresh]))
+                )
+                existing = dict(rows.all())
+
+            to_parse = []
+            for entry in fresh:
+                if entry.content_hash in existing:
+                    seen[entry.content_hash] = existing[entry.content_hash]
+                    results.append(TemplateImportEntry(
+                        path=entry.path, status="duplicate", template_id=existing[entry.content_hash]
+                    ))
+                else:
+                    to_parse.append(entry)
+
+            if not to_parse:
+                continue
+
+            parsed = await loop.run_in_executor(pool, parse_vagrantfiles, [e.content for e in to_parse])
+
+            values = []
+            pending: List[ArchiveEntry] = []
+            for entry, (config, error) in zip(to_parse, parsed):
+                if error:
+                    failures[entry.content_hash] = error
+                    results.append(TemplateImportEntry(path=entry.path, status="failed", error=error))
+                    continue
+                values.append({
+                    "name": template_name_for(entry.path),
+                    "description": "Imported from Vagrantfile",
+                    "provider": config.get('provider', 'virtualbox'),
+                    "config": config,
+                    "vagrantfile_template": entry.content,
+                    "content_hash": entry.content_hash,
+                    "is_public": False,
+                    "tags": ['imported'],
+                })
+                pending.append(entry)
+
+            if not values:
+                continue
+
+            # Names are unique; a clash skips that row rather than aborting the batch
+            inserted = await self.db.execute(
+                insert(Template)
+                .values(values)
+                .on_conflict_do_nothing(index_elements=[Template.name])
+                .returning(Template.id, Template.content_hash)
+            )
+            created = dict((h, i) for i, h in inserted.all())
+            await self.db.commit()
+
+            for entry, row in zip(pending, values):
+                template_id = created.get(entry.content_hash)
+                if template_id is None:
+                    failures[entry.content_hash] = f"Template '{row['name']}' already exists"
+                    results.append(TemplateImportEntry(
+                        path=entry.path, status="failed", name=row["name"],
+                        error=failures[entry.content_hash]
+                    ))
+                else:
+                    seen[entry.content_hash] = template_id
+                    results.append(TemplateImportEntry(
+                        path=entry.path, status="created", template_id=template_id, name=row["name"]
+                    ))
+
+        # Copies of content that failed to import failed too, for the same reason
+        for result, digest in unresolved:
+            if seen[digest] is None:
+                result.status = "failed"
+                result.error = failures.get(digest)
+            else:
+                result.template_id = seen[digest]
+
+        return TemplateBulkImportResponse(
+            total=len(results),
+            created=sum(1 for r in results if r.status == "created"),
+            duplicates=sum(1 for r in results if r.status == "duplicate"),
+            failed=sum(1 for r in results if r.status == "failed"),
+            entries=results,
+        )
+
+    @staticmethod
+    def _hash(vagrantfile_content: Optional[str]) -> Optional[str]:
+        return content_hash(vagrantfile_content) if vagrantfile_content else None
@@ -0,0 +1,49 @@
+from typing import Dict
+
+from sqlalchemy import bindparam, update
+
+from app.core.redis import get_redis, get_async_redis
+from app.models.template import Template
+
+USAGE_KEY = "gaia:template_usage"
+# The hash is renamed here while a flush applies it, so increments that
+# arrive meanwhile start a fresh USAGE_KEY instead of being lost
+FLUSHING_KEY = "gaia:template_usage:flushing"
+
+
+async def record_usage(template_id: int, count: int = 1) -> None:
+    """Count uses of a template in Redis; never raises"""
+    try:
+        await get_async_redis().hincrby(USAGE_KEY, str(template_id), count)
+    except Exception as e:
+        print(f"Error recording usage of template {template_id}: {e}")
+
+
+def flush_usage(db) -> Dict[int, int]:
+    """
+    Add the counts accumulated in Redis to Template.usage_count.
+
+    Runs in a Celery worker with a sync session. A flush interrupted after
+    the rename leaves FLUSHING_KEY behind; the next flush applies it first.
+    """
+    client = get_redis()
+    if not client.exists(FLUSHING_KEY):
+        try:
+            client.rename(USAGE_KEY, FLUSHING_KEY)
+        except Exception:
+            # Nothing recorded since the last flush
+            return {}
+
+    counts = {int(template_id): int(count) for template_id, count in client.hgetall(FLUSHING_KEY).items()}
+    if counts:
+        templates = Template.__table__
+        db.execute(
+            update(templates)
+            .where(templates.c.id == bindparam("template_id"))
+            # Keep updated_at: usage is not an edit of the template
+            .values(usage_count=templates.c.usage_count + bindparam("uses"), updated_at=templates.c.updated_at),
+            [{"template_id": template_id, "uses": count} for template_id, count in counts.items()]
+        )
+        db.commit()
+    client.delete(FLUSHING_KEY)
+    return counts
@@ -0,0 +1,973 @@
+"""
+Tokenizer and parser for the subset of the Ruby DSL used in Vagrantfiles.
+
+Both stages make a single pass over their input, so parsing is linear in the
+size of the file. The result is a small AST of assignments, method calls with
+their do...end blocks, and keyword blocks (if/unless/case/def/...) whose
+bodies are parsed like any other block. Expressions the parser does not
+evaluate are kept as their source text (Expr), including shell commands,
+regexps and anything the tokenizer does not recognise.
+
+Most lines of a Vagrantfile are simple statements (`a.b = "x"`,
+`a.b "x", key: 1`). The tokenizer matches each of those with one regex and
+hands the parser a finished node, so only the remaining lines pay for
+token-by-token parsing.
+"""
+import re
+import textwrap
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+class DSLSyntaxError(ValueError):
+    """Raised when a Vagrantfile cannot be tokenized or its blocks do not balance"""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+class Symbol(str):
+    """A Ruby symbol literal, e.g. :virtualbox"""
+
+
+class Expr(str):
+    """Source text of an expression that is not evaluated"""
+
+
+@dataclass(slots=True)
+class Token:
+    kind: str
+    value: Any
+    line: int
+    start: int
+    end: int
+    spaced: bool = False
+
+    def is_op(self, value: str) -> bool:
+        return self.kind == 'op' and self.value == value
+
+    def is_keyword(self, value: str) -> bool:
+        return self.kind == 'keyword' and self.value == value
+
+
+@dataclass
+class Block:
+    """A do...end (or brace) block with its parameters"""
+    params: List[str]
+    body: List["Node"]
+    line: int
+
+
+@dataclass
+class Call:
+    """A method call statement, e.g. config.vm.network "private_network", ip: "..." """
+    target: Tuple[str, ...]
+    args: List[Any]
+    kwargs: Dict[str, Any]
+    block: Optional[Block]
+    line: int
+
+
+@dataclass
+class Assignment:
+    """An attribute or variable assignment, e.g. config.vm.box = "ubuntu/jammy64" """
+    target: Tuple[str, ...]
+    value: Any
+    line: int
+
+
+@dataclass
+class Branch:
+    """A keyword block (if, unless, case, def, ...); only its body is kept"""
+    keyword: str
+    body: List["Node"]
+    line: int
+
+
+Node = Union[Call, Assignment, Branch]
+
+KEYWORDS = {
+    'do', 'end', 'if', 'unless', 'while', 'until', 'case', 'begin', 'def', 'class',
+    'module', 'for', 'then', 'else', 'elsif', 'when', 'rescue', 'ensure',
+}
+# Keywords that open a block closed by `end`
+BLOCK_OPENERS = {'if', 'unless', 'while', 'until', 'case', 'begin', 'def', 'class', 'module', 'for'}
+# Openers that are modifiers when they follow an expression (`x = 1 if y`)
+MODIFIERS = {'if', 'unless', 'while', 'until', 'rescue'}
+# Keywords that separate clauses inside a block; the first group is followed by a condition
+CONDITION_CLAUSES = {'elsif', 'when', 'rescue'}
+CLAUSE_KEYWORDS = CONDITION_CLAUSES | {'then', 'else', 'ensure'}
+
+ASSIGN_OPS = {'=', '||=', '&&=', '+=', '-=', '*=', '/=', '%=', '**=', '|=', '&=', '^=', '<<=', '>>='}
+BINARY_OPS = {
+    '+', '-', '*', '/', '%', '**', '==', '!=', '===', '<', '>', '<=', '>=', '<=>',
+    '&&', '||', '=~', '!~', '<<', '>>', '&', '|', '^', '..', '...',
+}
+PREFIX_OPS = {'-', '+', '!', '~', '*', '**', '&', '::'}
+# A newline after one of these continues the statement on the next line
+CONTINUATION_OPS = ASSIGN_OPS | {
+    ',', '=>', '.', '&.', '::', '?', ':', '&&', '||', '+', '-', '*', '/', '==', '!=', '<<',
+}
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+CLOSERS = {')', ']', '}'}
+VALUE_TERMINATORS = CLOSERS | {',', '=>'}
+
+# Leading whitespace, comments and line continuations are matched together
+# with the token that follows them, so each token costs one regex match
+_TOKEN_RE = re.compile(r'''
+    (?P<space>(?:[ \t\r\f]+|\\\r?\n|\#[^\n]*)*)
+    (?:
+        (?P<ident>(?:@@?|\$)?[A-Za-z_]\w*(?:[?!](?![=~]))?)(?P<label>:(?!:))?
+      | (?P<newline>\n)
+      | (?P<string>"[^"\\\#\n]*")
+      | (?P<sstring>'(?:[^'\\]|\\.)*')
+      | (?P<number>\d[\d_]*(?:\.\d[\d_]*)?(?:[eE][+-]?\d+)?)
+      | (?P<symbol>:(?:[A-Za-z_]\w*[?!]?|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'))
+      | (?P<heredoc><<(?P<hd>[-~]?)(?:"(?P<hq>\w+)"|'(?P<hs>\w+)'|(?P<hb>(?<=[-~])[A-Za-z_]\w*|[A-Z_][A-Z0-9_]*\b)))
+      | (?P<xstring>`)
+      | (?P<percent>%(?:(?P<pf>[qQwWiIxrs])(?P<po>[^\w\s])|(?P<pb>[\[({<])))
+      | (?P<op>\*\*=|<<=|>>=|\|\|=|&&=|===|<=>|\.\.\.|[-+*/%|&^]=|::|=>|==|!=|=~|!~|<=|>=
+            |&&|\|\||<<|>>|\*\*|\.\.|&\.|->|[=+\-*/%<>!&|^~?:.,()\[\]{}])
+      | (?P<semicolon>;)
+      | (?P<dquote>")
+      | (?P<eof>\Z)
+      | (?P<other>.)
+    )
+''', re.VERBOSE)
+
+# Values a simple statement may use: plain strings, symbols, numbers,
+# true/false/nil, flat arrays of those and heredocs
+_LITERAL = r'''(?:"[^"\\\#\n]*"|'[^'\\\n]*'|:[A-Za-z_]\w*[?!]?|\d+(?:\.\d+)?(?![\w.])|(?:true|false|nil)(?![\w?!]))'''
+_HEREDOC = r'''<<[-~]?(?:"\w+"|'\w+'|(?<=[-~])[A-Za-z_]\w*|[A-Z_][A-Z0-9_]*\b)'''
+_VALUE = rf'''(?:{_LITERAL}|{_HEREDOC}|\[[ \t]*(?:{_LITERAL}(?:[ \t]*,[ \t]*{_LITERAL})*)?[ \t]*\])'''
+_ARGUMENT = rf'''(?:[A-Za-z_]\w*:(?!:)[ \t]*)?{_VALUE}'''
+# Trailing space and comment, and the newline unless the next line continues
+# the statement with .method
+_STATEMENT_END = r'''[ \t\r]*(?:\#[^\n]*)?(?:\n(?![ \t\r\f]*&?\.(?!\.))|\Z)'''
+_NOT_KEYWORD = '|'.join(sorted(KEYWORDS | {'__END__'}))
+
+# A whole line holding `end`, `a.b = value` or `a.b value, key: value`
+# (optionally opening a do-block) using only literals, or nothing at all
+_SIMPLE_STATEMENT_RE = re.compile(rf'''
+    [ \t]*
+    (?:
+        (?P<close>end){_STATEMENT_END}
+      | (?P<target>(?:@@?|\$)?(?!(?:{_NOT_KEYWORD})(?![\w?!]))[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+        (?:
+            [ \t]*=[ \t]*(?P<assigned>{_VALUE})
+          | (?:[ \t]+(?P<args>{_ARGUMENT}(?:[ \t]*,[ \t]*{_ARGUMENT})*))?
+            (?P<do>[ \t]+do(?:[ \t]*\|[ \t]*(?P<params>[A-Za-z_]\w*(?:[ \t]*,[ \t]*[A-Za-z_]\w*)*)?[ \t]*\|)?)?
+        )
+        {_STATEMENT_END}
+      | {_STATEMENT_END}
+    )
+''', re.VERBOSE)
+_ARGUMENT_RE = re.compile(rf'''(?:(?P<label>[A-Za-z_]\w*):(?!:)[ \t]*)?(?P<value>{_VALUE})''')
+_LITERAL_RE = re.compile(_LITERAL)
+_PARAM_SPLIT = re.compile(r'[ \t]*,[ \t]*')
+_HEREDOC_RE = re.compile(r'''<<([-~]?)["']?(\w+)''')
+
+_DSTRING_CHUNKS = {'"': re.compile(r'[^"\\#\n]+'), '`': re.compile(r'[^`\\#\n]+')}
+_REGEXP_FLAGS = re.compile(r'[a-z]*')
+_LEADING_DOT = re.compile(r'[ \t\r\f]*&?\.(?!\.)')
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 's': ' ', '0': '\0', 'e': '\x1b'}
+_BRACKET_PAIRS = {')': '(', ']': '[', '}': '{'}
+
+
+def tokenize(source: str) -> List[Token]:
+    """Split Vagrantfile source into tokens in one pass"""
+    tokens: List[Token] = []
+    append = tokens.append
+    pending_heredocs: List[Tuple[Token, str, bool, bool]] = []
+    brackets: List[Tuple[str, int]] = []
+    match_token = _TOKEN_RE.match
+    match_statement = _SIMPLE_STATEMENT_RE.match
+    pos = 0
+    line = 1
+    length = len(source)
+    last = None
+    # At the start of a line that begins a new statement
+    statement_start = True
+    # Heredocs opened by a simple statement, filled from the following lines
+    heredocs: List[Tuple[Any, Any, str, int]] = []
+
+    if source.startswith('=begin'):
+        pos, line = _skip_block_comment(source, pos, line)
+
+    while True:
+        if statement_start:
+            statement = match_statement(source, pos)
+            if statement is not None:
+                end = statement.end()
+                if statement.lastgroup is not None:
+                    append(_simple_statement(statement, line, heredocs))
+                    if source[end - 1] == '\n':
+                        # The newline ending the statement
+                        last = Token('newline', None, line, end - 1, end)
+                        append(last)
+                    else:
+                        last = tokens[-1]
+                if pos == end:
+                    statement_start = False
+                    continue
+                pos = end
+                if source[end - 1] == '\n':
+                    line += 1
+                    if heredocs:
+                        pos, line = _fill_heredocs(source, pos, line, heredocs)
+                    if source.startswith('=begin', pos):
+                        pos, line = _skip_block_comment(source, pos, line)
+                continue
+            statement_start = False
+
+        match = match_token(source, pos)
+        kind = match.lastgroup
+        start = match.end('space')
+        spaced = start > pos
+        if spaced and '\\' in source[pos:start]:
+            line += source.count('\n', pos, start)
+        pos = match.end()
+
+        if kind == 'ident':
+            value = match.group('ident')
+            if value in KEYWORDS:
+                last = Token('keyword', value, line, start, pos, spaced)
+            elif value == '__END__' and (start == 0 or source[start - 1] == '\n'):
+                break
+            else:
+                last = Token('ident', value, line, start, pos, spaced)
+        elif kind == 'op':
+            value = match.group('op')
+            if value in OPENERS:
+                brackets.append((value, line))
+            elif value in CLOSERS:
+                if not brackets or brackets[-1][0] != _BRACKET_PAIRS[value]:
+                    raise DSLSyntaxError(f"unmatched {value!r}", line)
+                brackets.pop()
+            elif value in ('/', '/=') and _starts_regexp(last, spaced, source, pos):
+                end = _scan_regexp(source, start + 1)
+                if end != -1:
+                    last = Token('regexp', source[start:end], line, start, end, spaced)
+                    line += source.count('\n', start, end)
+                    pos = end
+                    append(last)
+                    continue
+            last = Token('op', value, line, start, pos, spaced)
+        elif kind == 'newline':
+            # Newlines end statements, except inside brackets, after an operator
+            # that expects more, or before a line starting with .method
+            if not brackets and last is not None and last.kind != 'newline' and \
+                    not (last.kind == 'op' and last.value in CONTINUATION_OPS) and \
+                    not _LEADING_DOT.match(source, pos):
+                last = Token('newline', None, line, start, pos)
+                append(last)
+            line += 1
+            if pending_heredocs:
+                for token, identifier, indented, squiggly in pending_heredocs:
+                    token.value, pos, line = _read_heredoc(source, pos, line, token.line, identifier, indented, squiggly)
+                pending_heredocs = []
+            if source.startswith('=begin', pos):
+                pos, line = _skip_block_comment(source, pos, line)
+            statement_start = last is None or last.kind == 'newline'
+            continue
+        elif kind == 'string':
+            last = Token('string', source[start + 1:pos - 1], line, start, pos, spaced)
+        elif kind == 'label':
+            last = Token('label', match.group('ident'), line, start, pos, spaced)
+        elif kind == 'number':
+            text = match.group('number').replace('_', '')
+            number = float(text) if '.' in text or 'e' in text or 'E' in text else int(text)
+            last = Token('number', number, line, start, pos, spaced)
+        elif kind == 'sstring':
+            text = source[start + 1:pos - 1]
+            last = Token('string', text.replace("\\'", "'").replace('\\\\', '\\'), line, start, pos, spaced)
+            line += text.count('\n')
+        elif kind == 'symbol':
+            last = Token('symbol', Symbol(source[start + 1:pos].strip('"\'')), line, start, pos, spaced)
+        elif kind == 'dquote' or kind == 'xstring':
+            value, pos, newlines = _scan_double_quoted(source, start, line)
+            last = Token('string' if kind == 'dquote' else 'xstring', value, line, start, pos, spaced)
+            line += newlines
+        elif kind == 'heredoc':
+            dash, quoted, single, bare = match.group('hd', 'hq', 'hs', 'hb')
+            last = Token('heredoc', '', line, start, pos, spaced)
+            pending_heredocs.append((last, quoted or single or bare, bool(dash), dash == '~'))
+        elif kind == 'percent':
+            flavour, opener = match.group('pf', 'po')
+            content, pos = _scan_percent(source, pos, opener or match.group('pb'), line)
+            if flavour in ('w', 'W', 'i', 'I'):
+                last = Token('words', content.split(), line, start, pos, spaced)
+            elif flavour == 'x':
+                last = Token('xstring', content, line, start, pos, spaced)
+            elif flavour == 'r':
+                pos = _REGEXP_FLAGS.match(source, pos).end()
+                last = Token('regexp', source[start:pos], line, start, pos, spaced)
+            elif flavour == 's':
+                last = Token('symbol', Symbol(content), line, start, pos, spaced)
+            else:
+                last = Token('string', content, line, start, pos, spaced)
+            line += content.count('\n')
+        elif kind == 'semicolon':
+            if last is not None and last.kind != 'newline' and not brackets:
+                last = Token('newline', None, line, start, pos)
+                append(last)
+            continue
+        elif kind == 'other':
+            # Syntax outside the supported subset becomes an opaque expression
+            last = Token('other', match.group('other'), line, start, pos, spaced)
+        else:
+            break
+
+        append(last)
+
+    if brackets:
+        opener, opened_at = brackets[-1]
+        raise DSLSyntaxError(f"unclosed {opener!r}", opened_at)
+    if pending_heredocs:
+        raise DSLSyntaxError(f"unterminated heredoc {pending_heredocs[0][1]}", pending_heredocs[0][0].line)
+    if heredocs:
+        raise DSLSyntaxError(f"unterminated heredoc {heredocs[0][2]}", heredocs[0][3])
+
+    append(Token('eof', None, line, length, length))
+    return tokens
+
+
+def _simple_statement(match: re.Match, line: int, heredocs: List[Tuple[Any, Any, str, int]]) -> Token:
+    """
+    Build the token for a line matched by _SIMPLE_STATEMENT_RE.
+
+    Heredoc values are left as None and queued on heredocs as
+    (container, key, opener, line) for _fill_heredocs.
+    """
+    target, assigned, args_text, do = match.group('target', 'assigned', 'args', 'do')
+    if target is None:
+        return Token('keyword', 'end', line, match.start('close'), match.end('close'))
+
+    start = match.start('target')
+    target = tuple(target.split('.'))
+    if assigned is not None:
+        node = Assignment(target, None, line)
+        if assigned.startswith('<<'):
+            heredocs.append((node, None, assigned, line))
+        else:
+            node.value = _literal(assigned)
+        return Token('assignment', node, line, start, match.end('assigned'))
+
+    args: List[Any] = []
+    kwargs: Dict[str, Any] = {}
+    if args_text is not None:
+        for label, value in _ARGUMENT_RE.findall(args_text):
+            if value.startswith('<<'):
+                heredocs.append((kwargs, label, value, line) if label else (args, len(args), value, line))
+                value = None
+            else:
+                value = _literal(value)
+            if label:
+                kwargs[label] = value
+            else:
+                args.append(value)
+
+    # The parameters of a do-block opened on this line, or None
+    params = None
+    if do is not None:
+        params = _PARAM_SPLIT.split(match.group('params').strip()) if match.group('params') else []
+    end = match.end('do') if do is not None else match.end('args') if args_text is not None else match.end('target')
+    return Token('command', (target, args, kwargs, params), line, start, end)
+
+
+def _fill_heredocs(source: str, pos: int, line: int, heredocs: List[Tuple[Any, Any, str, int]]) -> Tuple[int, int]:
+    """Read the bodies of the heredocs a simple statement opened, in order"""
+    for container, key, opener, opened_at in heredocs:
+        dash, identifier = _HEREDOC_RE.match(opener).groups()
+        body, pos, line = _read_heredoc(source, pos, line, opened_at, identifier, bool(dash), dash == '~')
+        if isinstance(container, Assignment):
+            container.value = body
+        else:
+            container[key] = body
+    heredocs.clear()
+    return pos, line
+
+
+def _literal(text: str) -> Any:
+    """The value of a literal matched by _LITERAL or _VALUE"""
+    first = text[0]
+    if first == '"' or first == "'":
+        return text[1:-1]
+    if first == ':':
+        return Symbol(text[1:])
+    if first == '[':
+        return [_literal(item.group()) for item in _LITERAL_RE.finditer(text, 1)]
+    if first.isdigit():
+        return float(text) if '.' in text else int(text)
+    return {'true': True, 'false': False, 'nil': None}[text]
+
+
+def _starts_regexp(last: Optional[Token], spaced: bool, source: str, pos: int) -> bool:
+    """
+    Whether a `/` starts a regexp literal rather than dividing.
+
+    It does where a value is expected: at the start of a statement, after
+    an operator or keyword, and as the first argument of a call without
+    parentheses (`foo /x/`, but not `foo / x` or `foo/x`).
+    """
+    if last is None or last.kind in ('newline', 'label'):
+        return True
+    if last.kind == 'op':
+        return last.value not in CLOSERS
+    if last.kind == 'keyword':
+        return last.value != 'end'
+    if last.kind == 'ident':
+        return spaced and pos < len(source) and source[pos] not in ' \t='
+    return False
+
+
+def _scan_regexp(source: str, pos: int) -> int:
+    """
+    Position just past the /regexp/ whose body starts at pos, or -1.
+
+    The literal must close on the same line; otherwise the `/` is left to
+    be an operator, so a misread division never swallows later lines.
+    """
+    in_class = False
+    length = len(source)
+    while pos < length:
+        char = source[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if char == '\n':
+            return -1
+        if char == '[':
+            in_class = True
+        elif char == ']':
+            in_class = False
+        elif char == '/' and not in_class:
+            return _REGEXP_FLAGS.match(source, pos + 1).end()
+        elif source.startswith('#{', pos):
+            end = _find_interpolation_end(source, pos + 2)
+            if end == -1:
+                return -1
+            pos = end
+            continue
+        pos += 1
+    return -1
+
+
+def _skip_block_comment(source: str, pos: int, line: int) -> Tuple[int, int]:
+    """Skip a =begin ... =end comment starting at pos"""
+    end = source.find('\n=end', pos)
+    if end == -1:
+        raise DSLSyntaxError("unterminated =begin comment", line)
+    stop = source.find('\n', end + 1)
+    stop = len(source) if stop == -1 else stop
+    return stop, line + source.count('\n', pos, stop)
+
+
+def _scan_double_quoted(source: str, pos: int, line: int) -> Tuple[str, int, int]:
+    """Scan a double-quoted (or backtick) string; interpolations are kept as source text"""
+    parts = []
+    newlines = 0
+    quote = source[pos]
+    match_chunk = _DSTRING_CHUNKS[quote].match
+    pos += 1
+    length = len(source)
+    while pos < length:
+        chunk = match_chunk(source, pos)
+        if chunk:
+            parts.append(chunk.group())
+            pos = chunk.end()
+            continue
+        char = source[pos]
+        if char == quote:
+            return ''.join(parts), pos + 1, newlines
+        if char == '\n':
+            parts.append(char)
+            newlines += 1
+            pos += 1
+        elif char == '\\':
+            escaped = source[pos + 1:pos + 2]
+            parts.append(_ESCAPES.get(escaped, escaped))
+            newlines += escaped == '\n'
+            pos += 2
+        elif source.startswith('#{', pos):
+            end = _find_interpolation_end(source, pos + 2)
+            if end == -1:
+                break
+            parts.append(source[pos:end])
+            newlines += source.count('\n', pos, end)
+            pos = end
+        else:
+            parts.append(char)
+            pos += 1
+    raise DSLSyntaxError("unterminated string", line)
+
+
+def _find_interpolation_end(source: str, pos: int) -> int:
+    """Position just past the `}` closing a #{...} interpolation, or -1"""
+    depth = 1
+    length = len(source)
+    while pos < length:
+        char = source[pos]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        elif char in '"\'':
+            close = source.find(char, pos + 1)
+            if close == -1:
+                return -1
+            pos = close
+        pos += 1
+    return -1
+
+
+def _scan_percent(source: str, pos: int, opener: str, line: int) -> Tuple[str, int]:
+    """Scan the body of a %w[...] / %q(...) / %x!...! literal, allowing nested brackets"""
+    closer = {'[': ']', '(': ')', '{': '}', '<': '>'}.get(opener, opener)
+    depth = 1
+    start = pos
+    length = len(source)
+    while pos < length:
+        char = source[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if char == closer:
+            depth -= 1
+            if depth == 0:
+                return source[start:pos], pos + 1
+        elif char == opener:
+            depth += 1
+        pos += 1
+    raise DSLSyntaxError("unterminated % literal", line)
+
+
+def _read_heredoc(source: str, pos: int, line: int, opened_at: int, identifier: str,
+                  indented: bool, squiggly: bool) -> Tuple[str, int, int]:
+    """Read a heredoc body starting at pos; returns the body and the position and line after it"""
+    lines = []
+    length = len(source)
+    while True:
+        if pos >= length:
+            raise DSLSyntaxError(f"unterminated heredoc {identifier}", opened_at)
+        end = source.find('\n', pos)
+        end = length if end == -1 else end
+        text = source[pos:end]
+        pos = min(end + 1, length)
+        line += 1
+        if (text.strip() if indented else text.rstrip('\r')) == identifier:
+            break
+        lines.append(text)
+
+    body = '\n'.join(lines) + ('\n' if lines else '')
+    return textwrap.dedent(body) if squiggly else body, pos, line
+
+
+class Parser:
+    """Recursive-descent parser over the token list"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.tokens = tokenize(source)
+        self.pos = 0
+
+    def peek(self) -> Token:
+        return self.tokens[self.pos]
+
+    def next(self) -> Token:
+        token = self.tokens[self.pos]
+        if token.kind != 'eof':
+            self.pos += 1
+        return token
+
+    def accept_op(self, value: str) -> bool:
+        if self.tokens[self.pos].is_op(value):
+            self.pos += 1
+            return True
+        return False
+
+    def text_from(self, start: Token) -> Expr:
+        end = self.tokens[self.pos - 1].end if self.pos > 0 else start.end
+        return Expr(self.source[start.start:max(end, start.end)])
+
+    def parse_program(self) -> List[Node]:
+        body = self.parse_statements()
+        token = self.peek()
+        if token.kind != 'eof':
+            raise DSLSyntaxError(f"unexpected '{token.value}'", token.line)
+        return body
+
+    def parse_statements(self) -> List[Node]:
+        """Parse statements up to an `end` or the end of input"""
+        body = []
+        tokens = self.tokens
+        while True:
+            token = tokens[self.pos]
+            if token.kind == 'newline':
+                self.pos += 1
+            elif token.kind == 'assignment':
+                # A line the tokenizer already parsed whole
+                self.pos += 1
+                body.append(token.value)
+            elif token.kind == 'eof' or token.is_keyword('end'):
+                return body
+            elif token.kind == 'keyword' and token.value in CLAUSE_KEYWORDS:
+                self.pos += 1
+                if token.value in CONDITION_CLAUSES:
+                    self.skip_statement()
+            else:
+                body.append(self.parse_statement())
+
+    def parse_body(self, opener: Token) -> List[Node]:
+        body = self.parse_statements()
+        if not self.peek().is_keyword('end'):
+            raise DSLSyntaxError(f"'{opener.value}' is missing its 'end'", opener.line)
+        self.pos += 1
+        return body
+
+    def parse_statement(self) -> Node:
+        token = self.peek()
+
+        # A line the tokenizer already parsed up to its do-block
+        if token.kind == 'command':
+            self.pos += 1
+            target, args, kwargs, params = token.value
+            if params is not None:
+                block = Block(params, self.parse_statements(), token.line)
+                if not self.peek().is_keyword('end'):
+                    raise DSLSyntaxError("'do' is missing its 'end'", token.line)
+                self.pos += 1
+            else:
+                block = self.parse_block()
+            trailing = self.skip_statement()
+            return Call(target, args, kwargs, block or trailing, token.line)
+
+        if token.kind == 'keyword':
+            if token.value in BLOCK_OPENERS:
+                node = self.parse_branch()
+                self.skip_statement()
+                return node
+            raise DSLSyntaxError(f"unexpected '{token.value}'", token.line)
+
+        if token.kind != 'ident':
+            return Call((), [], {}, self.skip_statement(), token.line)
+
+        target, args, kwargs, called = self.parse_chain()
+
+        operator = self.peek()
+        if operator.kind == 'op' and operator.value in ASSIGN_OPS:
+            self.pos += 1
+            value = self.parse_value()
+            self.skip_statement()
+            return Assignment(target, value, token.line)
+
+        if not called and self.starts_argument():
+            args, kwargs = self.parse_arguments()
+
+        block = self.parse_block()
+        trailing = self.skip_statement()
+        return Call(target, args, kwargs, block or trailing, token.line)
+
+    def parse_chain(self) -> Tuple[Tuple[str, ...], List[Any], Dict[str, Any], bool]:
+        """Parse a.b::c(args)[i] and return the names, the last call's arguments and whether it was called"""
+        names = []
+        args: List[Any] = []
+        kwargs: Dict[str, Any] = {}
+        while True:
+            names.append(str(self.next().value))
+            args, kwargs, called = [], {}, False
+
+            token = self.peek()
+            if token.is_op('(') and not token.spaced:
+                args, kwargs = self.parse_paren_arguments()
+                called = True
+                token = self.peek()
+            while token.is_op('[') and not token.spaced:
+                self.skip_brackets()
+                called = True
+                token = self.peek()
+
+            if token.kind == 'op' and token.value in ('.', '&.', '::') and \
+                    self.tokens[self.pos + 1].kind in ('ident', 'keyword', 'label'):
+                self.pos += 1
+                continue
+            return tuple(names), args, kwargs, called
+
+    def starts_argument(self) -> bool:
+        """Whether the next token begins the arguments of a call without parentheses"""
+        token = self.peek()
+        if token.kind in ('string', 'heredoc', 'symbol', 'number', 'label', 'words', 'xstring', 'regexp'):
+            return True
+        if token.kind == 'ident':
+            return token.spaced and token.value not in ('and', 'or')
+        if token.kind == 'op' and token.spaced:
+            if token.value in ('[', '(', '->'):
+                return True
+            following = self.tokens[self.pos + 1]
+            return token.value in PREFIX_OPS and not following.spaced
+        return False
+
+    def parse_paren_arguments(self) -> Tuple[List[Any], Dict[str, Any]]:
+        opener = self.pos
+        self.pos += 1
+        args, kwargs = self.parse_arguments(closer=')')
+        if not self.accept_op(')'):
+            self.pos = opener
+            self.skip_brackets()
+        return args, kwargs
+
+    def parse_arguments(self, closer: Optional[str] = None) -> Tuple[List[Any], Dict[str, Any]]:
+        """Parse positional and keyword arguments, up to the closer or the end of the statement"""
+        args: List[Any] = []
+        kwargs: Dict[str, Any] = {}
+        while True:
+            token = self.peek()
+            if closer is not None and token.is_op(closer):
+                break
+            if token.kind == 'label':
+                self.pos += 1
+                kwargs[token.value] = self.parse_value()
+            else:
+                start = self.pos
+                value = self.parse_value()
+                if self.pos == start:
+                    break
+                if self.accept_op('=>'):
+                    kwargs[str(value)] = self.parse_value()
+                else:
+                    args.append(value)
+            if not self.accept_op(','):
+                break
+        return args, kwargs
+
+    def parse_block(self) -> Optional[Block]:
+        token = self.peek()
+        if token.is_keyword('do'):
+            self.pos += 1
+            params = self.parse_block_params()
+            return Block(params, self.parse_body(token), token.line)
+        if token.is_op('{'):
+            self.pos += 1
+            params = self.parse_block_params()
+            self.skip_brackets(opener_consumed=True)
+            return Block(params, [], token.line)
+        return None
+
+    def parse_block_params(self) -> List[str]:
+        if self.accept_op('||'):
+            return []
+        if not self.accept_op('|'):
+            return []
+        params = []
+        while True:
+            token = self.next()
+            if token.is_op('|') or token.kind in ('eof', 'newline'):
+                return params
+            if token.kind == 'ident':
+                params.append(token.value)
+            elif token.kind == 'label':
+                params.append(token.value)
+
+    def parse_branch(self) -> Branch:
+        """Parse an if/unless/case/def/... block; the condition or signature is skipped"""
+        opener = self.next()
+        while True:
+            token = self.peek()
+            if token.kind in ('newline', 'eof') or token.is_keyword('then') or token.is_keyword('end'):
+                break
+            if token.is_keyword('do'):
+                if opener.value in ('while', 'until', 'for'):
+                    self.pos += 1
+                    break
+                self.parse_block()
+            elif token.kind == 'keyword' and token.value in BLOCK_OPENERS and self.in_value_position():
+                self.parse_branch()
+            else:
+                self.pos += 1
+        return Branch(opener.value, self.parse_body(opener), opener.line)
+
+    def in_value_position(self) -> bool:
+        """Whether a keyword at the current position starts an expression rather than a modifier"""
+        if self.pos == 0:
+            return True
+        previous = self.tokens[self.pos - 1]
+        if previous.kind == 'op':
+            return previous.value not in CLOSERS
+        return previous.kind == 'newline' or previous.kind == 'keyword'
+
+    def skip_statement(self) -> Optional[Block]:
+        """Skip to the end of the statement, keeping nested blocks balanced; return the first do-block"""
+        first_block = None
+        while True:
+            token = self.peek()
+            if token.kind in ('newline', 'eof') or token.is_keyword('end'):
+                return first_block
+            if token.is_keyword('do'):
+                block = self.parse_block()
+                first_block = first_block or block
+            elif token.kind == 'keyword' and token.value in BLOCK_OPENERS and \
+                    (token.value not in MODIFIERS or self.in_value_position()):
+                self.parse_branch()
+            else:
+                self.pos += 1
+
+    def skip_brackets(self, opener_consumed: bool = False) -> None:
+        """Skip a balanced (...), [...] or {...} group; the tokenizer guarantees balance"""
+        depth = 1 if opener_consumed else 0
+        while True:
+            token = self.next()
+            if token.kind == 'eof':
+                return
+            if token.kind == 'op':
+                if token.value in OPENERS:
+                    depth += 1
+                elif token.value in CLOSERS:
+                    depth -= 1
+            if depth == 0:
+                return
+
+    def parse_value(self) -> Any:
+        """Parse an expression; literals become Python values, anything else an Expr"""
+        start = self.peek()
+        value = self.parse_primary()
+        composite = False
+        while True:
+            token = self.peek()
+            if (token.kind == 'op' and token.value in BINARY_OPS) or \
+                    (token.kind == 'ident' and token.value in ('and', 'or')):
+                self.pos += 1
+                self.parse_primary()
+                composite = True
+            elif token.is_op('?'):
+                self.pos += 1
+                self.parse_value()
+                self.accept_op(':')
+                self.parse_value()
+                composite = True
+            else:
+                break
+        return self.text_from(start) if composite else value
+
+    def parse_primary(self) -> Any:
+        token = self.peek()
+        kind = token.kind
+
+        if kind in ('newline', 'eof') or (kind == 'op' and token.value in VALUE_TERMINATORS):
+            return None
+        if kind == 'keyword':
+            if token.value in BLOCK_OPENERS:
+                self.parse_branch()
+                return self.text_from(token)
+            return None
+
+        self.pos += 1
+        if kind in ('string', 'heredoc', 'number', 'symbol', 'words'):
+            return self.parse_postfix(token, token.value)
+        if kind in ('xstring', 'regexp', 'other'):
+            return self.parse_postfix(token, Expr(self.source[token.start:token.end]))
+        if kind == 'ident':
+            if token.value in ('true', 'false', 'nil'):
+                return self.parse_postfix(token, {'true': True, 'false': False, 'nil': None}[token.value])
+            self.pos -= 1
+            called = self.parse_chain()[3]
+            if self.peek().is_op('{'):
+                self.parse_block()
+            elif not called and self.starts_argument():
+                # A call without parentheses, e.g. name.sub /x/, "y"
+                self.parse_arguments()
+            return self.text_from(token)
+        if kind == 'label':
+            self.parse_value()
+            return self.text_from(token)
+
+        value = token.value
+        if value == '[':
+            items = []
+            while not self.accept_op(']'):
+                start = self.pos
+                if self.peek().kind == 'label':
+                    self.pos += 1
+                items.append(self.parse_value())
+                if self.pos == start or not self.accept_op(','):
+                    if not self.accept_op(']'):
+                        self.skip_brackets(opener_consumed=True)
+                    break
+            return self.parse_postfix(token, items)
+        if value == '{':
+            return self.parse_postfix(token, self.parse_hash(token))
+        if value == '(':
+            inner = self.parse_value()
+            if not self.accept_op(')'):
+                self.skip_brackets(opener_consumed=True)
+                return self.text_from(token)
+            return self.parse_postfix(token, inner)
+        if value == '-' and self.peek().kind == 'number' and not self.peek().spaced:
+            return -self.next().value
+        if value == '->':
+            if self.peek().is_op('('):
+                self.skip_brackets()
+            self.parse_block()
+            return self.text_from(token)
+        if value in PREFIX_OPS or value in ('..', '...'):
+            self.parse_primary()
+            return self.text_from(token)
+        return self.text_from(token)
+
+    def parse_hash(self, opener: Token) -> Any:
+        """Parse the entries of a {...} literal, already past the opening brace"""
+        entries: Dict[str, Any] = {}
+        while not self.accept_op('}'):
+            token = self.peek()
+            if token.kind == 'label':
+                self.pos += 1
+                entries[token.value] = self.parse_value()
+            else:
+                key = self.parse_value()
+                if not self.accept_op('=>'):
+                    self.skip_brackets(opener_consumed=True)
+                    return self.text_from(opener)
+                entries[str(key)] = self.parse_value()
+            if not self.accept_op(','):
+                if not self.accept_op('}'):
+                    self.skip_brackets(opener_consumed=True)
+                    return self.text_from(opener)
+                break
+        return entries
+
+    def parse_postfix(self, start: Token, value: Any) -> Any:
+        """Method calls or indexing on a literal turn it into an Expr"""
+        composite = False
+        while True:
+            token = self.peek()
+            if token.kind == 'op' and token.value in ('.', '&.', '::'):
+                self.pos += 2
+                composite = True
+            elif token.kind == 'op' and token.value in ('(', '[') and not token.spaced:
+                self.skip_brackets()
+                composite = True
+            else:
+                break
+        return self.text_from(start) if composite else value
+
+
+def parse_vagrantfile(source: str) -> List[Node]:
+    """Parse Vagrantfile source into a list of top-level nodes"""
+    return Parser(source).parse_program()
+
+
+def walk(nodes: List[Node]) -> Iterator[Node]:
+    """Yield every node in document order, descending into all blocks"""
+    stack = [iter(nodes)]
+    while stack:
+        node = next(stack[-1], None)
+        if node is None:
+            stack.pop()
+            continue
+        yield node
+        if isinstance(node, Branch):
+            stack.append(iter(node.body))
+        elif isinstance(node, Call) and node.block is not None:
+            stack.append(iter(node.block.body))
@@ -1,23 +1,12 @@
-from jinja2 import Template
-from typing import Dict, Any, Optional
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache, Template
+from typing import Dict, Any, Callable
+import hashlib
 
+from app.core.cache import LRUCache
+from app.core.config import settings
 
-class VagrantfileGenerator:
-    """
-    Generate Vagrantfiles from configuration dictionaries.
-    Uses Jinja2 templates for flexible generation.
-    """
-
-    def __init__(self):
-        self.template = self._get_base_template()
-
-    def generate(self, config: Dict[str, Any]) -> str:
-        """Generate a Vagrantfile from configuration"""
-        return self.template.render(config)
 
-    def _get_base_template(self) -> Template:
-        """Get the base Vagrantfile template"""
-        template_str = '''# -*- mode: ruby -*-
+BASE_TEMPLATE = '''# -*- mode: ruby -*-
 # vi: set ft=ruby :
 
 Vagrant.configure("2") do |config|
@@ -96,11 +85,8 @@ Vagrant.configure("2") do |config|
   {%- endif %}
 end
 '''
-        return Template(template_str)
 
-    def generate_proxmox(self, config: Dict[str, Any]) -> str:
-        """Generate a Proxmox-specific Vagrantfile"""
-        proxmox_template = '''# -*- mode: ruby -*-
+PROXMOX_TEMPLATE = '''# -*- mode: ruby -*-
 # vi: set ft=ruby :
 
 Vagrant.configure("2") do |config|
@@ -158,12 +144,8 @@ Vagrant.configure("2") do |config|
   {%- endif %}
 end
 '''
-        template = Template(proxmox_template)
-        return template.render(config)
 
-    def generate_virtualbox(self, config: Dict[str, Any]) -> str:
-        """Generate a VirtualBox-specific Vagrantfile"""
-        virtualbox_template = '''# -*- mode: ruby -*-
+VIRTUALBOX_TEMPLATE = '''# -*- mode: ruby -*-
 # vi: set ft=ruby :
 
 Vagrant.configure("2") do |config|
@@ -223,12 +205,8 @@ Vagrant.configure("2") do |config|
   {%- endif %}
 end
 '''
-        template = Template(virtualbox_template)
-        return template.render(config)
 
-    def generate_hyperv(self, config: Dict[str, Any]) -> str:
-        """Generate a Hyper-V-specific Vagrantfile"""
-        hyperv_template = '''# -*- mode: ruby -*-
+HYPERV_TEMPLATE = '''# -*- mode: ruby -*-
 # vi: set ft=ruby :
 
 Vagrant.configure("2") do |config|
@@ -288,13 +266,8 @@ Vagrant.configure("2") do |config|
   {%- endif %}
 end
 '''
-        template = Template(hyperv_template)
-        return template.render(config)
 
-    def generate_wsl(self, config: Dict[str, Any]) -> str:
-        """Generate a WSL-specific configuration (WSL doesn't use Vagrantfile)"""
-        # WSL doesn't use Vagrantfile traditionally, but we can create a setup script
-        wsl_template = '''# WSL Distribution Configuration
+WSL_TEMPLATE = '''# WSL Distribution Configuration
 # This is not a Vagrantfile - WSL distributions are managed differently
 
 # Distribution: {{ name }}
@@ -324,10 +297,114 @@ end
 # Access the distribution:
 # wsl -d {{ name }}
 '''
-        template = Template(wsl_template)
-        return template.render(config)
+
+BUILTIN_TEMPLATE_SOURCES = {
+    'base': BASE_TEMPLATE,
+    'proxmox': PROXMOX_TEMPLATE,
+    'virtualbox': VIRTUALBOX_TEMPLATE,
+    'hyperv': HYPERV_TEMPLATE,
+    'wsl': WSL_TEMPLATE,
+}
+
+# Changes whenever a built-in template changes, so cached renders from an
+# older deploy are never served
+GENERATOR_VERSION = hashlib.sha256(
+    "\0".join(BUILTIN_TEMPLATE_SOURCES[name] for name in sorted(BUILTIN_TEMPLATE_SOURCES)).encode('utf-8')
+).hexdigest()[:16]
+
+
+def _build_environment() -> Environment:
+    """Shared Jinja environment, with an on-disk bytecode cache if configured"""
+    bytecode_cache = None
+    if settings.JINJA_BYTECODE_CACHE_DIR:
+        bytecode_cache = FileSystemBytecodeCache(settings.JINJA_BYTECODE_CACHE_DIR)
+
+    return Environment(
+        loader=DictLoader(BUILTIN_TEMPLATE_SOURCES),
+        bytecode_cache=bytecode_cache,
+        auto_reload=False
+    )
+
+
+environment = _build_environment()
+
+# Built-in templates are compiled once, at import
+BUILTIN_TEMPLATES: Dict[str, Template] = {
+    name: environment.get_template(name) for name in BUILTIN_TEMPLATE_SOURCES
+}
+
+# Compiled user-supplied templates, keyed by content hash
+_user_templates = LRUCache(settings.USER_TEMPLATE_CACHE_SIZE, name="user_templates")
+
+
+def _compile_user_template(template_content: str, digest: str) -> Template:
+    """Compile user template content, going through the bytecode cache if enabled"""
+    name = f"user:{digest}"
+    bytecode_cache = environment.bytecode_cache
+    if bytecode_cache is None:
+        return environment.from_string(template_content)
+
+    bucket = bytecode_cache.get_bucket(environment, name, None, template_content)
+    code = bucket.code
+    if code is None:
+        code = environment.compile(template_content, name)
+        bucket.code = code
+        bytecode_cache.set_bucket(bucket)
+    return environment.template_class.from_code(environment, code, environment.make_globals(None))
+
+
+def get_user_template(template_content: str) -> Template:
+    """Get a compiled user template from the LRU, compiling it on a miss"""
+    digest = hashlib.sha256(template_content.encode('utf-8')).hexdigest()
+    return _user_templates.get_or_set(
+        digest,
+        lambda: _compile_user_template(template_content, digest)
+    )
+
+
+def get_user_template_stats() -> Dict[str, Any]:
+    return _user_templates.stats()
+
+
+class VagrantfileGenerator:
+    """
+    Generate Vagrantfiles from configuration dictionaries.
+    Uses Jinja2 templates for flexible generation.
+    """
+
+    def __init__(self):
+        self.template = BUILTIN_TEMPLATES['base']
+
+    def renderer_for(self, provider: str) -> Callable[[Dict[str, Any]], str]:
+        """Get the provider-specific generate method, falling back to the base template"""
+        return {
+            'proxmox': self.generate_proxmox,
+            'virtualbox': self.generate_virtualbox,
+            'hyperv': self.generate_hyperv,
+            'wsl': self.generate_wsl,
+        }.get(provider, self.generate)
+
+    def generate(self, config: Dict[str, Any]) -> str:
+        """Generate a Vagrantfile from configuration"""
+        return self.template.render(config)
+
+    def generate_proxmox(self, config: Dict[str, Any]) -> str:
+        """Generate a Proxmox-specific Vagrantfile"""
+        return BUILTIN_TEMPLATES['proxmox'].render(config)
+
+    def generate_virtualbox(self, config: Dict[str, Any]) -> str:
+        """Generate a VirtualBox-specific Vagrantfile"""
+        return BUILTIN_TEMPLATES['virtualbox'].render(config)
+
+    def generate_hyperv(self, config: Dict[str, Any]) -> str:
+        """Generate a Hyper-V-specific Vagrantfile"""
+        return BUILTIN_TEMPLATES['hyperv'].render(config)
+
+    def generate_wsl(self, config: Dict[str, Any]) -> str:
+        """Generate a WSL-specific configuration (WSL doesn't use Vagrantfile)"""
+        # WSL doesn't use Vagrantfile traditionally, but the template renders a setup script
+        return BUILTIN_TEMPLATES['wsl'].render(config)
 
     def generate_from_template(self, template_content: str, config: Dict[str, Any]) -> str:
         """Generate a Vagrantfile from a custom template"""
-        template = Template(template_content)
-        return template.render(config)
+        return get_user_template(template_content).render(config)
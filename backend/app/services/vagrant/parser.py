@@ -1,110 +1,36 @@
-import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+from app.services.vagrant.dsl import (
+    Assignment, Block, Branch, Call, DSLSyntaxError, Node, parse_vagrantfile, walk
+)
 
 
 class VagrantfileParser:
     """
     Parse existing Vagrantfiles and extract configuration.
 
-    This is a basic parser that extracts common Vagrant configurations.
-    For complex Ruby DSL, this may not capture everything, but handles
-    the most common use cases.
+    The Vagrantfile is tokenized and parsed once into a small AST (see
+    app.services.vagrant.dsl) and configuration is read from the
+    Vagrant.configure block, including multi-machine config.vm.define blocks.
+    Expressions that are not literals are returned as their source text.
     """
 
     def parse(self, vagrantfile_content: str) -> Dict[str, Any]:
         """Parse a Vagrantfile and extract configuration"""
-        config = {
-            "box": None,
-            "box_version": None,
-            "hostname": None,
-            "provider": "virtualbox",
-            "cpus": None,
-            "memory": None,
-            "networks": [],
-            "synced_folders": [],
-            "provisioners": [],
-            "provider_config": {}
-        }
+        program = parse_vagrantfile(vagrantfile_content)
+        statements, var = self._configure_block(program)
 
-        # Extract box name
-        box_match = re.search(r'config\.vm\.box\s*=\s*["\']([^"\']+)["\']', vagrantfile_content)
-        if box_match:
-            config["box"] = box_match.group(1)
-
-        # Extract box version
-        version_match = re.search(r'config\.vm\.box_version\s*=\s*["\']([^"\']+)["\']', vagrantfile_content)
-        if version_match:
-            config["box_version"] = version_match.group(1)
-
-        # Extract hostname
-        hostname_match = re.search(r'config\.vm\.hostname\s*=\s*["\']([^"\']+)["\']', vagrantfile_content)
-        if hostname_match:
-            config["hostname"] = hostname_match.group(1)
-
-        # Extract provider (look for config.vm.provider blocks)
-        provider_match = re.search(r'config\.vm\.provider\s+["\']?(\w+)["\']?\s+do', vagrantfile_content)
-        if provider_match:
-            config["provider"] = provider_match.group(1)
-
-        # Extract CPU and memory (VirtualBox syntax)
-        cpus_match = re.search(r'vb\.cpus\s*=\s*(\d+)', vagrantfile_content)
-        if cpus_match:
-            config["cpus"] = int(cpus_match.group(1))
-
-        memory_match = re.search(r'vb\.memory\s*=\s*["\']?(\d+)["\']?', vagrantfile_content)
-        if memory_match:
-            config["memory"] = int(memory_match.group(1))
-
-        # Extract networks
-        network_patterns = [
-            r'config\.vm\.network\s+["\']private_network["\'],\s*ip:\s*["\']([^"\']+)["\']',
-            r'config\.vm\.network\s+["\']public_network["\'](?:,\s*bridge:\s*["\']([^"\']+)["\'])?',
-            r'config\.vm\.network\s+["\']forwarded_port["\'],\s*guest:\s*(\d+),\s*host:\s*(\d+)'
-        ]
-
-        for pattern in network_patterns:
-            for match in re.finditer(pattern, vagrantfile_content):
-                if "private_network" in pattern:
-                    config["networks"].append({
-                        "type": "private_network",
-                        "ip": match.group(1)
-                    })
-                elif "public_network" in pattern:
-                    network = {"type": "public_network"}
-                    if match.group(1):
-                        network["bridge"] = match.group(1)
-                    config["networks"].append(network)
-                elif "forwarded_port" in pattern:
-                    config["networks"].append({
-                        "type": "forwarded_port",
-                        "guest_port": int(match.group(1)),
-                        "host_port": int(match.group(2))
-                    })
-
-        # Extract synced folders
-        synced_folder_pattern = r'config\.vm\.synced_folder\s+["\']([^"\']+)["\'],\s*["\']([^"\']+)["\']'
-        for match in re.finditer(synced_folder_pattern, vagrantfile_content):
-            config["synced_folders"].append({
-                "host_path": match.group(1),
-                "guest_path": match.group(2)
-            })
-
-        # Extract shell provisioners (inline)
-        inline_provision_pattern = r'config\.vm\.provision\s+["\']shell["\'],\s*inline:\s*<<-SHELL(.*?)SHELL'
-        for match in re.finditer(inline_provision_pattern, vagrantfile_content, re.DOTALL):
-            script_content = match.group(1).strip()
-            config["provisioners"].append({
-                "type": "shell",
-                "inline": [line.strip() for line in script_content.split('\n') if line.strip()]
-            })
-
-        # Extract shell provisioners (path)
-        path_provision_pattern = r'config\.vm\.provision\s+["\']shell["\'],\s*path:\s*["\']([^"\']+)["\']'
-        for match in re.finditer(path_provision_pattern, vagrantfile_content):
-            config["provisioners"].append({
-                "type": "shell",
-                "path": match.group(1)
-            })
+        config = self._machine_config(statements, var, "virtualbox")
+        config["machines"] = []
+
+        for node in self._statements(statements, var):
+            if isinstance(node, Call) and node.target == (var, 'vm', 'define') and node.block:
+                params = node.block.params
+                machine = {"name": str(node.args[0]) if node.args else None}
+                machine.update(self._machine_config(
+                    node.block.body, params[0] if params else var, config["provider"]
+                ))
+                config["machines"].append(machine)
 
         return config
 
@@ -117,46 +43,198 @@ class VagrantfileParser:
         if 'Vagrant.configure' not in vagrantfile_content:
             return False
 
-        # Check for balanced do...end blocks
-        do_count = len(re.findall(r'\bdo\b', vagrantfile_content))
-        end_count = len(re.findall(r'\bend\b', vagrantfile_content))
-
-        if do_count != end_count:
+        # Check that strings, brackets, heredocs and do/if/...end blocks balance
+        try:
+            program = parse_vagrantfile(vagrantfile_content)
+        except DSLSyntaxError:
             return False
 
         # Check for at least a box definition
-        if not re.search(r'config\.vm\.box\s*=', vagrantfile_content):
-            return False
-
-        return True
+        return any(
+            isinstance(node, Assignment) and node.target[-2:] == ('vm', 'box')
+            for node in walk(program)
+        )
 
     def extract_provider_config(self, vagrantfile_content: str, provider: str) -> Dict[str, Any]:
         """Extract provider-specific configuration"""
-        provider_config = {}
-
-        # Find provider block
-        provider_block_pattern = rf'config\.vm\.provider\s+["\']?{provider}["\']?\s+do\s*\|(\w+)\|(.*?)end'
-        match = re.search(provider_block_pattern, vagrantfile_content, re.DOTALL)
-
-        if match:
-            provider_var = match.group(1)
-            block_content = match.group(2)
-
-            # Extract key-value assignments
-            assignment_pattern = rf'{provider_var}\.(\w+)\s*=\s*["\']?([^"\'\n]+)["\']?'
-            for assignment in re.finditer(assignment_pattern, block_content):
-                key = assignment.group(1)
-                value = assignment.group(2).strip()
-
-                # Try to convert to appropriate type
-                try:
-                    if value.isdigit():
-                        provider_config[key] = int(value)
-                    elif value.lower() in ('true', 'false'):
-                        provider_config[key] = value.lower() == 'true'
-                    else:
-                        provider_config[key] = value
-                except:
-                    provider_config[key] = value
-
-        return provider_config
+        for node in walk(parse_vagrantfile(vagrantfile_content)):
+            if isinstance(node, Call) and node.target[-2:] == ('vm', 'provider') and node.block \
+                    and node.args and str(node.args[0]) == provider:
+                return self._block_assignments(node.block)
+
+        return {}
+
+    def _configure_block(self, program: List[Node]) -> Tuple[List[Node], str]:
+        """Find the Vagrant.configure block and its config variable name"""
+        for node in walk(program):
+            if isinstance(node, Call) and node.target == ('Vagrant', 'configure') and node.block:
+                params = node.block.params
+                return node.block.body, params[0] if params else 'config'
+
+        # Fragments without a Vagrant.configure wrapper
+        return program, 'config'
+
+    def _statements(self, statements: List[Node], var: str) -> Iterator[Node]:
+        """
+        Yield statements in order, looking inside conditionals and loops but
+        not inside var.vm.* blocks (providers, provisioners, machine definitions).
+        """
+        stack = [iter(statements)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+            yield node
+            if isinstance(node, Branch):
+                stack.append(iter(node.body))
+            elif isinstance(node, Call) and node.block and node.target[:2] != (var, 'vm'):
+                stack.append(iter(node.block.body))
+
+    def _machine_config(self, statements: List[Node], var: str, default_provider: str) -> Dict[str, Any]:
+        """Extract the configuration set through var.vm.* in a block"""
+        config = {
+            "box": None,
+            "box_version": None,
+            "hostname": None,
+            "provider": default_provider,
+            "cpus": None,
+            "memory": None,
+            "networks": [],
+            "synced_folders": [],
+            "provisioners": [],
+            "provider_config": {}
+        }
+        provider_block: Optional[Block] = None
+        provider_found = False
+
+        for node in self._statements(statements, var):
+            if isinstance(node, Branch) or len(node.target) != 3 or node.target[:2] != (var, 'vm'):
+                continue
+            attribute = node.target[2]
+
+            if isinstance(node, Assignment):
+                if attribute in ('box', 'box_version', 'hostname') and isinstance(node.value, str) and node.value:
+                    config[attribute] = str(node.value)
+            elif attribute == 'provider' and node.args and not provider_found:
+                provider_found = True
+                config["provider"] = str(node.args[0])
+                provider_block = node.block
+            elif attribute == 'network':
+                network = self._network(node)
+                if network:
+                    config["networks"].append(network)
+            elif attribute == 'synced_folder' and len(node.args) >= 2:
+                folder = {
+                    "host_path": str(node.args[0]),
+                    "guest_path": str(node.args[1])
+                }
+                if node.kwargs.get('type'):
+                    folder["type"] = str(node.kwargs['type'])
+                config["synced_folders"].append(folder)
+            elif attribute == 'provision':
+                provisioner = self._provisioner(node)
+                if provisioner:
+                    config["provisioners"].append(provisioner)
+
+        if provider_block is not None:
+            provider_config = self._block_assignments(provider_block)
+            for key in ('cpus', 'memory'):
+                value = provider_config.pop(key, None)
+                if isinstance(value, int) and not isinstance(value, bool):
+                    config[key] = value
+            config["provider_config"] = provider_config
+
+        return config
+
+    def _network(self, node: Call) -> Optional[Dict[str, Any]]:
+        if not node.args:
+            return None
+
+        network_type = str(node.args[0])
+        options = node.kwargs
+
+        if network_type == 'private_network':
+            if 'ip' not in options:
+                return None
+            return {"type": network_type, "ip": str(options['ip'])}
+        if network_type == 'public_network':
+            network = {"type": network_type}
+            if options.get('bridge'):
+                network["bridge"] = options['bridge'] if isinstance(options['bridge'], list) else str(options['bridge'])
+            return network
+        if network_type == 'forwarded_port':
+            guest, host = self._coerce(options.get('guest')), self._coerce(options.get('host'))
+            if not isinstance(guest, int) or not isinstance(host, int):
+                return None
+            return {"type": network_type, "guest_port": guest, "host_port": host}
+
+        return {"type": network_type}
+
+    def _provisioner(self, node: Call) -> Optional[Dict[str, Any]]:
+        if not node.args:
+            return None
+
+        # Options may be passed as keywords or assigned inside a do-block
+        options = dict(node.kwargs)
+        if node.block:
+            options.update(self._block_assignments(node.block, coerce=False))
+
+        provisioner: Dict[str, Any] = {"type": str(node.args[0])}
+
+        inline = options.get('inline')
+        if isinstance(inline, list):
+            provisioner["inline"] = [str(line) for line in inline]
+        elif isinstance(inline, str):
+            provisioner["inline"] = [line.strip() for line in inline.split('\n') if line.strip()]
+
+        for key in ('path', 'playbook'):
+            if isinstance(options.get(key), str):
+                provisioner[key] = str(options[key])
+
+        args = options.get('args')
+        if isinstance(args, list):
+            provisioner["args"] = [str(arg) for arg in args]
+        elif isinstance(args, str):
+            provisioner["args"] = [str(args)]
+
+        return provisioner
+
+    def _block_assignments(self, block: Block, coerce: bool = True) -> Dict[str, Any]:
+        """Collect `param.key = value` assignments made in a block"""
+        var = block.params[0] if block.params else None
+        assignments = {}
+
+        for node in walk(block.body):
+            if isinstance(node, Assignment) and len(node.target) == 2 and node.target[0] == var:
+                assignments[node.target[1]] = self._coerce(node.value) if coerce else node.value
+
+        return assignments
+
+    def _coerce(self, value: Any) -> Any:
+        """Convert quoted numbers and booleans the way Vagrant configs usually mean them"""
+        if not isinstance(value, str):
+            return value
+
+        value = str(value)
+        if value.isdigit():
+            return int(value)
+        if value.lower() in ('true', 'false'):
+            return value.lower() == 'true'
+        return value
+
+
+def parse_vagrantfiles(contents: List[str]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Parse a batch of Vagrantfiles, returning (config, error) per entry.
+
+    Module-level so it can be sent to a process pool.
+    """
+    parser = VagrantfileParser()
+    results = []
+    for content in contents:
+        try:
+            results.append((parser.parse(content), None))
+        except (DSLSyntaxError, RecursionError) as e:
+            results.append((None, str(e) or "nesting too deep"))
+    return results
@@ -0,0 +1,103 @@
+from typing import Any, Callable, Dict
+import hashlib
+import json
+
+from redis.exceptions import RedisError
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import register_cache
+from app.core.redis import get_async_redis
+from app.services.vagrant.generator import GENERATOR_VERSION, get_user_template_stats
+
+RENDER_KEY_PREFIX = "gaia:vagrantfile:"
+
+
+def render_key(template: str, config: Dict[str, Any]) -> str:
+    """
+    Canonical hash of (template, generator version, config).
+
+    Keys are sorted so dict ordering does not matter. None values are kept:
+    a key set to None renders differently from a missing key.
+    """
+    payload = json.dumps(
+        {"template": template, "version": GENERATOR_VERSION, "config": config},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """
+    Cache of rendered Vagrantfiles.
+
+    Lookups go to an in-process LRU first, then (if enabled) to Redis, so
+    replicas share renders. Redis errors fall through to rendering.
+    """
+
+    def __init__(self, maxsize: int):
+        self.local = LRUCache(maxsize, name="renders")
+        self.redis_hits = 0
+        self.redis_misses = 0
+        register_cache("renders_redis", lambda: {"hits": self.redis_hits, "misses": self.redis_misses})
+
+    async def render(self, template: str, config: Dict[str, Any],
+                     render_func: Callable[[Dict[str, Any]], str]) -> str:
+        """Return the cached render for template + config, rendering on a miss"""
+        key = render_key(template, config)
+        content = self.local.get(key)
+        if content is not None:
+            return content
+
+        if settings.RENDER_CACHE_REDIS:
+            content = await self._redis_get(key)
+            if content is not None:
+                self.local.set(key, content)
+                return content
+
+        content = render_func(config)
+        self.local.set(key, content)
+
+        if settings.RENDER_CACHE_REDIS:
+            await self._redis_set(key, content)
+
+        return content
+
+    async def _redis_get(self, key: str):
+        try:
+            content = await get_async_redis().get(RENDER_KEY_PREFIX + key)
+        except RedisError as e:
+            print(f"Render cache read failed: {e}")
+            return None
+
+        if content is None:
+            self.redis_misses += 1
+        else:
+            self.redis_hits += 1
+        return content
+
+    async def _redis_set(self, key: str, content: str) -> None:
+        try:
+            await get_async_redis().set(RENDER_KEY_PREFIX + key, content, ex=settings.RENDER_CACHE_TTL)
+        except RedisError as e:
+            print(f"Render cache write failed: {e}")
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "generator_version": GENERATOR_VERSION,
+            "renders": self.local.stats(),
+            "redis": {
+                "enabled": settings.RENDER_CACHE_REDIS,
+                "hits": self.redis_hits,
+                "misses": self.redis_misses
+            },
+            "user_templates": get_user_template_stats()
+        }
+
+
+render_cache = RenderCache(settings.RENDER_CACHE_SIZE)
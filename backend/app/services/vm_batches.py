@@ -0,0 +1,27 @@
+from typing import Dict, Any, List, Optional
+import json
+import time
+
+from app.core.config import settings
+from app.core.redis import get_async_redis
+
+BATCH_KEY = "gaia:vm_batch:{batch_id}"
+
+
+async def save_batch(batch_id: str, provider: str, vm_ids: List[int], concurrency: int) -> None:
+    """Record which VMs belong to a batch so its progress can be aggregated later"""
+    await get_async_redis().set(
+        BATCH_KEY.format(batch_id=batch_id),
+        json.dumps({
+            "provider": provider,
+            "vm_ids": vm_ids,
+            "concurrency": concurrency,
+            "created_at": time.time(),
+        }),
+        ex=settings.VM_BATCH_TTL
+    )
+
+
+async def load_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    raw = await get_async_redis().get(BATCH_KEY.format(batch_id=batch_id))
+    return json.loads(raw) if raw is not None else None
@@ -1,23 +1,50 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from fastapi import BackgroundTasks, HTTPException
+from typing import Dict, List, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
 
+from app.core.pagination import Page, paginate
 from app.models.vm import VirtualMachine
-from app.schemas.vm import VMCreate, VMResponse, VMStatus, VMState
+from app.schemas.vm import VMCreate, VMResponse, VMStatus, VMState, VMBatchCreate, VMBatchResponse, VMBatchProgress
 from app.services.providers.base import ProviderRegistry
 from app.services.vagrant.generator import VagrantfileGenerator
-from app.tasks.vm_tasks import create_vm_task, start_vm_task, stop_vm_task, delete_vm_task
+from app.services.vagrant.render_cache import render_cache
+from app.services import status_snapshot
+from app.services.events import apublish_event
+from app.services.template_cache import ResolvedTemplate, resolve_template
+from app.services.template_usage import record_usage
+from app.services.vm_batches import save_batch, load_batch
+from app.services.operation_service import OperationService
+from app.schemas.operation import OperationType
+from app.tasks.dispatch import (
+    dispatch_create_vm, dispatch_create_vm_batch, dispatch_start_vm, dispatch_stop_vm, dispatch_delete_vm
+)
+from app.core.config import settings
+from datetime import datetime, timezone
+import asyncio
 import os
 
+# Stands in for the VM name in a batch's shared Vagrantfile render
+BATCH_NAME_PLACEHOLDER = "__gaia_batch_vm_name__"
+
 
 class VMService:
     """Service for managing virtual machines"""
 
-    def __init__(self, db: Session):
+    # Columns returned by list views that skip config
+    SUMMARY_FIELDS = ("id", "name", "provider", "state", "description", "created_at", "updated_at")
+    LIST_FIELDS = (
+        "id", "name", "provider", "state", "config", "description",
+        "vagrantfile_path", "provider_vm_id", "created_at", "updated_at"
+    )
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.vagrant_generator = VagrantfileGenerator()
+        self.operations = OperationService(db)
 
-    async def create_vm(self, vm_data: VMCreate, background_tasks: BackgroundTasks) -> VirtualMachine:
+    async def create_vm(self, vm_data: VMCreate) -> VirtualMachine:
         """Create a new virtual machine"""
 
         # Validate provider
@@ -25,6 +52,11 @@ class VMService:
         if not provider:
             raise HTTPException(status_code=400, detail=f"Provider '{vm_data.provider}' not found")
 
+        # Merge the template's config under the request's
+        template = await self._resolve_template(vm_data.template_id, vm_data.provider)
+        if template:
+            vm_data = vm_data.model_copy(update={"config": template.merged_config(vm_data.config)})
+
         # Create database record
         vm = VirtualMachine(
             name=vm_data.name,
@@ -35,39 +67,184 @@ class VMService:
         )
 
         self.db.add(vm)
-        self.db.commit()
-        self.db.refresh(vm)
+        await self.db.commit()
+        await self.db.refresh(vm)
 
         # Generate Vagrantfile if not provided
         if not vm_data.vagrantfile_content:
-            vagrantfile_content = self._generate_vagrantfile(vm_data)
+            vagrantfile_content = await self._generate_vagrantfile(vm_data)
         else:
             vagrantfile_content = vm_data.vagrantfile_content
 
         # Save Vagrantfile
         vagrantfile_path = self._save_vagrantfile(vm.id, vagrantfile_content)
         vm.vagrantfile_path = vagrantfile_path
-        self.db.commit()
+        operation = self.operations.queue(vm.id, vm.provider, OperationType.CREATE)
+        await self.db.commit()
+        await self.db.refresh(vm)
 
-        # Queue async creation task
-        background_tasks.add_task(create_vm_task, vm.id, vm_data.config)
+        # Queue creation on the provider's worker queue
+        vm.task_id = dispatch_create_vm(vm.id, vm.provider, vm_data.config, operation.task_id)
+        vm.operation_id = operation.id
+        await apublish_event("vm.state", vm.id, vm.provider, state=vm.state.value, operation="create")
+        if template:
+            await record_usage(template.id)
 
         return vm
 
-    async def list_vms(self, skip: int = 0, limit: int = 100, provider: str = None) -> List[VirtualMachine]:
-        """List virtual machines"""
-        query = self.db.query(VirtualMachine)
+    async def create_vm_batch(self, batch_data: VMBatchCreate) -> VMBatchResponse:
+        """
+        Create many VMs from one template or config.
+
+        All rows are inserted in a single transaction, the Vagrantfile is
+        rendered once and stamped with each VM's name, and creation is fanned
+        out as one Celery group capped at `concurrency` VMs at a time.
+        """
+        provider = ProviderRegistry.get_provider(batch_data.provider)
+        if not provider:
+            raise HTTPException(status_code=400, detail=f"Provider '{batch_data.provider}' not found")
+        if batch_data.count > settings.VM_BATCH_MAX_COUNT:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.VM_BATCH_MAX_COUNT} VMs can be created in one batch"
+            )
+
+        # Checked one name at a time, so a huge format width fails on the first
+        max_length = VirtualMachine.name.type.length
+        names = []
+        for index in range(batch_data.start_index, batch_data.start_index + batch_data.count):
+            try:
+                name = batch_data.name_pattern.format(index=index)
+            except (KeyError, IndexError, ValueError, AttributeError, TypeError) as e:
+                raise HTTPException(status_code=400, detail=f"Invalid name pattern: {e}")
+            if len(name) > max_length:
+                raise HTTPException(status_code=400, detail=f"VM names must be at most {max_length} characters")
+            names.append(name)
+        if len(set(names)) != len(names):
+            raise HTTPException(status_code=400, detail="Name pattern must include {index}")
+
+        template = await self._resolve_template(batch_data.template_id, batch_data.provider)
+        config = template.merged_config(batch_data.config) if template else batch_data.config
+
+        if batch_data.vagrantfile_content:
+            vagrantfile_content = batch_data.vagrantfile_content
+        else:
+            # Render once with a placeholder name, then substitute per VM
+            vagrantfile_content = await self._render_vagrantfile(
+                batch_data.provider, BATCH_NAME_PLACEHOLDER, config
+            )
+
+        result = await self.db.execute(
+            insert(VirtualMachine)
+            .values([
+                {
+                    "name": name,
+                    "provider": batch_data.provider,
+                    "state": VMState.CREATING,
+                    "config": config,
+                    "description": batch_data.description,
+                }
+                for name in names
+            ])
+            .returning(VirtualMachine.id, VirtualMachine.name)
+        )
+        created = sorted(result.all())
+        vm_ids = [vm_id for vm_id, _ in created]
+
+        paths = await asyncio.to_thread(self._save_vagrantfiles, {
+            vm_id: vagrantfile_content.replace(BATCH_NAME_PLACEHOLDER, name)
+            for vm_id, name in created
+        })
+        await self.db.execute(
+            update(VirtualMachine),
+            [{"id": vm_id, "vagrantfile_path": path} for vm_id, path in paths.items()]
+        )
+        operations = await self.operations.queue_many(vm_ids, batch_data.provider, OperationType.CREATE)
+        await self.db.commit()
+
+        concurrency = min(
+            batch_data.concurrency or settings.CELERY_QUEUE_CONCURRENCY.get(batch_data.provider, 1),
+            len(vm_ids)
+        )
+        batch_id = dispatch_create_vm_batch(
+            vm_ids,
+            batch_data.provider,
+            [{**config, "name": name} for _, name in created],
+            concurrency,
+            [operations[vm_id][1] for vm_id in vm_ids]
+        )
+        await save_batch(batch_id, batch_data.provider, vm_ids, concurrency)
+        if template:
+            await record_usage(template.id, len(vm_ids))
+
+        for vm_id in vm_ids:
+            await apublish_event("vm.state", vm_id, batch_data.provider, state=VMState.CREATING.value, operation="create")
+
+        return VMBatchResponse(
+            batch_id=batch_id, provider=batch_data.provider, vm_ids=vm_ids, concurrency=concurrency,
+            operation_ids={vm_id: operations[vm_id][0] for vm_id in vm_ids}
+        )
+
+    async def get_batch_progress(self, batch_id: str) -> VMBatchProgress:
+        """Aggregate the states of a batch's VMs with one grouped query"""
+        batch = await load_batch(batch_id)
+        if not batch:
+            raise HTTPException(status_code=404, detail="Batch not found")
+
+        result = await self.db.execute(
+            select(VirtualMachine.state, func.count())
+            .where(VirtualMachine.id.in_(batch["vm_ids"]))
+            .group_by(VirtualMachine.state)
+        )
+        states = {state.value: count for state, count in result.all()}
+
+        total = len(batch["vm_ids"])
+        pending = states.get(VMState.CREATING.value, 0)
+        failed = states.get(VMState.ERROR.value, 0)
+        # VMs deleted since creation count as finished
+        succeeded = total - pending - failed
+        return VMBatchProgress(
+            batch_id=batch_id,
+            provider=batch["provider"],
+            total=total,
+            pending=pending,
+            succeeded=succeeded,
+            failed=failed,
+            done=pending == 0,
+            states=states,
+        )
+
+    async def list_vms(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        provider: Optional[str] = None,
+        state: Optional[VMState] = None,
+        name: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> Page:
+        """
+        List virtual machines, newest first, one keyset page at a time.
+
+        With columns (see SUMMARY_FIELDS / LIST_FIELDS) the page holds rows
+        of just those columns instead of full VirtualMachine objects.
+        """
+        query = select(VirtualMachine)
 
         if provider:
-            query = query.filter(VirtualMachine.provider == provider)
+            query = query.where(VirtualMachine.provider == provider)
+        if state:
+            query = query.where(VirtualMachine.state == state)
+        if name:
+            query = query.where(VirtualMachine.name.startswith(name, autoescape=True))
 
-        return query.offset(skip).limit(limit).all()
+        return await paginate(self.db, query, VirtualMachine, limit, cursor, columns)
 
     async def get_vm(self, vm_id: int) -> Optional[VirtualMachine]:
         """Get a virtual machine by ID"""
-        return self.db.query(VirtualMachine).filter(VirtualMachine.id == vm_id).first()
+        return await self.db.get(VirtualMachine, vm_id)
 
-    async def start_vm(self, vm_id: int, background_tasks: BackgroundTasks) -> dict:
+    async def start_vm(self, vm_id: int) -> dict:
         """Start a virtual machine"""
         vm = await self.get_vm(vm_id)
         if not vm:
@@ -78,14 +255,16 @@ class VMService:
 
         # Update state
         vm.state = VMState.RUNNING
-        self.db.commit()
+        operation = self.operations.queue(vm.id, vm.provider, OperationType.START)
+        await self.db.commit()
+        await apublish_event("vm.state", vm.id, vm.provider, state=vm.state.value, operation="start")
 
-        # Queue async start task
-        background_tasks.add_task(start_vm_task, vm_id)
+        # Queue start on the provider's worker queue
+        task_id = dispatch_start_vm(vm_id, vm.provider, operation.task_id)
 
-        return {"message": f"Starting VM '{vm.name}'"}
+        return {"message": f"Starting VM '{vm.name}'", "task_id": task_id, "operation_id": operation.id}
 
-    async def stop_vm(self, vm_id: int, background_tasks: BackgroundTasks) -> dict:
+    async def stop_vm(self, vm_id: int) -> dict:
         """Stop a virtual machine"""
         vm = await self.get_vm(vm_id)
         if not vm:
@@ -94,12 +273,15 @@ class VMService:
         if vm.state == VMState.STOPPED:
             return {"message": "VM is already stopped"}
 
-        # Queue async stop task
-        background_tasks.add_task(stop_vm_task, vm_id)
+        operation = self.operations.queue(vm.id, vm.provider, OperationType.STOP)
+        await self.db.commit()
+
+        # Queue stop on the provider's worker queue
+        task_id = dispatch_stop_vm(vm_id, vm.provider, operation.task_id)
 
-        return {"message": f"Stopping VM '{vm.name}'"}
+        return {"message": f"Stopping VM '{vm.name}'", "task_id": task_id, "operation_id": operation.id}
 
-    async def delete_vm(self, vm_id: int, background_tasks: BackgroundTasks) -> dict:
+    async def delete_vm(self, vm_id: int) -> dict:
         """Delete a virtual machine"""
         vm = await self.get_vm(vm_id)
         if not vm:
@@ -107,64 +289,103 @@ class VMService:
 
         # Update state
         vm.state = VMState.DESTROYING
-        self.db.commit()
+        operation = self.operations.queue(vm.id, vm.provider, OperationType.DELETE)
+        await self.db.commit()
+        await apublish_event("vm.state", vm.id, vm.provider, state=vm.state.value, operation="delete")
+
+        # Queue deletion on the provider's worker queue
+        task_id = dispatch_delete_vm(vm_id, vm.provider, operation.task_id)
 
-        # Queue async delete task
-        background_tasks.add_task(delete_vm_task, vm_id)
+        return {"message": f"Deleting VM '{vm.name}'", "task_id": task_id, "operation_id": operation.id}
 
-        return {"message": f"Deleting VM '{vm.name}'"}
+    async def get_vm_status(self, vm_id: int, fresh: bool = False) -> VMStatus:
+        """
+        Get VM status.
 
-    async def get_vm_status(self, vm_id: int) -> VMStatus:
-        """Get VM status"""
+        Served from the reconciler's snapshot when it is at most
+        STATUS_MAX_STALENESS seconds old; `fresh` always asks the provider.
+        """
         vm = await self.get_vm(vm_id)
         if not vm:
             raise HTTPException(status_code=404, detail="VM not found")
 
+        if not vm.provider_vm_id:
+            return VMStatus(id=vm.id, name=vm.name, state=vm.state, last_checked=datetime.now(timezone.utc))
+
+        if not fresh:
+            try:
+                snapshot = await status_snapshot.read_status(vm.id, settings.STATUS_MAX_STALENESS)
+                if snapshot:
+                    return self._build_status(vm, snapshot)
+            except Exception as e:
+                print(f"Error reading status snapshot: {e}")
+
         # Get status from provider if VM is created
         provider = ProviderRegistry.get_provider(vm.provider)
-        if provider and vm.provider_vm_id:
+        if provider:
             try:
                 provider_status = await provider.get_vm_status(vm.provider_vm_id)
 
-                return VMStatus(
-                    id=vm.id,
-                    name=vm.name,
-                    state=vm.state,
-                    provider_state=provider_status.get('provider_state'),
-                    ip_address=provider_status.get('ip_address'),
-                    cpu_usage=provider_status.get('cpu_usage'),
-                    memory_usage=provider_status.get('memory_usage'),
-                    uptime=provider_status.get('uptime'),
-                    last_checked=provider_status.get('last_checked')
-                )
+                # Like the reconciler, never cache a failed lookup as the VM's status
+                if not provider_status.get('error'):
+                    try:
+                        await status_snapshot.write_status(vm.id, provider_status)
+                    except Exception as e:
+                        print(f"Error writing status snapshot: {e}")
+
+                return self._build_status(vm, provider_status)
             except Exception as e:
                 print(f"Error getting provider status: {e}")
 
         # Return basic status if provider unavailable
-        from datetime import datetime
         return VMStatus(
             id=vm.id,
             name=vm.name,
             state=vm.state,
-            last_checked=datetime.now()
+            last_checked=datetime.now(timezone.utc)
         )
 
-    def _generate_vagrantfile(self, vm_data: VMCreate) -> str:
-        """Generate Vagrantfile from VM configuration"""
-        config = vm_data.config.copy()
-        config['name'] = vm_data.name
-        config['provider'] = vm_data.provider
-
-        # Use provider-specific generator methods
-        generator_map = {
-            'proxmox': self.vagrant_generator.generate_proxmox,
-            'virtualbox': self.vagrant_generator.generate_virtualbox,
-            'hyperv': self.vagrant_generator.generate_hyperv,
-            'wsl': self.vagrant_generator.generate_wsl,
-        }
+    def _build_status(self, vm: VirtualMachine, provider_status: dict) -> VMStatus:
+        """Combine the VM record with a provider status dict"""
+        return VMStatus(
+            id=vm.id,
+            name=vm.name,
+            state=vm.state,
+            provider_state=provider_status.get('provider_state'),
+            ip_address=provider_status.get('ip_address'),
+            cpu_usage=provider_status.get('cpu_usage'),
+            memory_usage=provider_status.get('memory_usage'),
+            uptime=provider_status.get('uptime'),
+            last_checked=provider_status.get('last_checked') or datetime.now(timezone.utc)
+        )
 
-        generator = generator_map.get(vm_data.provider, self.vagrant_generator.generate)
-        return generator(config)
+    async def _generate_vagrantfile(self, vm_data: VMCreate) -> str:
+        """Generate Vagrantfile from VM configuration"""
+        return await self._render_vagrantfile(vm_data.provider, vm_data.name, vm_data.config)
+
+    async def _render_vagrantfile(self, provider: str, name: str, vm_config: dict) -> str:
+        config = vm_config.copy()
+        config['name'] = name
+        config['provider'] = provider
+
+        # Use the provider-specific generator method, through the render cache
+        generator = self.vagrant_generator.renderer_for(provider)
+        return await render_cache.render(provider, config, generator)
+
+    async def _resolve_template(self, template_id: Optional[int], provider: str) -> Optional[ResolvedTemplate]:
+        """Look up a request's template through the template cache"""
+        if template_id is None:
+            return None
+
+        template = await resolve_template(self.db, template_id)
+        if not template:
+            raise HTTPException(status_code=404, detail="Template not found")
+        if template.provider != provider:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Template '{template.name}' targets provider '{template.provider}', not '{provider}'"
+            )
+        return template
 
     def _save_vagrantfile(self, vm_id: int, content: str) -> str:
         """Save Vagrantfile to disk"""
@@ -178,3 +399,7 @@ class VMService:
             f.write(content)
 
         return vagrantfile_path
+
+    def _save_vagrantfiles(self, contents: Dict[int, str]) -> Dict[int, str]:
+        """Save many Vagrantfiles (blocking; run in a thread)"""
+        return {vm_id: self._save_vagrantfile(vm_id, content) for vm_id, content in contents.items()}
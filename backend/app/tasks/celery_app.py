@@ -1,11 +1,22 @@
+from billiard.process import current_process
 from celery import Celery
+from celery.signals import (
+    celeryd_init, task_postrun, task_prerun, worker_process_init, worker_process_shutdown
+)
+from kombu import Queue
+import time
 from app.core.config import settings
+from app.core.metrics import CELERY_TASK_DURATION, start_worker_exporter
+from app.tasks.runtime import runtime
+
+# Tasks for providers without a dedicated queue land here
+DEFAULT_QUEUE = "default"
 
 celery_app = Celery(
     "gaia_tasks",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=['app.tasks.vm_tasks']
+    include=['app.tasks.vm_tasks', 'app.tasks.status_tasks', 'app.tasks.template_tasks']
 )
 
 celery_app.conf.update(
@@ -17,4 +28,106 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
+    task_default_queue=DEFAULT_QUEUE,
+    task_queues=[
+        Queue(name, routing_key=name)
+        for name in [DEFAULT_QUEUE, *settings.CELERY_QUEUE_CONCURRENCY]
+    ],
+    # Provider operations are long-running; don't let one process hoard
+    # prefetched messages while its siblings sit idle
+    worker_prefetch_multiplier=1,
+    beat_schedule={
+        'reconcile-vm-states': {
+            'task': 'reconcile_vm_states',
+            'schedule': settings.STATUS_RECONCILE_INTERVAL,
+            # A missed run is superseded by the next one
+            'options': {'expires': settings.STATUS_RECONCILE_INTERVAL},
+        },
+        'flush-template-usage': {
+            'task': 'flush_template_usage',
+            'schedule': settings.TEMPLATE_USAGE_FLUSH_INTERVAL,
+            'options': {'expires': settings.TEMPLATE_USAGE_FLUSH_INTERVAL},
+        },
+    },
 )
+
+
+def queue_for_provider(provider: str) -> str:
+    """Get the queue that handles operations for a provider"""
+    if provider in settings.CELERY_QUEUE_CONCURRENCY:
+        return provider
+    return DEFAULT_QUEUE
+
+
+def queue_names():
+    """Every queue the workers consume, for queue depth metrics"""
+    return [queue.name for queue in celery_app.conf.task_queues]
+
+
+@celeryd_init.connect
+def configure_queue_concurrency(sender=None, conf=None, options=None, **kwargs):
+    """
+    Size the worker pool from the queues it consumes.
+
+    Runs before the pool is created, so ``celery worker -Q proxmox`` gets
+    the proxmox concurrency without passing ``-c``. An explicit ``-c``
+    always wins.
+    """
+    options = options or {}
+    if options.get('concurrency'):
+        return
+
+    queues = options.get('queues') or []
+    if isinstance(queues, str):
+        queues = queues.split(',')
+
+    concurrency = sum(
+        settings.CELERY_QUEUE_CONCURRENCY.get(queue.strip(), 0) for queue in queues
+    )
+    if concurrency:
+        conf.worker_concurrency = concurrency
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs):
+    """
+    Start the process's event loop and authenticate pooled provider clients.
+
+    Runs in each freshly forked worker process; the loop then lives until
+    the process exits, so warmed clients stay usable by every task. Also
+    starts the process's metrics exporter on METRICS_WORKER_PORT + its
+    pool index.
+    """
+    runtime.start()
+    start_worker_exporter(getattr(current_process(), "index", 0) or 0)
+
+    if not settings.PROVIDER_PREWARM:
+        return
+
+    from app.services.providers.base import ProviderRegistry
+
+    runtime.run(ProviderRegistry.warm_providers())
+
+
+@worker_process_shutdown.connect
+def stop_worker_runtime(**kwargs):
+    """Close pooled provider clients on the loop that owns them, then stop it"""
+    from app.services.providers.base import ProviderRegistry
+
+    runtime.stop(ProviderRegistry.close_providers())
+
+
+# Start times of running tasks by task ID, for the task duration histogram
+_task_started = {}
+
+
+@task_prerun.connect
+def record_task_start(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
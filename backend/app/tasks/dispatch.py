@@ -0,0 +1,60 @@
+from typing import Dict, Any, List, Optional
+
+from celery import chain, group
+
+from app.tasks.celery_app import queue_for_provider
+from app.tasks.vm_tasks import create_vm_task, start_vm_task, stop_vm_task, delete_vm_task
+
+
+def dispatch_create_vm(vm_id: int, provider: str, config: Dict[str, Any], task_id: Optional[str] = None) -> str:
+    """Queue VM creation and return the Celery task ID"""
+    result = create_vm_task.apply_async(
+        args=(vm_id, config),
+        queue=queue_for_provider(provider),
+        task_id=task_id
+    )
+    return result.id
+
+
+def dispatch_create_vm_batch(
+    vm_ids: List[int],
+    provider: str,
+    configs: List[Dict[str, Any]],
+    concurrency: int,
+    task_ids: List[str]
+) -> str:
+    """
+    Queue creation of many VMs with at most `concurrency` running at once.
+
+    VMs are dealt round-robin into `concurrency` chains which run side by
+    side as one Celery group; each chain creates its VMs one after another,
+    each under its given task ID. Returns the group ID.
+    """
+    queue = queue_for_provider(provider)
+    lanes = [[] for _ in range(min(concurrency, len(vm_ids)))]
+    for position, (vm_id, config, task_id) in enumerate(zip(vm_ids, configs, task_ids)):
+        # Immutable signatures: a chain must not pass one VM's result to the next
+        lanes[position % len(lanes)].append(
+            create_vm_task.si(vm_id, config).set(queue=queue, task_id=task_id)
+        )
+
+    result = group(chain(*lane) for lane in lanes).apply_async()
+    return result.id
+
+
+def dispatch_start_vm(vm_id: int, provider: str, task_id: Optional[str] = None) -> str:
+    """Queue a VM start and return the Celery task ID"""
+    result = start_vm_task.apply_async(args=(vm_id,), queue=queue_for_provider(provider), task_id=task_id)
+    return result.id
+
+
+def dispatch_stop_vm(vm_id: int, provider: str, task_id: Optional[str] = None) -> str:
+    """Queue a VM stop and return the Celery task ID"""
+    result = stop_vm_task.apply_async(args=(vm_id,), queue=queue_for_provider(provider), task_id=task_id)
+    return result.id
+
+
+def dispatch_delete_vm(vm_id: int, provider: str, task_id: Optional[str] = None) -> str:
+    """Queue a VM deletion and return the Celery task ID"""
+    result = delete_vm_task.apply_async(args=(vm_id,), queue=queue_for_provider(provider), task_id=task_id)
+    return result.id
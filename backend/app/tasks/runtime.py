@@ -0,0 +1,94 @@
+from typing import Any, Awaitable, Optional, TypeVar
+import asyncio
+import os
+import threading
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """
+    One long-lived event loop per worker process, run in a daemon thread.
+
+    Tasks submit provider coroutines with run() instead of asyncio.run(),
+    so everything bound to a loop (HTTP pools, subprocess pipes, semaphores,
+    PowerShell hosts) survives from one task to the next, and coroutines
+    from concurrent task threads share the loop.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The runtime's loop, started on first use"""
+        loop = self._loop
+        if loop is None or loop.is_closed() or self._pid != os.getpid():
+            loop = self.start()
+        return loop
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked child inherits the object but not the loop's thread
+                self._loop = self._thread = None
+            if self._loop is not None and not self._loop.is_closed():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="worker-runtime", daemon=True)
+            self._thread.start()
+            ready.wait()
+            self._loop = loop
+            self._pid = os.getpid()
+            return loop
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the runtime loop and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Time limits and timeouts interrupt the waiting task, not the
+            # coroutine; cancel it so it doesn't keep running unobserved
+            future.cancel()
+            raise
+
+    def stop(self, shutdown: Optional[Awaitable[Any]] = None, timeout: float = 10) -> None:
+        """Optionally await a shutdown coroutine, then stop and close the loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None or loop.is_closed() or self._pid != os.getpid():
+            if asyncio.iscoroutine(shutdown):
+                shutdown.close()
+            return
+
+        if shutdown is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown, loop).result(timeout)
+            except Exception as e:
+                print(f"Error shutting down worker runtime: {e}")
+
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout)
+        loop.close()
+
+
+runtime = WorkerRuntime()
+
+
+def run_async(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on this process's worker runtime"""
+    return runtime.run(coro, timeout)
@@ -0,0 +1,110 @@
+from app.tasks.celery_app import celery_app, queue_for_provider
+from app.tasks.runtime import run_async
+from app.core.database import SessionLocal
+from app.models.vm import VirtualMachine
+from app.schemas.vm import VMState
+from app.services.providers.base import ProviderRegistry
+from app.services.status_snapshot import write_statuses
+from app.services.events import publish_event
+from sqlalchemy import select, update
+import time
+
+# Operations in flight own these states; the reconciler leaves them alone
+TRANSITIONAL_STATES = {VMState.CREATING, VMState.DESTROYING}
+
+
+@celery_app.task(name="reconcile_vm_states")
+def reconcile_vm_states_task():
+    """Fan out one reconcile task per provider onto that provider's queue"""
+    db = SessionLocal()
+
+    try:
+        providers = db.scalars(
+            select(VirtualMachine.provider)
+            .where(VirtualMachine.provider_vm_id.isnot(None))
+            .distinct()
+        ).all()
+    finally:
+        db.close()
+
+    for provider in providers:
+        reconcile_provider_states_task.apply_async(
+            args=(provider,),
+            queue=queue_for_provider(provider)
+        )
+
+    return {"status": "success", "providers": list(providers)}
+
+
+@celery_app.task(name="reconcile_provider_states")
+def reconcile_provider_states_task(provider_name: str):
+    """
+    Refresh the status snapshot for every VM of one provider.
+
+    Pulls all statuses with a single bulk inventory call, writes them to
+    the Redis snapshot and corrects VirtualMachine.state where it drifted.
+    """
+    provider = ProviderRegistry.get_provider(provider_name)
+    if not provider:
+        return {"status": "error", "message": f"Provider '{provider_name}' not found"}
+
+    db = SessionLocal()
+
+    try:
+        rows = db.execute(
+            select(VirtualMachine.id, VirtualMachine.provider_vm_id, VirtualMachine.state)
+            .where(
+                VirtualMachine.provider == provider_name,
+                VirtualMachine.provider_vm_id.isnot(None)
+            )
+        ).all()
+        if not rows:
+            return {"status": "success", "checked": 0, "updated": 0}
+
+        checked_at = time.time()
+        statuses = run_async(provider.get_vm_statuses([row.provider_vm_id for row in rows]))
+
+        snapshot = {}
+        drifted = []
+        for row in rows:
+            status = statuses.get(row.provider_vm_id)
+            if not status or status.get('error'):
+                continue
+
+            snapshot[row.id] = status
+
+            try:
+                observed = VMState(status.get('state'))
+            except ValueError:
+                continue
+
+            if (
+                observed != VMState.UNKNOWN
+                and observed != row.state
+                and row.state not in TRANSITIONAL_STATES
+            ):
+                drifted.append({"id": row.id, "old_state": row.state, "state": observed})
+
+        write_statuses(snapshot, checked_at)
+
+        # Only overwrite the state that was read: the API may have moved the
+        # VM on (e.g. to DESTROYING) while the provider was being asked
+        updated = []
+        for change in drifted:
+            result = db.execute(
+                update(VirtualMachine)
+                .where(VirtualMachine.id == change["id"], VirtualMachine.state == change["old_state"])
+                .values(state=change["state"])
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                updated.append(change)
+        if drifted:
+            db.commit()
+        for change in updated:
+            publish_event("vm.state", change["id"], provider_name, state=change["state"].value, operation="reconcile")
+
+        return {"status": "success", "checked": len(snapshot), "updated": len(updated)}
+
+    finally:
+        db.close()
@@ -0,0 +1,15 @@
+from app.tasks.celery_app import celery_app
+from app.core.database import SessionLocal
+from app.services.template_usage import flush_usage
+
+
+@celery_app.task(name="flush_template_usage")
+def flush_template_usage_task():
+    """Apply template usage counts collected in Redis to the templates table"""
+    db = SessionLocal()
+
+    try:
+        counts = flush_usage(db)
+        return {"status": "success", "templates": len(counts), "uses": sum(counts.values())}
+    finally:
+        db.close()
@@ -1,14 +1,24 @@
 from app.tasks.celery_app import celery_app
+from app.tasks.runtime import run_async
 from app.core.database import SessionLocal
 from app.models.vm import VirtualMachine
 from app.schemas.vm import VMState
 from app.services.providers.base import ProviderRegistry
-from typing import Dict, Any
-import asyncio
+from app.services.events import publish_event
+from app.services.operation_logs import OperationLog
+from app.services.operation_service import mark_operation_started, mark_operation_finished
+from app.schemas.operation import OperationState, OperationType
+from typing import Dict, Any, Awaitable, Optional
+from datetime import datetime
 
 
 def get_db():
-    """Get database session"""
+    """
+    Get a synchronous database session.
+
+    Celery tasks run outside the API event loop, so they keep using the
+    sync engine instead of the AsyncSession handed out to endpoints.
+    """
     db = SessionLocal()
     try:
         return db
@@ -16,21 +26,54 @@ def get_db():
         pass  # Don't close here, will be closed in task
 
 
+class TrackedOperation:
+    """A task's operation log and operations row, updated together"""
+
+    def __init__(self, db, task_id: str, vm_id: int, operation_type: OperationType):
+        self.db = db
+        self.task_id = task_id
+        self.vm_id = vm_id
+        self.type = operation_type
+        self.log = OperationLog(vm_id, task_id, operation_type.value)
+        self.started_at: Optional[datetime] = None
+
+    def start(self, provider: str) -> None:
+        self.started_at = mark_operation_started(self.db, self.task_id, self.vm_id, provider, self.type)
+
+    def write(self, line: str, stream: str = "progress") -> None:
+        self.log.write(line, stream)
+
+    def attach(self, coro: Awaitable) -> Awaitable:
+        return self.log.attach(coro)
+
+    def close(self, status: str, error: Optional[str] = None) -> None:
+        """Finish the log with status and record the outcome and duration"""
+        self.log.close(status)
+        state = OperationState.SUCCEEDED if status == "succeeded" else OperationState.FAILED
+        mark_operation_finished(self.db, self.task_id, self.started_at, state, error)
+
+
 @celery_app.task(bind=True, name="create_vm")
 def create_vm_task(self, vm_id: int, config: Dict[str, Any]):
     """Celery task to create a VM"""
     db = get_db()
+    operation = TrackedOperation(db, self.request.id, vm_id, OperationType.CREATE)
 
     try:
-        vm = db.query(VirtualMachine).filter(VirtualMachine.id == vm_id).first()
+        vm = db.get(VirtualMachine, vm_id)
         if not vm:
+            operation.write("VM not found", "error")
+            operation.close("failed", "VM not found")
             return {"error": "VM not found"}
 
+        operation.start(vm.provider)
+
         # Get provider
         provider = ProviderRegistry.get_provider(vm.provider, config.get('provider_config'))
 
         # Create VM using provider
-        result = asyncio.run(provider.create_vm(config))
+        operation.write(f"Creating VM '{vm.name}' on {vm.provider}")
+        result = run_async(operation.attach(provider.create_vm(config)))
 
         # Update VM record
         vm.provider_vm_id = result.get('provider_vm_id')
@@ -38,15 +81,22 @@ def create_vm_task(self, vm_id: int, config: Dict[str, Any]):
         vm.config = {**vm.config, **result}
 
         db.commit()
+        publish_event("vm.state", vm_id, vm.provider, state=vm.state.value, operation="create")
+        operation.write(f"Created VM '{vm.name}' ({vm.provider_vm_id})")
+        operation.close("succeeded")
 
         return {"status": "success", "vm_id": vm_id, "provider_vm_id": vm.provider_vm_id}
 
     except Exception as e:
+        operation.write(str(e), "error")
+        operation.close("failed", str(e))
+
         # Mark VM as error state
-        vm = db.query(VirtualMachine).filter(VirtualMachine.id == vm_id).first()
+        vm = db.get(VirtualMachine, vm_id)
         if vm:
             vm.state = VMState.ERROR
             db.commit()
+            publish_event("vm.state", vm_id, vm.provider, state=vm.state.value, operation="create", error=str(e))
 
         return {"status": "error", "message": str(e)}
 
@@ -58,26 +108,39 @@ def create_vm_task(self, vm_id: int, config: Dict[str, Any]):
 def start_vm_task(self, vm_id: int):
     """Celery task to start a VM"""
     db = get_db()
+    operation = TrackedOperation(db, self.request.id, vm_id, OperationType.START)
 
     try:
-        vm = db.query(VirtualMachine).filter(VirtualMachine.id == vm_id).first()
+        vm = db.get(VirtualMachine, vm_id)
         if not vm:
+            operation.write("VM not found", "error")
+            operation.close("failed", "VM not found")
             return {"error": "VM not found"}
 
+        operation.start(vm.provider)
+
         # Get provider
         provider = ProviderRegistry.get_provider(vm.provider)
 
         # Start VM
-        success = asyncio.run(provider.start_vm(vm.provider_vm_id))
+        operation.write(f"Starting VM '{vm.name}' ({vm.provider_vm_id}) on {vm.provider}")
+        success = run_async(operation.attach(provider.start_vm(vm.provider_vm_id)))
 
         if success:
             vm.state = VMState.RUNNING
             db.commit()
+            publish_event("vm.state", vm_id, vm.provider, state=vm.state.value, operation="start")
+            operation.close("succeeded")
             return {"status": "success", "vm_id": vm_id}
         else:
+            publish_event("vm.operation", vm_id, vm.provider, operation="start", status="error", message="Failed to start VM")
+            operation.write("Failed to start VM", "error")
+            operation.close("failed", "Failed to start VM")
             return {"status": "error", "message": "Failed to start VM"}
 
     except Exception as e:
+        operation.write(str(e), "error")
+        operation.close("failed", str(e))
         return {"status": "error", "message": str(e)}
 
     finally:
@@ -88,26 +151,39 @@ def start_vm_task(self, vm_id: int):
 def stop_vm_task(self, vm_id: int):
     """Celery task to stop a VM"""
     db = get_db()
+    operation = TrackedOperation(db, self.request.id, vm_id, OperationType.STOP)
 
     try:
-        vm = db.query(VirtualMachine).filter(VirtualMachine.id == vm_id).first()
+        vm = db.get(VirtualMachine, vm_id)
         if not vm:
+            operation.write("VM not found", "error")
+            operation.close("failed", "VM not found")
             return {"error": "VM not found"}
 
+        operation.start(vm.provider)
+
         # Get provider
         provider = ProviderRegistry.get_provider(vm.provider)
 
         # Stop VM
-        success = asyncio.run(provider.stop_vm(vm.provider_vm_id))
+        operation.write(f"Stopping VM '{vm.name}' ({vm.provider_vm_id}) on {vm.provider}")
+        success = run_async(operation.attach(provider.stop_vm(vm.provider_vm_id)))
 
         if success:
             vm.state = VMState.STOPPED
             db.commit()
+            publish_event("vm.state", vm_id, vm.provider, state=vm.state.value, operation="stop")
+            operation.close("succeeded")
             return {"status": "success", "vm_id": vm_id}
         else:
+            publish_event("vm.operation", vm_id, vm.provider, operation="stop", status="error", message="Failed to stop VM")
+            operation.write("Failed to stop VM", "error")
+            operation.close("failed", "Failed to stop VM")
             return {"status": "error", "message": "Failed to stop VM"}
 
     except Exception as e:
+        operation.write(str(e), "error")
+        operation.close("failed", str(e))
         return {"status": "error", "message": str(e)}
 
     finally:
@@ -118,33 +194,49 @@ def stop_vm_task(self, vm_id: int):
 def delete_vm_task(self, vm_id: int):
     """Celery task to delete a VM"""
     db = get_db()
+    operation = TrackedOperation(db, self.request.id, vm_id, OperationType.DELETE)
 
     try:
-        vm = db.query(VirtualMachine).filter(VirtualMachine.id == vm_id).first()
+        vm = db.get(VirtualMachine, vm_id)
         if not vm:
+            operation.write("VM not found", "error")
+            operation.close("failed", "VM not found")
             return {"error": "VM not found"}
 
+        operation.start(vm.provider)
+
         # Get provider
         provider = ProviderRegistry.get_provider(vm.provider)
 
         # Delete VM from provider
-        success = asyncio.run(provider.delete_vm(vm.provider_vm_id))
+        operation.write(f"Deleting VM '{vm.name}' ({vm.provider_vm_id}) from {vm.provider}")
+        success = run_async(operation.attach(provider.delete_vm(vm.provider_vm_id)))
 
         if success:
             # Delete from database
             db.delete(vm)
             db.commit()
+            publish_event("vm.deleted", vm_id, vm.provider)
+            operation.close("succeeded")
             return {"status": "success", "vm_id": vm_id}
         else:
+            publish_event("vm.operation", vm_id, vm.provider, operation="delete", status="error", message="Failed to delete VM")
+            operation.write("Failed to delete VM", "error")
+            operation.close("failed", "Failed to delete VM")
             return {"status": "error", "message": "Failed to delete VM"}
 
     except Exception as e:
+        operation.write(str(e), "error")
+
         # Still delete from database even if provider deletion failed
-        vm = db.query(VirtualMachine).filter(VirtualMachine.id == vm_id).first()
+        vm = db.get(VirtualMachine, vm_id)
         if vm:
             db.delete(vm)
             db.commit()
+            publish_event("vm.deleted", vm_id, vm.provider, error=str(e))
+            operation.write("Deleted from the database despite the provider error")
 
+        operation.close("partial", str(e))
         return {"status": "partial", "message": f"Deleted from DB but provider error: {str(e)}"}
 
     finally:
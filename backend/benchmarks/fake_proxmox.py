@@ -0,0 +1,178 @@
+"""
+Minimal fake of the Proxmox VE HTTP API for benchmarks.
+
+Serves the endpoints used by ProxmoxProvider over plain HTTP with a fixed
+per-request delay standing in for network round-trip time. Benchmarks run
+it in its own process with ServerProcess.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List
+from urllib.parse import urlparse, parse_qs
+import json
+import multiprocessing
+import re
+import threading
+import time
+
+
+class FakeProxmoxCluster:
+    """In-memory cluster state"""
+
+    def __init__(self, nodes: int, guests: int, lxc_ratio: float = 0.2):
+        self.nodes = [f"pve{i:02d}" for i in range(1, nodes + 1)]
+        self.guests: List[Dict[str, Any]] = []
+        lxc_every = int(1 / lxc_ratio) if lxc_ratio else 0
+        for i in range(guests):
+            vmid = 100 + i
+            self.guests.append({
+                'vmid': vmid,
+                'name': f"guest-{vmid}",
+                'node': self.nodes[i % nodes],
+                'type': 'lxc' if lxc_every and i % lxc_every == 0 else 'qemu',
+                'status': 'running' if i % 3 else 'stopped',
+                'cpu': 0.05,
+                'maxcpu': 2,
+                'mem': 1073741824,
+                'maxmem': 2147483648,
+                'uptime': 3600,
+            })
+        self.by_vmid = {str(g['vmid']): g for g in self.guests}
+
+
+def _make_handler(cluster: FakeProxmoxCluster, latency: float, cluster_resources: bool):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, data: Any):
+            body = json.dumps({'data': data}).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self, method: str):
+            if latency:
+                time.sleep(latency)
+
+            parsed = urlparse(self.path)
+            path = parsed.path.removeprefix('/api2/json')
+            query = parse_qs(parsed.query)
+
+            length = int(self.headers.get('Content-Length') or 0)
+            if length:
+                self.rfile.read(length)
+
+            if method == 'POST' and path == '/access/ticket':
+                return self._send(200, {'ticket': 'PVE:fake', 'CSRFPreventionToken': 'csrf'})
+            if path == '/version':
+                return self._send(200, {'version': '8.1.0', 'release': '8.1'})
+            if path == '/cluster/resources':
+                if not cluster_resources:
+                    return self._send(501, None)
+                guests = cluster.guests
+                if query.get('type') == ['vm']:
+                    guests = [{**g, 'id': f"{g['type']}/{g['vmid']}"} for g in guests]
+                return self._send(200, guests)
+            if path == '/cluster/nextid':
+                return self._send(200, str(100 + len(cluster.guests)))
+            if path == '/nodes':
+                return self._send(200, [{'node': n, 'status': 'online'} for n in cluster.nodes])
+
+            match = re.fullmatch(r'/nodes/([^/]+)/(qemu|lxc)', path)
+            if match:
+                node, guest_type = match.groups()
+                guests = [
+                    {k: v for k, v in g.items() if k not in ('node', 'type')}
+                    for g in cluster.guests
+                    if g['node'] == node and g['type'] == guest_type
+                ]
+                return self._send(200, guests)
+
+            match = re.fullmatch(r'/nodes/([^/]+)/(qemu|lxc)/(\d+)(/status/(\w+))?', path)
+            if match:
+                _, _, vmid, _, action = match.groups()
+                guest = cluster.by_vmid.get(vmid)
+                if guest is None:
+                    return self._send(404, None)
+                if action == 'current' or (action is None and method == 'GET'):
+                    return self._send(200, guest)
+                return self._send(200, f"UPID:{guest['node']}:{vmid}:{action or method.lower()}")
+
+            return self._send(404, None)
+
+        def do_GET(self):
+            self._route('GET')
+
+        def do_POST(self):
+            self._route('POST')
+
+        def do_DELETE(self):
+            self._route('DELETE')
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs when a pool opens many connections at once
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class FakeProxmoxServer:
+    """Run a FakeProxmoxCluster on a background thread"""
+
+    def __init__(self, cluster: FakeProxmoxCluster, latency: float = 0.002, cluster_resources: bool = True):
+        handler = _make_handler(cluster, latency, cluster_resources)
+        self.server = _Server(('127.0.0.1', 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        host, port = self.server.server_address
+        return f"{host}:{port}"
+
+    def __enter__(self) -> "FakeProxmoxServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _serve(nodes: int, guests: int, latency: float, cluster_resources: bool,
+           addresses: multiprocessing.Queue, stop: multiprocessing.Event) -> None:
+    cluster = FakeProxmoxCluster(nodes, guests)
+    with FakeProxmoxServer(cluster, latency, cluster_resources) as server:
+        addresses.put(server.address)
+        stop.wait()
+
+
+class ServerProcess:
+    """
+    Run a FakeProxmoxServer in its own process; entering yields its address.
+
+    In-process, its handler threads would compete with the client's event
+    loop for the GIL and skew the timings.
+    """
+
+    def __init__(self, nodes: int, guests: int, latency: float = 0.002, cluster_resources: bool = True):
+        self._addresses = multiprocessing.Queue()
+        self._stop = multiprocessing.Event()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(nodes, guests, latency, cluster_resources, self._addresses, self._stop),
+            daemon=True
+        )
+
+    def __enter__(self) -> str:
+        self._process.start()
+        return self._addresses.get(timeout=30)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._process.join(5)
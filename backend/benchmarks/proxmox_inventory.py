@@ -0,0 +1,80 @@
+"""
+Benchmark Proxmox inventory listing against a fake cluster.
+
+Compares the previous serial per-node listing with the /cluster/resources
+path and its concurrent per-node fallback. The fake server runs in its own
+process so it does not share the GIL with the client.
+
+    cd backend && python -m benchmarks.proxmox_inventory
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.providers.proxmox import ProxmoxProvider
+from app.services.providers.proxmox_client import ProxmoxClient
+from benchmarks.fake_proxmox import ServerProcess
+
+
+def make_provider(address: str) -> ProxmoxProvider:
+    """Build a provider whose client talks plain HTTP to the fake server"""
+    provider = ProxmoxProvider()
+    provider._client = ProxmoxClient(
+        address, user='root@pam', token_name='bench', token_value='secret',
+        base_url=f"http://{address}/api2/json"
+    )
+    return provider
+
+
+async def serial_per_node(provider: ProxmoxProvider) -> int:
+    """The pre-/cluster/resources listing: one qemu request per node, in sequence"""
+    client = provider._get_client()
+    nodes = await client.get('/nodes')
+    count = 0
+    for node in nodes:
+        vms = await client.get(f"/nodes/{node['node']}/qemu")
+        count += len(vms)
+    return count
+
+
+async def cluster_listing(provider: ProxmoxProvider) -> int:
+    return len(await provider.list_vms())
+
+
+def measure(func, provider: ProxmoxProvider, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(func(provider))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--nodes', type=int, default=30)
+    parser.add_argument('--guests', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--latency-ms', type=float, default=2.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    print(f"{args.nodes} nodes, {args.latency_ms} ms simulated RTT, median of {args.repeat} runs")
+    print(f"{'guests':>8} {'serial/node':>14} {'cluster/res':>14} {'concurrent/node':>16}")
+
+    for guests in args.guests:
+        with ServerProcess(args.nodes, guests, latency) as address:
+            provider = make_provider(address)
+            serial = measure(serial_per_node, provider, args.repeat)
+            single = measure(cluster_listing, provider, args.repeat)
+
+        with ServerProcess(args.nodes, guests, latency, cluster_resources=False) as address:
+            provider = make_provider(address)
+            fallback = measure(cluster_listing, provider, args.repeat)
+
+        print(f"{guests:>8} {serial:>12.1f}ms {single:>12.1f}ms {fallback:>14.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
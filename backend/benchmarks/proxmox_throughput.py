@@ -0,0 +1,78 @@
+"""
+Benchmark bulk Proxmox operations against a fake cluster.
+
+Starts N VMs concurrently, the way a bulk start fans out, two ways:
+
+  threads  blocking HTTP calls pushed through asyncio.to_thread, one
+           connection per worker thread (how the provider used proxmoxer)
+  async    ProxmoxProvider.start_vm on the async client and its shared
+           keep-alive pool
+
+    cd backend && python -m benchmarks.proxmox_throughput
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import httpx
+
+from app.core.config import settings
+from benchmarks.fake_proxmox import FakeProxmoxCluster, ServerProcess
+from benchmarks.proxmox_inventory import make_provider
+
+
+async def threaded_start(address: str, vmids) -> None:
+    base_url = f"http://{address}/api2/json"
+    local = threading.local()
+
+    def start(vmid: int) -> None:
+        # Like a requests session per thread: blocking, one connection each
+        if not hasattr(local, 'client'):
+            local.client = httpx.Client(base_url=base_url)
+        local.client.post(f"/nodes/pve01/qemu/{vmid}/status/start").raise_for_status()
+
+    await asyncio.gather(*(asyncio.to_thread(start, vmid) for vmid in vmids))
+
+
+async def async_start(address: str, vmids) -> None:
+    provider = make_provider(address)
+    try:
+        results = await asyncio.gather(*(provider.start_vm(f"pve01:{vmid}") for vmid in vmids))
+        assert all(results)
+    finally:
+        await provider.close()
+
+
+def measure(func, address: str, vmids, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(func(address, vmids))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vms', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.latency_ms} ms simulated API latency, pool size {settings.PROXMOX_POOL_MAXSIZE}, "
+          f"median of {args.repeat} runs")
+    print(f"{'VMs':>6} {'threads':>10} {'ops/s':>8} {'async':>10} {'ops/s':>8}")
+
+    for count in args.vms:
+        vmids = [guest['vmid'] for guest in FakeProxmoxCluster(1, count).guests]
+        with ServerProcess(1, count, args.latency_ms / 1000) as address:
+            threaded = measure(threaded_start, address, vmids, args.repeat)
+            native = measure(async_start, address, vmids, args.repeat)
+        print(f"{count:>6} {threaded * 1000:>8.0f}ms {count / threaded:>8.0f} "
+              f"{native * 1000:>8.0f}ms {count / native:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
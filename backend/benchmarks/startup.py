@@ -0,0 +1,88 @@
+"""
+Benchmark cold start of the API and of a Celery worker.
+
+Each sample runs in a fresh interpreter and measures:
+
+  api     import app.main and run the FastAPI lifespan startup
+  worker  import the Celery app and the task modules a worker loads
+
+--eager additionally imports every provider module up front, which is
+what startup cost before providers were loaded lazily. Provider pre-warm
+is disabled so no sample waits on a backend.
+
+    cd backend && python -m benchmarks.startup
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+eager = sys.argv[2] == "1"
+
+if sys.argv[1] == "api":
+    import asyncio
+    from app.main import app
+    if eager:
+        from app.services.providers.base import ProviderRegistry
+        ProviderRegistry.load_all()
+
+    async def startup():
+        async with app.router.lifespan_context(app):
+            return time.perf_counter()
+
+    ready = asyncio.run(startup())
+else:
+    from app.tasks.celery_app import celery_app
+    celery_app.loader.import_default_modules()
+    if eager:
+        from app.services.providers.base import ProviderRegistry
+        ProviderRegistry.load_all()
+    ready = time.perf_counter()
+
+print(json.dumps({
+    "seconds": ready - start,
+    "modules": len(sys.modules),
+    "providers_loaded": sorted(m.rsplit(".", 1)[1] for m in sys.modules
+                               if m.startswith("app.services.providers.") and m.rsplit(".", 1)[1] not in ("base", "powershell_host")),
+}))
+'''
+
+
+def sample(target: str, eager: bool) -> dict:
+    env = {**os.environ, "PROVIDER_PREWARM": "false", "TEMPLATE_LIBRARY_RELOAD_INTERVAL": "0"}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, target, "1" if eager else "0"],
+        capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", choices=["api", "worker", "both"], default="both")
+    parser.add_argument("--eager", action="store_true", help="also measure with every provider imported up front")
+    args = parser.parse_args()
+
+    targets = ["api", "worker"] if args.target == "both" else [args.target]
+    modes = [False, True] if args.eager else [False]
+
+    print(f"{'target':<8} {'mode':<6} {'median ms':>10} {'min ms':>8} {'modules':>8}  providers imported")
+    for target in targets:
+        for eager in modes:
+            samples = [sample(target, eager) for _ in range(args.runs)]
+            seconds = [s["seconds"] for s in samples]
+            print(
+                f"{target:<8} {'eager' if eager else 'lazy':<6} "
+                f"{statistics.median(seconds) * 1000:>10.1f} {min(seconds) * 1000:>8.1f} "
+                f"{samples[-1]['modules']:>8}  {', '.join(samples[-1]['providers_loaded']) or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark Vagrantfile parsing on large multi-machine files.
+
+Compares VagrantfileParser with the regex pipeline it replaced (kept below
+as LegacyRegexParser), for parse() and extract_provider_config(), and
+reports how many networks each one actually extracted: the regex pipeline
+only matches config.vm.* at the top level, so it misses everything inside
+config.vm.define blocks.
+
+The regex pipeline is much faster (a handful of C-level scans against a
+pure-Python tokenizer and parser) but is not correct on multi-machine files;
+this benchmark tracks the cost of that correctness. Both are linear in the
+file size. Times are the best of --repeat runs.
+
+    cd backend && python -m benchmarks.vagrantfile_parse
+"""
+import argparse
+import re
+import time
+from typing import Any, Dict
+
+from app.services.vagrant.parser import VagrantfileParser
+
+MACHINE = '''
+  config.vm.define "node-{index}" do |node|
+    node.vm.box = "ubuntu/jammy64"
+    node.vm.hostname = "node-{index}"
+    node.vm.network "private_network", ip: "10.0.{octet}.{host}"
+    node.vm.network "forwarded_port", guest: 80, host: {port}
+    node.vm.synced_folder "./data", "/data", type: "rsync"
+    node.vm.provider "virtualbox" do |vb|
+      vb.memory = 2048
+      vb.cpus = 2
+      vb.customize ["modifyvm", :id, "--natdnshostresolver1", "on"]
+    end
+    node.vm.provision "shell", inline: <<-SHELL
+      apt-get update
+      apt-get install -y nginx
+    SHELL
+  end
+'''
+
+
+def build_vagrantfile(machines: int) -> str:
+    parts = [
+        'Vagrant.configure("2") do |config|\n',
+        '  config.vm.box = "ubuntu/jammy64"\n',
+        '  config.vm.hostname = "cluster"\n',
+    ]
+    for index in range(machines):
+        parts.append(MACHINE.format(index=index, octet=index // 250, host=index % 250 + 2, port=8000 + index))
+    # A top-level provider block after every machine, for extract_provider_config
+    parts.append('  config.vm.provider "hyperv" do |h|\n    h.memory = 1024\n  end\n')
+    parts.append('end\n')
+    return ''.join(parts)
+
+
+class LegacyRegexParser:
+    """The regex-based parser VagrantfileParser replaced"""
+
+    def parse(self, vagrantfile_content: str) -> Dict[str, Any]:
+        """The pre-tokenizer parse: one regex scan per field"""
+        config = {
+            "box": None,
+            "box_version": None,
+            "hostname": None,
+            "provider": "virtualbox",
+            "cpus": None,
+            "memory": None,
+            "networks": [],
+            "synced_folders": [],
+            "provisioners": [],
+            "provider_config": {}
+        }
+
+        # Extract box name
+        box_match = re.search(r'config\.vm\.box\s*=\s*["\']([^"\']+)["\']', vagrantfile_content)
+        if box_match:
+            config["box"] = box_match.group(1)
+
+        # Extract box version
+        version_match = re.search(r'config\.vm\.box_version\s*=\s*["\']([^"\']+)["\']', vagrantfile_content)
+        if version_match:
+            config["box_version"] = version_match.group(1)
+
+        # Extract hostname
+        hostname_match = re.search(r'config\.vm\.hostname\s*=\s*["\']([^"\']+)["\']', vagrantfile_content)
+        if hostname_match:
+            config["hostname"] = hostname_match.group(1)
+
+        # Extract provider (look for config.vm.provider blocks)
+        provider_match = re.search(r'config\.vm\.provider\s+["\']?(\w+)["\']?\s+do', vagrantfile_content)
+        if provider_match:
+            config["provider"] = provider_match.group(1)
+
+        # Extract CPU and memory (VirtualBox syntax)
+        cpus_match = re.search(r'vb\.cpus\s*=\s*(\d+)', vagrantfile_content)
+        if cpus_match:
+            config["cpus"] = int(cpus_match.group(1))
+
+        memory_match = re.search(r'vb\.memory\s*=\s*["\']?(\d+)["\']?', vagrantfile_content)
+        if memory_match:
+            config["memory"] = int(memory_match.group(1))
+
+        # Extract networks
+        network_patterns = [
+            r'config\.vm\.network\s+["\']private_network["\'],\s*ip:\s*["\']([^"\']+)["\']',
+            r'config\.vm\.network\s+["\']public_network["\'](?:,\s*bridge:\s*["\']([^"\']+)["\'])?',
+            r'config\.vm\.network\s+["\']forwarded_port["\'],\s*guest:\s*(\d+),\s*host:\s*(\d+)'
+        ]
+
+        for pattern in network_patterns:
+            for match in re.finditer(pattern, vagrantfile_content):
+                if "private_network" in pattern:
+                    config["networks"].append({
+                        "type": "private_network",
+                        "ip": match.group(1)
+                    })
+                elif "public_network" in pattern:
+                    network = {"type": "public_network"}
+                    if match.group(1):
+                        network["bridge"] = match.group(1)
+                    config["networks"].append(network)
+                elif "forwarded_port" in pattern:
+                    config["networks"].append({
+                        "type": "forwarded_port",
+                        "guest_port": int(match.group(1)),
+                        "host_port": int(match.group(2))
+                    })
+
+        # Extract synced folders
+        synced_folder_pattern = r'config\.vm\.synced_folder\s+["\']([^"\']+)["\'],\s*["\']([^"\']+)["\']'
+        for match in re.finditer(synced_folder_pattern, vagrantfile_content):
+            config["synced_folders"].append({
+                "host_path": match.group(1),
+                "guest_path": match.group(2)
+            })
+
+        # Extract shell provisioners (inline)
+        inline_provision_pattern = r'config\.vm\.provision\s+["\']shell["\'],\s*inline:\s*<<-SHELL(.*?)SHELL'
+        for match in re.finditer(inline_provision_pattern, vagrantfile_content, re.DOTALL):
+            script_content = match.group(1).strip()
+            config["provisioners"].append({
+                "type": "shell",
+                "inline": [line.strip() for line in script_content.split('\n') if line.strip()]
+            })
+
+        # Extract shell provisioners (path)
+        path_provision_pattern = r'config\.vm\.provision\s+["\']shell["\'],\s*path:\s*["\']([^"\']+)["\']'
+        for match in re.finditer(path_provision_pattern, vagrantfile_content):
+            config["provisioners"].append({
+                "type": "shell",
+                "path": match.group(1)
+            })
+
+        return config
+
+    def extract_provider_config(self, vagrantfile_content: str, provider: str) -> Dict[str, Any]:
+        """Extract provider-specific configuration"""
+        provider_config = {}
+
+        # Find provider block
+        provider_block_pattern = rf'config\.vm\.provider\s+["\']?{provider}["\']?\s+do\s*\|(\w+)\|(.*?)end'
+        match = re.search(provider_block_pattern, vagrantfile_content, re.DOTALL)
+
+        if match:
+            provider_var = match.group(1)
+            block_content = match.group(2)
+
+            # Extract key-value assignments
+            assignment_pattern = rf'{provider_var}\.(\w+)\s*=\s*["\']?([^"\'\n]+)["\']?'
+            for assignment in re.finditer(assignment_pattern, block_content):
+                key = assignment.group(1)
+                value = assignment.group(2).strip()
+
+                # Try to convert to appropriate type
+                try:
+                    if value.isdigit():
+                        provider_config[key] = int(value)
+                    elif value.lower() in ('true', 'false'):
+                        provider_config[key] = value.lower() == 'true'
+                    else:
+                        provider_config[key] = value
+                except Exception:
+                    provider_config[key] = value
+
+        return provider_config
+
+
+def timed(repeat: int, func, *args) -> float:
+    """Best wall time of repeat calls, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--machines', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    legacy = LegacyRegexParser()
+    current = VagrantfileParser()
+
+    print(f"{'machines':>8} {'size':>8} {'regex parse':>12} {'ast parse':>10} "
+          f"{'regex provider':>15} {'ast provider':>13} {'networks regex/ast':>19}")
+    for machines in args.machines:
+        content = build_vagrantfile(machines)
+        assert current.extract_provider_config(content, 'hyperv') == {'memory': 1024}
+
+        legacy_networks = len(legacy.parse(content)['networks'])
+        parsed = current.parse(content)
+        ast_networks = len(parsed['networks']) + sum(len(m['networks']) for m in parsed['machines'])
+
+        print(f"{machines:>8} {len(content) // 1024:>6}KB "
+              f"{timed(args.repeat, legacy.parse, content):>10.1f}ms "
+              f"{timed(args.repeat, current.parse, content):>8.1f}ms "
+              f"{timed(args.repeat, legacy.extract_provider_config, content, 'hyperv'):>13.1f}ms "
+              f"{timed(args.repeat, current.extract_provider_config, content, 'hyperv'):>11.1f}ms "
+              f"{legacy_networks:>10}/{ast_networks}")
+
+
+if __name__ == '__main__':
+    main()
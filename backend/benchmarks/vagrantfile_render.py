@@ -0,0 +1,75 @@
+"""
+Benchmark Vagrantfile rendering.
+
+Compares the previous behaviour (a fresh Environment and template compile on
+every call) with the shared, precompiled environment and the user template LRU.
+
+    cd backend && python -m benchmarks.vagrantfile_render
+"""
+import argparse
+import time
+
+from jinja2 import Template
+
+from app.services.vagrant.generator import BUILTIN_TEMPLATE_SOURCES, VagrantfileGenerator
+
+CONFIG = {
+    'name': 'bench-vm',
+    'box': 'ubuntu/jammy64',
+    'hostname': 'bench-vm',
+    'provider': 'virtualbox',
+    'memory': 2048,
+    'cpus': 2,
+    'network': {'type': 'private_network', 'ip': '192.168.56.10'},
+    'synced_folders': [{'host': './data', 'guest': '/data'}],
+    'provision': [{'type': 'shell', 'inline': 'apt-get update'}],
+    'provider_config': {'linked_clone': True},
+}
+
+USER_TEMPLATE = '''Vagrant.configure("2") do |config|
+  config.vm.box = "{{ box }}"
+  config.vm.hostname = "{{ hostname or name }}"
+  config.vm.provider "virtualbox" do |vb|
+    vb.memory = {{ memory }}
+    vb.cpus = {{ cpus }}
+  end
+end
+'''
+
+
+def rate(func, seconds: float) -> float:
+    """Calls per second of func over roughly the given duration"""
+    count = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        func()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=2.0)
+    args = parser.parse_args()
+
+    generator = VagrantfileGenerator()
+    cases = [
+        ('builtin virtualbox',
+         lambda: Template(BUILTIN_TEMPLATE_SOURCES['virtualbox']).render(CONFIG),
+         lambda: generator.generate_virtualbox(CONFIG)),
+        ('user template',
+         lambda: Template(USER_TEMPLATE).render(CONFIG),
+         lambda: generator.generate_from_template(USER_TEMPLATE, CONFIG)),
+    ]
+
+    print(f"{'case':<20} {'compile/call':>14} {'cached':>14} {'speedup':>9}")
+    for label, before, after in cases:
+        assert before() == after()
+        old = rate(before, args.seconds)
+        new = rate(after, args.seconds)
+        print(f"{label:<20} {old:>10.0f}/s {new:>10.0f}/s {new / old:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
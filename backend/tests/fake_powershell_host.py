@@ -0,0 +1,54 @@
+"""
+Stand-in for the persistent PowerShell host, for use on Linux.
+
+Speaks the same framed JSON protocol as BOOTSTRAP_SCRIPT in
+app/services/providers/powershell_host.py, but runs each script with
+/bin/sh. Point the Hyper-V provider at it with:
+
+    HYPERV_SHELL_COMMAND='["python", "tests/fake_powershell_host.py"]'
+
+A script whose last line is "exit-host" runs the lines before it, then
+makes the process exit mid-request, which exercises crash handling. With
+--fail-once PATH the host exits before its ready frame unless PATH
+exists (creating it), so only its first start fails.
+"""
+import json
+import os
+import subprocess
+import sys
+
+FRAME_PREFIX = "@@GAIA@@"
+
+
+def send(frame: dict) -> None:
+    sys.stdout.write(FRAME_PREFIX + json.dumps(frame) + "\n")
+    sys.stdout.flush()
+
+
+def main() -> None:
+    if sys.argv[1:2] == ["--fail-once"] and not os.path.exists(sys.argv[2]):
+        open(sys.argv[2], "w").close()
+        sys.exit(1)
+
+    send({"ready": True})
+    for line in sys.stdin:
+        request = json.loads(line)
+        script, _, last = request["script"].rstrip().rpartition("\n")
+        if last.strip() == "exit-host":
+            subprocess.run(["/bin/sh", "-c", script])
+            sys.exit(1)
+
+        # Noise that the client must skip
+        print("WARNING: unframed host output")
+
+        result = subprocess.run(["/bin/sh", "-c", request["script"]], capture_output=True, text=True)
+        send({
+            "id": request["id"],
+            "returncode": result.returncode,
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import vms
+from app.core.database import get_db
+
+
+@pytest.fixture
+def client(monkeypatch):
+    reads = []
+
+    async def read_operation_log(vm_id, task_id, **kwargs):
+        reads.append(kwargs["since"])
+        return {"vm_id": vm_id, "operation_id": task_id, "entries": [], "next": kwargs["since"], "done": True}
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(vms, "read_operation_log", read_operation_log)
+    app = FastAPI()
+    app.include_router(vms.router)
+    app.dependency_overrides[get_db] = no_db
+    client = TestClient(app)
+    client.reads = reads
+    return client
+
+
+@pytest.mark.parametrize("since", ["0", "1700000000000", "1700000000000-12", str(2 ** 64 - 1) + "-0"])
+def test_valid_since_is_passed_on(client, since):
+    response = client.get("/1/operations/task-1/logs", params={"since": since})
+
+    assert response.status_code == 200
+    assert client.reads == [since]
+
+
+@pytest.mark.parametrize("since", [
+    "", "abc", "1-", "-1", "1-2-3", "1700000000000-0\n", " 1", "+", "$", "(5", "٣", str(2 ** 64), "1-" + str(2 ** 64),
+])
+def test_malformed_since_is_a_400(client, since):
+    response = client.get("/1/operations/task-1/logs", params={"since": since})
+
+    assert response.status_code == 400
+    assert client.reads == []
@@ -0,0 +1,110 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from app.core.pagination import decode_cursor, encode_cursor, paginate
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2024, 1, 2, 3, 4, 5, 678901),
+    datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=-5))),
+])
+def test_cursor_round_trip(created_at):
+    cursor = encode_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    "é",
+    "!!!!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor(["2024-01-01T00:00:00"]),
+    raw_cursor(["2024-01-01T00:00:00", 1, 2]),
+    raw_cursor({"created_at": "2024-01-01T00:00:00", "id": 1}),
+    raw_cursor({"a": 1, "b": 2}),
+    raw_cursor(5),
+    raw_cursor(None),
+    raw_cursor(["yesterday", 1]),
+    raw_cursor([None, 1]),
+    raw_cursor([20240101, 1]),
+    raw_cursor(["2024-01-01T00:00:00", "1; drop table rows"]),
+    raw_cursor(["2024-01-01T00:00:00", 1.5]),
+    raw_cursor(["2024-01-01T00:00:00", True]),
+    raw_cursor(["2024-01-01T00:00:00", -1]),
+    raw_cursor(["2024-01-01T00:00:00", 2 ** 40]),
+    base64.urlsafe_b64encode(b'["2024-01-01T00:00:00", 1e400]').decode(),
+    base64.urlsafe_b64encode(b"[" * 100000).decode(),
+])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_tampered_cursor_is_a_400():
+    cursor = encode_cursor(datetime(2024, 1, 1), 7)
+
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor[:-3])
+
+    assert error.value.status_code == 400
+
+
+@pytest.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def test_pages_break_created_at_ties_by_id(db):
+    # Three rows share each timestamp, so pages split inside a tie
+    start = datetime(2024, 1, 1)
+    db.add_all(Row(id=index, created_at=start + timedelta(seconds=index // 3)) for index in range(1, 11))
+    await db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page = await paginate(db, select(Row), Row, limit=4, cursor=cursor)
+        assert page.total == 10
+        seen.append([row.id for row in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert seen == [[10, 9, 8, 7], [6, 5, 4, 3], [2, 1]]
+
+
+async def test_paginate_rejects_invalid_cursor(db):
+    with pytest.raises(HTTPException) as error:
+        await paginate(db, select(Row), Row, limit=4, cursor="garbage")
+
+    assert error.value.status_code == 400
@@ -0,0 +1,113 @@
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.providers.powershell_host import PowerShellHost, PowerShellHostError, PowerShellHostPool
+
+FAKE_HOST = [sys.executable, str(Path(__file__).parent / 'fake_powershell_host.py')]
+
+
+@pytest.fixture
+async def host():
+    host = PowerShellHost(FAKE_HOST)
+    await host.start()
+    yield host
+    await host.stop()
+
+
+@pytest.fixture
+async def pool():
+    pool = PowerShellHostPool(FAKE_HOST, size=2)
+    yield pool
+    await pool.close()
+
+
+async def test_round_trip(host):
+    result = await host.run('echo "hello"; echo oops >&2; exit 3', timeout=10)
+
+    assert result.returncode == 3
+    assert result.stdout == "hello\n"
+    assert result.stderr == "oops\n"
+
+
+async def test_requests_reuse_the_process(host):
+    first = await host.run('echo $PPID', timeout=10)
+    second = await host.run('echo $PPID', timeout=10)
+
+    assert first.stdout == second.stdout
+
+
+async def test_crash_is_reported_and_the_host_restarted(tmp_path):
+    pool = PowerShellHostPool(FAKE_HOST, size=1)
+    marker = tmp_path / 'ran'
+    try:
+        before = await pool.run('echo $PPID', timeout=10)
+        with pytest.raises(PowerShellHostError) as error:
+            await pool.run(f'echo ran >> {marker}\nexit-host', timeout=10)
+        after = await pool.run('echo $PPID', timeout=10)
+    finally:
+        await pool.close()
+
+    # The script reached the host, so it was not run a second time
+    assert error.value.request_sent
+    assert marker.read_text() == "ran\n"
+    assert after.returncode == 0
+    assert after.stdout != before.stdout
+
+
+async def test_run_on_dead_host_raises(host):
+    host._process.kill()
+    await host._process.wait()
+
+    with pytest.raises(PowerShellHostError) as error:
+        await host.run('echo hi', timeout=10)
+
+    assert not error.value.request_sent
+
+
+async def test_retries_only_when_the_request_was_never_sent(tmp_path):
+    # The first start exits before its ready frame: nothing was sent, so the
+    # pool starts the host again and runs the script once
+    pool = PowerShellHostPool([*FAKE_HOST, '--fail-once', str(tmp_path / 'failed')], size=1)
+    try:
+        result = await pool.run('echo ok', timeout=10)
+    finally:
+        await pool.close()
+
+    assert result.stdout == "ok\n"
+
+
+async def test_start_failures_give_up_after_one_retry():
+    pool = PowerShellHostPool([sys.executable, '-c', 'import sys; sys.exit(1)'], size=1)
+    try:
+        with pytest.raises(PowerShellHostError) as error:
+            await pool.run('echo ok', timeout=10)
+    finally:
+        await pool.close()
+
+    assert not error.value.request_sent
+
+
+async def test_timeout_restarts_the_host(pool):
+    with pytest.raises(subprocess.TimeoutExpired):
+        await pool.run('sleep 5', timeout=0.5)
+
+    result = await pool.run('echo back', timeout=10)
+    assert result.stdout == "back\n"
+
+
+async def test_concurrent_calls_use_every_host(pool):
+    # Warm both hosts so start-up time doesn't blur the timing
+    await asyncio.gather(*(pool.run('true', timeout=10) for _ in range(2)))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(pool.run('sleep 0.5; echo $PPID', timeout=10) for _ in range(4)))
+    elapsed = time.perf_counter() - started
+
+    assert len({result.stdout for result in results}) == 2
+    # Two rounds of two, not four in sequence
+    assert elapsed < 1.9
@@ -0,0 +1,34 @@
+import pytest
+
+from app.services.providers.base import ProviderRegistry
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    ProviderRegistry.clear_pool()
+    yield
+    ProviderRegistry.clear_pool()
+
+
+def test_cli_providers_are_pooled_by_name():
+    first = ProviderRegistry.get_provider('virtualbox', {'gui': True})
+    second = ProviderRegistry.get_provider('virtualbox', {'memory': 4096})
+
+    assert first is second is ProviderRegistry.get_provider('virtualbox')
+    # Per-VM settings are passed to the methods, never kept on the shared instance
+    assert first.config == {}
+    assert len(ProviderRegistry._instances) == 1
+
+
+def test_remote_providers_are_pooled_by_connection():
+    first = ProviderRegistry.get_provider('proxmox', {'host': 'pve1', 'user': 'root@pam', 'password': 'a', 'node': 'n1'})
+    same = ProviderRegistry.get_provider('proxmox', {'host': 'pve1', 'user': 'root@pam', 'password': 'a', 'node': 'n2'})
+    other = ProviderRegistry.get_provider('proxmox', {'host': 'pve2', 'user': 'root@pam', 'password': 'a'})
+
+    assert first is same
+    assert first is not other
+    assert first.config['host'] == 'pve1'
+
+
+def test_unknown_provider():
+    assert ProviderRegistry.get_provider('nope') is None
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.vm import VirtualMachine
+from app.schemas.vm import VMState
+from app.tasks import status_tasks
+
+
+class FakeProvider:
+    """Reports every VM running; on_query runs while the 'provider' is being asked"""
+
+    def __init__(self, on_query):
+        self.on_query = on_query
+
+    async def get_vm_statuses(self, vm_ids):
+        self.on_query()
+        return {vm_id: {'state': 'running'} for vm_id in vm_ids}
+
+
+@pytest.fixture
+def session_factory(monkeypatch, tmp_path):
+    # A file, not :memory:, so the provider call (on the worker runtime's
+    # thread) can use its own connection
+    engine = create_engine(f"sqlite:///{tmp_path}/vms.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[VirtualMachine.__table__])
+    factory = sessionmaker(engine)
+    events = []
+    monkeypatch.setattr(status_tasks, 'SessionLocal', factory)
+    monkeypatch.setattr(status_tasks, 'write_statuses', lambda snapshot, checked_at: None)
+    monkeypatch.setattr(status_tasks, 'publish_event', lambda *args, **kwargs: events.append((args, kwargs)))
+    factory.events = events
+    yield factory
+    engine.dispose()
+
+
+def add_vms(factory, *states):
+    with factory() as db:
+        vms = [
+            VirtualMachine(name=f"vm-{index}", provider="fake", state=state, config={}, provider_vm_id=f"fake-{index}")
+            for index, state in enumerate(states)
+        ]
+        db.add_all(vms)
+        db.commit()
+        return [vm.id for vm in vms]
+
+
+def reconcile(monkeypatch, on_query=lambda: None):
+    monkeypatch.setattr(status_tasks.ProviderRegistry, 'get_provider', lambda name: FakeProvider(on_query))
+    return status_tasks.reconcile_provider_states_task.run("fake")
+
+
+def states(factory):
+    with factory() as db:
+        return [vm.state for vm in db.query(VirtualMachine).order_by(VirtualMachine.id)]
+
+
+def test_drifted_states_are_corrected(monkeypatch, session_factory):
+    add_vms(session_factory, VMState.STOPPED, VMState.RUNNING, VMState.DESTROYING)
+
+    result = reconcile(monkeypatch)
+
+    assert result["updated"] == 1
+    assert states(session_factory) == [VMState.RUNNING, VMState.RUNNING, VMState.DESTROYING]
+    assert len(session_factory.events) == 1
+
+
+def test_states_changed_during_the_query_are_kept(monkeypatch, session_factory):
+    stopped, other = add_vms(session_factory, VMState.STOPPED, VMState.STOPPED)
+
+    def delete_requested():
+        # The API starts deleting the first VM while the provider is queried
+        with session_factory() as db:
+            db.get(VirtualMachine, stopped).state = VMState.DESTROYING
+            db.commit()
+
+    result = reconcile(monkeypatch, delete_requested)
+
+    assert result["updated"] == 1
+    assert states(session_factory) == [VMState.DESTROYING, VMState.RUNNING]
+    assert [args[1] for args, _ in session_factory.events] == [other]
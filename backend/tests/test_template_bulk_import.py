@@ -0,0 +1,85 @@
+import io
+import tarfile
+
+import pytest
+from sqlalchemy.sql import Select
+
+from app.services import template_service
+from app.services.template_service import TemplateService
+
+VAGRANTFILE = 'Vagrant.configure("2") do |config|\n  config.vm.box = "{box}"\nend\n'
+BROKEN = 'Vagrant.configure("2") do |config|\n'
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Enough of AsyncSession for bulk_import: an empty table with unique names"""
+
+    def __init__(self, taken_names=()):
+        self.names = set(taken_names)
+        self.next_id = 1
+
+    async def execute(self, statement):
+        if isinstance(statement, Select):
+            return FakeResult([])
+        created = []
+        for values in statement._multi_values[0]:
+            row = {getattr(column, "key", column): value for column, value in values.items()}
+            name, digest = row["name"], row["content_hash"]
+            if name not in self.names:
+                self.names.add(name)
+                created.append((self.next_id, digest))
+                self.next_id += 1
+        return FakeResult(created)
+
+    async def commit(self):
+        pass
+
+
+def archive(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w') as tar:
+        for name, content in files:
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture(autouse=True)
+def in_process_parsing(monkeypatch):
+    # The default executor instead of the spawn process pool
+    monkeypatch.setattr(template_service, 'get_parse_pool', lambda: None)
+
+
+@pytest.mark.parametrize("batch_size", [1, 100])
+async def test_copies_of_failed_entries_fail_with_the_same_error(monkeypatch, batch_size):
+    monkeypatch.setattr(template_service.settings, 'TEMPLATE_IMPORT_BATCH_SIZE', batch_size)
+    service = TemplateService(FakeSession(taken_names={"Imported - taken"}))
+
+    response = await service.bulk_import(archive([
+        ('broken/Vagrantfile', BROKEN),
+        ('taken/Vagrantfile', VAGRANTFILE.format(box="a")),
+        ('web/Vagrantfile', VAGRANTFILE.format(box="b")),
+        ('broken-copy/Vagrantfile', BROKEN),
+        ('taken-copy/Vagrantfile', VAGRANTFILE.format(box="a")),
+        ('web-copy/Vagrantfile', VAGRANTFILE.format(box="b")),
+    ]))
+
+    by_path = {entry.path: entry for entry in response.entries}
+    assert (response.created, response.duplicates, response.failed) == (1, 1, 4)
+    assert by_path['broken-copy/Vagrantfile'].status == "failed"
+    assert by_path['broken-copy/Vagrantfile'].error == by_path['broken/Vagrantfile'].error
+    assert by_path['taken-copy/Vagrantfile'].status == "failed"
+    assert by_path['taken-copy/Vagrantfile'].error == "Template 'Imported - taken' already exists"
+    assert by_path['web-copy/Vagrantfile'].status == "duplicate"
+    assert by_path['web-copy/Vagrantfile'].template_id == by_path['web/Vagrantfile'].template_id is not None
@@ -0,0 +1,106 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from app.core.config import settings
+from app.services.template_import import (
+    content_hash, is_vagrantfile, iter_archive, read_batch, template_name_for
+)
+
+VAGRANTFILE = 'Vagrant.configure("2") do |config|\n  config.vm.box = "base"\nend\n'
+
+
+def tar_archive(files, mode='w:gz') -> io.BytesIO:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+        archive.addfile(tarfile.TarInfo('web/'), None)
+    buffer.seek(0)
+    return buffer
+
+
+def zip_archive(files) -> io.BytesIO:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('web/', '')
+        for name, data in files.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+FILES = {
+    'web/Vagrantfile': VAGRANTFILE.encode(),
+    'db.vagrantfile': '\ufeff'.encode() + VAGRANTFILE.encode(),
+    'README.md': b'# not a Vagrantfile',
+    'web/.Vagrantfile.swp': b'swap',
+    'latin1/Vagrantfile': 'config.vm.hostname = "caf\xe9"'.encode('latin-1'),
+}
+
+
+@pytest.mark.parametrize("path, expected", [
+    ('Vagrantfile', True),
+    ('web/Vagrantfile', True),
+    ('web/Vagrantfile.local', True),
+    ('boxes/db.vagrantfile', True),
+    ('web/.Vagrantfile.swp', False),
+    ('README.md', False),
+    ('web/vagrantfile', False),
+])
+def test_is_vagrantfile(path, expected):
+    assert is_vagrantfile(path) == expected
+
+
+@pytest.mark.parametrize("path, expected", [
+    ('web/Vagrantfile', 'Imported - web'),
+    ('/clusters/db/Vagrantfile/', 'Imported - clusters/db'),
+    ('Vagrantfile', 'Imported - Vagrantfile'),
+    ('boxes/db.vagrantfile', 'Imported - db'),
+])
+def test_template_name_for(path, expected):
+    assert template_name_for(path) == expected
+
+
+def test_template_name_is_truncated():
+    assert len(template_name_for('x' * 300 + '/Vagrantfile')) == 240
+
+
+@pytest.mark.parametrize("archive", [
+    lambda: tar_archive(FILES),
+    lambda: tar_archive(FILES, mode='w'),
+    lambda: zip_archive(FILES),
+], ids=['tar.gz', 'tar', 'zip'])
+def test_iter_archive(archive):
+    entries = {entry.path: entry for entry in iter_archive(archive())}
+
+    assert sorted(entries) == ['db.vagrantfile', 'latin1/Vagrantfile', 'web/Vagrantfile']
+    assert entries['web/Vagrantfile'].content == VAGRANTFILE
+    assert entries['web/Vagrantfile'].content_hash == content_hash(VAGRANTFILE)
+    # The UTF-8 BOM is stripped, so both hash the same
+    assert entries['db.vagrantfile'].content == VAGRANTFILE
+    assert entries['latin1/Vagrantfile'].content is None
+    assert entries['latin1/Vagrantfile'].error == "not UTF-8 text"
+    assert entries['latin1/Vagrantfile'].content_hash is None
+
+
+@pytest.mark.parametrize("make_archive", [tar_archive, zip_archive], ids=['tar', 'zip'])
+def test_oversized_entries_are_reported(monkeypatch, make_archive):
+    monkeypatch.setattr(settings, 'TEMPLATE_IMPORT_MAX_ENTRY_BYTES', 100)
+    archive = make_archive({'small/Vagrantfile': b'x' * 100, 'large/Vagrantfile': b'x' * 101})
+
+    entries = {entry.path: entry for entry in iter_archive(archive)}
+
+    assert entries['small/Vagrantfile'].content == 'x' * 100
+    assert entries['large/Vagrantfile'].content is None
+    assert entries['large/Vagrantfile'].error == "larger than 100 bytes"
+
+
+def test_read_batch():
+    entries = iter_archive(tar_archive({f'{index}/Vagrantfile': VAGRANTFILE.encode() for index in range(5)}))
+
+    assert [len(read_batch(entries, 2)) for _ in range(4)] == [2, 2, 1, 0]
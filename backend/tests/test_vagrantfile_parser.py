@@ -0,0 +1,158 @@
+import pytest
+
+from app.services.vagrant.dsl import Assignment, Call, DSLSyntaxError, parse_vagrantfile
+from app.services.vagrant.parser import VagrantfileParser
+
+VAGRANTFILE = '''Vagrant.configure("2") do |config|
+  config.vm.box = "ubuntu/jammy64"
+  name = "web"
+  config.vm.hostname = "#{name}-01"
+  config.vm.network "private_network", ip: "10.0.0.2" if ENV["PRIVATE"]
+  config.vm.provision "shell", inline: <<-SHELL
+    apt-get update
+    echo "#{name}"
+  SHELL
+  config.vm.provider "virtualbox" do |vb|
+    vb.memory = 2048
+    if ENV["GUI"]
+      vb.gui = true
+    end
+    ["a", "b"].each do |disk|
+      vb.customize ["createhd", disk]
+    end
+    vb.cpus = 2
+  end
+  config.vm.define "db" do |db|
+    db.vm.box = "debian/bookworm64"
+    db.vm.network "forwarded_port", guest: 5432, host: 15432
+  end
+end
+'''
+
+
+@pytest.fixture
+def parser():
+    return VagrantfileParser()
+
+
+def test_parse_top_level_config(parser):
+    config = parser.parse(VAGRANTFILE)
+
+    assert config["box"] == "ubuntu/jammy64"
+    assert config["provider"] == "virtualbox"
+    assert config["networks"] == [{"type": "private_network", "ip": "10.0.0.2"}]
+    assert config["provisioners"] == [{"type": "shell", "inline": ["apt-get update", 'echo "#{name}"']}]
+
+
+def test_interpolation_is_kept_as_source(parser):
+    assert parser.parse(VAGRANTFILE)["hostname"] == "#{name}-01"
+
+
+def test_provider_block_with_nested_end(parser):
+    config = parser.parse(VAGRANTFILE)
+
+    # Assignments after the nested if/each blocks still belong to the provider
+    assert config["cpus"] == 2
+    assert config["memory"] == 2048
+    assert config["provider_config"] == {"gui": True}
+    assert parser.extract_provider_config(VAGRANTFILE, "virtualbox") == {"memory": 2048, "gui": True, "cpus": 2}
+
+
+def test_define_machines(parser):
+    machines = parser.parse(VAGRANTFILE)["machines"]
+
+    assert [machine["name"] for machine in machines] == ["db"]
+    assert machines[0]["box"] == "debian/bookworm64"
+    assert machines[0]["networks"] == [{"type": "forwarded_port", "guest_port": 5432, "host_port": 15432}]
+    assert machines[0]["provider"] == "virtualbox"
+
+
+def test_modifier_does_not_open_a_block():
+    (statement,) = parse_vagrantfile('config.vm.box = "base" if ENV["BOX"]\n')
+
+    assert statement == Assignment(("config", "vm", "box"), "base", 1)
+
+
+@pytest.mark.parametrize("source, body", [
+    ('x = <<-EOS\n  a\n    b\n  EOS\n', '  a\n    b\n'),
+    ('x = <<~EOS\n  a\n    b\n  EOS\n', 'a\n  b\n'),
+    ('x = <<EOS\na\nEOS\n', 'a\n'),
+    ('x = foo(<<~A, <<~B)\n  one\n  A\n  two\n  B\n', 'foo(<<~A, <<~B)'),
+])
+def test_heredocs(source, body):
+    (statement,) = parse_vagrantfile(source)
+
+    assert statement.value == body
+
+
+def test_heredoc_as_argument():
+    (statement,) = parse_vagrantfile('provision "shell", inline: <<~SHELL, privileged: false\n  echo hi\nSHELL\n')
+
+    assert statement.kwargs == {"inline": "echo hi\n", "privileged": False}
+
+
+@pytest.mark.parametrize("source, value", [
+    ('cpus = `nproc`.to_i\n', '`nproc`.to_i'),
+    ('cpus = %x(nproc)\n', '%x(nproc)'),
+    ('pattern = /a\\/b/i\n', '/a\\/b/i'),
+    ('ratio = a / b / c\n', 'a / b / c'),
+])
+def test_unevaluated_values_are_source_text(source, value):
+    (statement,) = parse_vagrantfile(source)
+
+    assert statement.value == value
+
+
+def test_regexp_arguments():
+    (statement,) = parse_vagrantfile('x.gsub(/\\s+/, "")\n')
+
+    assert statement == Call(("x", "gsub"), ["/\\s+/", ""], {}, None, 1)
+
+
+@pytest.mark.parametrize("source", [
+    '`sysctl -n hw.ncpu`\n',
+    'host_os =~ /a\\/b/\n',
+    'if host_os =~ /darwin|mac os/\n  x = 1\nend\n',
+    'cpus = `nproc`.to_i if RUBY_PLATFORM =~ /linux/\n',
+])
+def test_shell_commands_and_regexps_parse(source):
+    parse_vagrantfile(source)
+
+
+def test_shell_and_regexp_in_provider_block(parser):
+    content = (
+        'Vagrant.configure("2") do |config|\n'
+        '  config.vm.box = "base"\n'
+        '  config.vm.provider "virtualbox" do |vb|\n'
+        '    vb.cpus = `nproc`.to_i\n'
+        '    vb.name = name.gsub(/\\s+/, "")\n'
+        '    vb.memory = 1024\n'
+        '  end\n'
+        'end\n'
+    )
+
+    assert parser.validate(content)
+    assert parser.extract_provider_config(content, "virtualbox") == {
+        "cpus": "`nproc`.to_i", "name": 'name.gsub(/\\s+/, "")', "memory": 1024
+    }
+
+
+@pytest.mark.parametrize("source, line, message", [
+    ('Vagrant.configure("2") do |config|\n  config.vm.box = "x"\n', 1, "'do' is missing its 'end'"),
+    ('config.vm.box = "x\nend\n', 1, "unterminated string"),
+    ('x = <<-EOS\nfoo\n', 1, "unterminated heredoc EOS"),
+    ('foo(1, 2\n', 1, "unclosed '('"),
+    ('end\n', 1, "unexpected 'end'"),
+])
+def test_syntax_errors(source, line, message):
+    with pytest.raises(DSLSyntaxError) as error:
+        parse_vagrantfile(source)
+
+    assert error.value.line == line
+    assert message in str(error.value)
+
+
+def test_validate_rejects_unbalanced_blocks(parser):
+    assert parser.validate(VAGRANTFILE)
+    assert not parser.validate(VAGRANTFILE.rsplit("end", 1)[0])
+    assert not parser.validate('Vagrant.configure("2") do |config|\nend\n')
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from app.services.providers.virtualbox import parse_vm_list_long
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'virtualbox'
+
+WEB = {
+    'name': 'web_default_1700000000000_1234',
+    'ostype': 'Ubuntu (64-bit)',
+    'uuid': '0f1e2d3c-4b5a-6978-8796-a5b4c3d2e1f0',
+    'config_file': '/home/gaia/VirtualBox VMs/web_default_1700000000000_1234/web_default_1700000000000_1234.vbox',
+    'memory': '2048',
+    'cpus': '2',
+}
+DB = {
+    'name': 'db_default_1700000000000_5678',
+    'ostype': 'Debian (64-bit)',
+    'uuid': 'a1b2c3d4-e5f6-0718-293a-4b5c6d7e8f90',
+    'config_file': '/home/gaia/VirtualBox VMs/db_default_1700000000000_5678/db_default_1700000000000_5678.vbox',
+    'memory': '1024',
+    'cpus': '1',
+}
+
+
+def parse_fixture(name: str):
+    with open(FIXTURES / name) as output:
+        return list(parse_vm_list_long(line.rstrip('\n') for line in output))
+
+
+@pytest.mark.parametrize("fixture, web_state, db_state", [
+    ('list_vms_long_6.0.txt', 'running', 'poweroff'),
+    ('list_vms_long_6.1.txt', 'saved', 'aborted'),
+    ('list_vms_long_7.0.txt', 'paused', 'poweroff'),
+])
+def test_parses_every_vm(fixture, web_state, db_state):
+    vms = parse_fixture(fixture)
+
+    assert vms[:2] == [
+        {**WEB, 'provider_state': web_state},
+        {**DB, 'provider_state': db_state},
+    ]
+
+
+def test_memory_size_without_colon():
+    # VirtualBox 6.1 drops the colon after "Memory size"
+    (vm,) = parse_vm_list_long(['Name:   web', 'Memory size                  4096MB'])
+
+    assert vm['memory'] == '4096'
+
+
+def test_missing_fields_are_absent():
+    vms = parse_fixture('list_vms_long_6.0.txt')
+
+    assert vms[2] == {
+        'name': '<inaccessible!>',
+        'uuid': '11111111-2222-3333-4444-555555555555',
+        'config_file': '/home/gaia/VirtualBox VMs/gone/gone.vbox',
+    }
+
+
+def test_shared_folders_do_not_start_a_vm():
+    vms = parse_fixture('list_vms_long_7.0.txt')
+
+    assert [vm['name'] for vm in vms] == [WEB['name'], DB['name']]
+
+
+def test_empty_output():
+    assert list(parse_vm_list_long([])) == []
+    assert list(parse_vm_list_long(['', 'Memory size: 1024MB'])) == []
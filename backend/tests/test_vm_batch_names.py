@@ -0,0 +1,26 @@
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.vm import VMBatchCreate
+from app.services.vm_service import VMService
+
+
+@pytest.mark.parametrize("pattern, detail", [
+    ("{index.foo}", "Invalid name pattern"),
+    ("{index[0]}", "Invalid name pattern"),
+    ("{name}-{index}", "Invalid name pattern"),
+    ("{index:q}", "Invalid name pattern"),
+    ("{index:>300}", "at most 255 characters"),
+    ("x" * 240 + "-{index:020d}", "at most 255 characters"),
+    ("lab", "must include {index}"),
+])
+async def test_invalid_names_are_a_400(pattern, detail):
+    # Rejected before the database is touched
+    service = VMService(None)
+    batch = VMBatchCreate(provider="virtualbox", count=3, name_pattern=pattern)
+
+    with pytest.raises(HTTPException) as error:
+        await service.create_vm_batch(batch)
+
+    assert error.value.status_code == 400
+    assert detail in error.value.detail
@@ -20,8 +20,8 @@ function Dashboard() {
   const loadStats = async () => {
     try {
       const [vms, templates, providers] = await Promise.all([
-        vmAPI.list(),
-        templateAPI.list(),
+        vmAPI.list({ view: 'summary' }),
+        templateAPI.list({ view: 'summary' }),
         providerAPI.list(),
       ])
 
@@ -13,7 +13,7 @@ function Templates() {
 
   const loadTemplates = async () => {
     try {
-      const response = await templateAPI.list()
+      const response = await templateAPI.list({ view: 'summary' })
       setTemplates(response.data)
     } catch (error) {
       console.error('Failed to load templates:', error)
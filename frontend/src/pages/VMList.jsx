@@ -14,7 +14,7 @@ function VMList() {
 
   const loadVMs = async () => {
     try {
-      const response = await vmAPI.list()
+      const response = await vmAPI.list({ view: 'summary' })
       setVMs(response.data)
     } catch (error) {
       console.error('Failed to load VMs:', error)